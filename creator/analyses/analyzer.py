@@ -1,6 +1,7 @@
 import os
 import csv
 import xlrd
+import pandas
 from collections import defaultdict
 from functools import partial
 from django.conf import settings
@@ -37,8 +38,17 @@ KNOWN_FORMATS = {
     ".xls": {"name": "Excel", "reader": XLSXDictReader},
 }
 
+DATAFRAME_READERS = {
+    ".csv": partial(pandas.read_csv, sep=","),
+    ".tsv": partial(pandas.read_csv, sep="\t"),
+}
+
 NUMBER_OF_COMMON_VALUES = 15
 
+# Number of rows parsed at a time when reading delimited files into
+# DataFrames
+DATAFRAME_CHUNKSIZE = 10000
+
 
 def analyze_version(version):
     """
@@ -106,7 +116,55 @@ def extract_data(version):
     if data_format not in KNOWN_FORMATS:
         raise IOError(f"{data_format} is not an understood data format.")
 
-    # Need to set storage location for study bucket if using S3 backend
+    _set_study_storage(version)
+
+    with version.key.open(mode="rb") as f:
+        parsed = list(KNOWN_FORMATS[data_format]["reader"](f))
+
+    return parsed
+
+
+def extract_dataframe(version, columns=None, dtype=None, chunksize=None):
+    """
+    Read a version's file directly into a DataFrame without building an
+    intermediate list of row dicts.
+
+    Delimited files are parsed in chunks of _chunksize_ rows and only the
+    requested _columns_ are kept, so peak memory is bounded by the size of
+    the resulting DataFrame rather than by the raw row data. All values are
+    read as strings, the same as `extract_data`, unless overridden by
+    _dtype_ (eg: `{"Data Type": "category"}`).
+    """
+    _, data_format = os.path.splitext(version.key.name)
+
+    if data_format not in KNOWN_FORMATS:
+        raise IOError(f"{data_format} is not an understood data format.")
+
+    _set_study_storage(version)
+
+    read_kwargs = {"usecols": columns, "dtype": str, "keep_default_na": False}
+
+    with version.key.open(mode="rb") as f:
+        if data_format not in DATAFRAME_READERS:
+            # Excel workbooks can't be streamed, read the sheet at once
+            df = pandas.read_excel(f, **read_kwargs)
+        else:
+            chunks = DATAFRAME_READERS[data_format](
+                f, chunksize=chunksize or DATAFRAME_CHUNKSIZE, **read_kwargs
+            )
+            df = pandas.concat(chunks, ignore_index=True)
+
+    # Convert after concatenating so that categories are shared by all chunks
+    if dtype:
+        df = df.astype(dtype)
+
+    return df
+
+
+def _set_study_storage(version):
+    """
+    Point the version's file at its study's bucket when using the S3 backend
+    """
     if settings.DEFAULT_FILE_STORAGE == "django_s3_storage.storage.S3Storage":
         if version.study is not None:
             study = version.study
@@ -116,8 +174,3 @@ def extract_data(version):
             raise GraphQLError("Version must be part of a study.")
 
         version.key.storage = S3Storage(aws_s3_bucket_name=study.bucket)
-
-    with version.key.open(mode="rb") as f:
-        parsed = list(KNOWN_FORMATS[data_format]["reader"](f))
-
-    return parsed
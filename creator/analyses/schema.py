@@ -5,6 +5,7 @@ from graphene_django import DjangoObjectType
 from graphene_django.filter import DjangoFilterConnectionField
 from graphql import GraphQLError
 
+from creator.authorization import get_authorization
 from creator.analyses.models import Analysis
 from creator.analyses.mutations import Mutation
 
@@ -19,26 +20,27 @@ class AnalysisNode(DjangoObjectType):
         """
         Only return if the user is allowed to view analyses
         """
-        user = info.context.user
+        auth = get_authorization(info.context)
 
         if not (
-            user.has_perm("analyses.view_analysis")
-            or user.has_perm("analyses.view_my_study_analysis")
+            auth.has_perm("analyses.view_analysis")
+            or auth.has_perm("analyses.view_my_study_analysis")
         ):
             raise GraphQLError("Not allowed")
 
         try:
-            analysis = cls._meta.model.objects.get(id=id)
+            analysis = cls._meta.model.objects.select_related(
+                "version__root_file"
+            ).get(id=id)
         except cls._meta.model.DoesNotExist:
             raise GraphQLError("Analysis does not exist")
 
         # If user only has view_my_study_analysis, make sure the analysis
         # belongs to one of their studies
-        if user.has_perm("analyses.view_analysis") or (
-            user.has_perm("analyses.view_my_study_analysis")
-            and user.studies.filter(
-                kf_id=analysis.version.root_file.study.kf_id
-            ).exists()
+        if auth.has_study_perm(
+            "analyses.view_analysis",
+            "analyses.view_my_study_analysis",
+            analysis.version.root_file.study_id,
         ):
             return analysis
 
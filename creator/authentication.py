@@ -1,5 +1,8 @@
+import jwt
+import time
 import requests
 import logging
+import threading
 from typing import Dict, Optional
 from django.conf import settings
 from django.core.cache import cache
@@ -13,17 +16,129 @@ def client_headers(aud: str) -> Dict[str, str]:
     Get a m2m token from Auth0 and return a dictionary to be passed as headers
     containing the authorization field and any other fields.
     """
-    cache_key = f"ACCESS_TOKEN:{aud}"
-    token = cache.get_or_set(
-        cache_key, lambda: get_token(aud), settings.CACHE_AUTH0_TIMEOUT
-    )
+    token = tokens.get(aud)
 
-    headers = settings.REQUESTS_HEADERS
+    headers = dict(settings.REQUESTS_HEADERS)
     if token:
-        headers.update({"Authorization": "Bearer " + token})
+        headers["Authorization"] = "Bearer " + token
     return headers
 
 
+class TokenManager:
+    """
+    Keeps m2m tokens for each audience in the cache along with the time they
+    expire.
+
+    Tokens that are within AUTH0_TOKEN_REFRESH_MARGIN seconds of expiring are
+    still returned while a new token is fetched in a background thread.
+    A lock in the cache ensures that only one worker fetches a token for an
+    audience at a time. Others wait for that token instead of all requesting
+    new tokens from Auth0 at once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def get(self, aud: str) -> Optional[str]:
+        entry = cache.get(self._key(aud))
+        now = time.time()
+        if isinstance(entry, dict) and now < entry["expires_at"]:
+            margin = settings.AUTH0_TOKEN_REFRESH_MARGIN
+            if now >= entry["expires_at"] - margin:
+                self._refresh_in_background(aud)
+            return entry["token"]
+
+        return self.refresh(aud)
+
+    def refresh(self, aud: str) -> Optional[str]:
+        """
+        Fetch a new token for the audience. If another worker is already
+        fetching one, wait for its token instead.
+        """
+        lock_key = self._lock_key(aud)
+        if cache.add(lock_key, True, int(settings.REQUESTS_TIMEOUT)):
+            try:
+                return self._fetch(aud)
+            finally:
+                cache.delete(lock_key)
+
+        deadline = time.time() + int(settings.REQUESTS_TIMEOUT)
+        while time.time() < deadline:
+            time.sleep(0.1)
+            entry = cache.get(self._key(aud))
+            if isinstance(entry, dict) and time.time() < entry["expires_at"]:
+                return entry["token"]
+            # The other worker failed to get a token
+            if cache.get(lock_key) is None:
+                break
+
+        return self._fetch(aud)
+
+    def _refresh_in_background(self, aud: str):
+        with self._lock:
+            if aud in self._refreshing:
+                return
+            self._refreshing.add(aud)
+
+        thread = threading.Thread(
+            target=self._refresh_if_free, args=(aud,), daemon=True
+        )
+        thread.start()
+
+    def _refresh_if_free(self, aud: str):
+        """
+        Fetch a new token unless another worker is already doing so
+        """
+        lock_key = self._lock_key(aud)
+        try:
+            if cache.add(lock_key, True, int(settings.REQUESTS_TIMEOUT)):
+                try:
+                    self._fetch(aud)
+                finally:
+                    cache.delete(lock_key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(aud)
+
+    def _fetch(self, aud: str) -> Optional[str]:
+        """
+        Get a new token from Auth0 and store it until it expires
+        """
+        token = get_token(aud)
+        if token is None:
+            return None
+
+        lifetime = _token_lifetime(token)
+        cache.set(
+            self._key(aud),
+            {"token": token, "expires_at": time.time() + lifetime},
+            lifetime,
+        )
+        return token
+
+    def _key(self, aud: str) -> str:
+        return f"ACCESS_TOKEN:{aud}"
+
+    def _lock_key(self, aud: str) -> str:
+        return f"ACCESS_TOKEN_LOCK:{aud}"
+
+
+def _token_lifetime(token: str) -> int:
+    """
+    The number of seconds until a token expires, or CACHE_AUTH0_TIMEOUT if
+    the expiration can't be read from the token
+    """
+    try:
+        claims = jwt.decode(token, verify=False)
+        return max(int(claims["exp"] - time.time()), 0)
+    except (jwt.exceptions.InvalidTokenError, KeyError, TypeError):
+        return int(settings.CACHE_AUTH0_TIMEOUT)
+
+
+tokens = TokenManager()
+
+
 def get_token(aud: str) -> Optional[str]:
     """
     Retrieve a token for a given audience from Auth0.
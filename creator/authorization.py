@@ -0,0 +1,64 @@
+class AuthorizationContext:
+    """
+    The permissions and study memberships of a request's user.
+
+    Both are loaded from the database at most once per request so that
+    resolvers may check access to many objects without querying for each.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._perms = None
+        self._study_ids = None
+
+    @property
+    def perms(self):
+        """
+        The set of '<app_label>.<codename>' permissions the user has
+        """
+        if self._perms is None:
+            self._perms = set(self.user.get_all_permissions())
+        return self._perms
+
+    @property
+    def study_ids(self):
+        """
+        The set of kf_ids of the studies the user is a member of
+        """
+        if self._study_ids is None:
+            if self.user.is_authenticated:
+                self._study_ids = set(
+                    self.user.studies.values_list("kf_id", flat=True)
+                )
+            else:
+                self._study_ids = set()
+        return self._study_ids
+
+    def has_perm(self, perm):
+        if not self.user.is_active:
+            return False
+        return self.user.is_superuser or perm in self.perms
+
+    def is_member(self, study_id):
+        return study_id in self.study_ids
+
+    def has_study_perm(self, perm, my_study_perm, study_id):
+        """
+        Whether the user has _perm_ or has _my_study_perm_ and is a member of
+        the study with kf_id _study_id_
+        """
+        return self.has_perm(perm) or (
+            self.has_perm(my_study_perm) and self.is_member(study_id)
+        )
+
+
+def get_authorization(request):
+    """
+    Returns the authorization context for a request, creating it on first
+    use.
+    """
+    context = getattr(request, "_authorization", None)
+    if context is None or context.user is not request.user:
+        context = AuthorizationContext(request.user)
+        request._authorization = context
+    return context
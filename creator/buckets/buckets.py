@@ -2,6 +2,9 @@ import json
 import boto3
 import logging
 from django.conf import settings
+from django.utils import timezone
+from creator.buckets.models import Bucket
+from creator.utils import ContextThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -49,66 +52,138 @@ def get_bucket_name(study_id, region=None, suffix=""):
     return name
 
 
+# The steps that configure a new study bucket after it is created. The steps
+# of a chain are run in order while the chains are run concurrently.
+SETUP_CHAINS = [
+    ["policy"],
+    ["encryption"],
+    ["tagging"],
+    # Replication requires versioning to be enabled on the bucket
+    ["versioning", "replication"],
+    ["logging"],
+    ["cors"],
+    ["inventory"],
+]
+
+SETUP_STEPS = {
+    "policy": lambda s3, name, study_id: _add_policy(name, s3),
+    "encryption": lambda s3, name, study_id: _add_encryption(name, s3),
+    "tagging": lambda s3, name, study_id: _add_tagging(name, study_id, s3),
+    "versioning": lambda s3, name, study_id: _add_versioning(name, s3),
+    "replication": lambda s3, name, study_id: _add_replication(
+        name, study_id, s3
+    ),
+    "logging": lambda s3, name, study_id: _add_logging(name, study_id, s3),
+    "cors": lambda s3, name, study_id: _add_cors(name, s3),
+    "inventory": lambda s3, name, study_id: _add_inventory(name, s3),
+}
+
+
+class BucketSetupError(Exception):
+    pass
+
+
 def new_bucket(study):
     """
     Create a new bucket in s3 given a study_id
+
+    Once the bucket is created, its configuration steps are run concurrently
+    with a single S3 client. The state of each step is recorded on the
+    Bucket so that setting up the same bucket again only repeats the steps
+    that did not complete.
     """
     study_id = study.kf_id
 
     s3 = boto3.client("s3")
     bucket_name = get_bucket_name(study_id)
-    bucket = s3.create_bucket(ACL="private", Bucket=bucket_name)
-    _add_policy(bucket_name)
-
-    # Encryption
-    logger.info("adding encryption to bucket")
-    _add_encryption(bucket_name)
-
-    # Tagging
-    logger.info("adding tagging to bucket")
-    _add_tagging(bucket_name, study_id)
-
-    # Versioning
-    logger.info("adding versioning to bucket")
-    _add_versioning(bucket_name)
+    bucket = Bucket.objects.filter(name=bucket_name).first()
+
+    if bucket is None or not _step_completed(bucket, "create"):
+        s3.create_bucket(ACL="private", Bucket=bucket_name)
+        if bucket is None:
+            bucket = Bucket(
+                name=bucket_name,
+                created_on=timezone.now(),
+                organization=study.organization,
+            )
+        bucket.study = study
+        bucket.setup_steps["create"] = {"state": "COMPLETED"}
+        bucket.save()
+
+    chains = [
+        [step for step in chain if not _step_completed(bucket, step)]
+        for chain in SETUP_CHAINS
+    ]
+    chains = [chain for chain in chains if chain]
+
+    # Only the S3 requests are made concurrently, the results are saved
+    # afterwards on this thread
+    with ContextThreadPoolExecutor(
+        max_workers=settings.STUDY_BUCKETS_SETUP_WORKERS
+    ) as executor:
+        futures = [
+            executor.submit(_run_setup_chain, chain, s3, bucket_name, study_id)
+            for chain in chains
+        ]
+    for future in futures:
+        bucket.setup_steps.update(future.result())
+    bucket.save(update_fields=["setup_steps"])
+
+    failed = [
+        step
+        for step, result in bucket.setup_steps.items()
+        if result["state"] == "FAILED"
+    ]
+    if failed:
+        raise BucketSetupError(
+            f"Could not set up {', '.join(failed)} for bucket {bucket_name}"
+        )
 
-    # Logging
-    logger.info("adding logging to bucket")
-    _add_logging(bucket_name, study_id)
+    study.bucket = bucket_name
 
-    # CORS
-    logger.info("adding CORS to bucket")
-    _add_cors(bucket_name)
+    return study
 
-    # Replication
-    logger.info("adding replication to bucket")
-    _add_replication(bucket_name, study_id)
 
-    # Inventory
-    logger.info("adding inventory to bucket")
-    _add_inventory(bucket_name)
+def _step_completed(bucket, step):
+    return bucket.setup_steps.get(step, {}).get("state") == "COMPLETED"
 
-    study.bucket = bucket_name
 
-    return study
+def _run_setup_chain(chain, s3, bucket_name, study_id):
+    """
+    Run the setup steps of a chain in order, stopping at the first to fail.
+    Returns the state of each step that was run.
+    """
+    states = {}
+    for step in chain:
+        logger.info(f"adding {step} to bucket {bucket_name}")
+        try:
+            SETUP_STEPS[step](s3, bucket_name, study_id)
+        except Exception as err:
+            logger.error(
+                f"Could not add {step} to bucket {bucket_name}: {err}"
+            )
+            states[step] = {"state": "FAILED", "error": str(err)}
+            break
+        states[step] = {"state": "COMPLETED"}
+    return states
 
 
-def _add_versioning(bucket_name):
+def _add_versioning(bucket_name, client=None):
     """
     Enabled versioning for a bucket
     """
-    s3 = boto3.client("s3")
+    s3 = client or boto3.client("s3")
     response = s3.put_bucket_versioning(
         Bucket=bucket_name, VersioningConfiguration={"Status": "Enabled"}
     )
     return response
 
 
-def _add_encryption(bucket_name):
+def _add_encryption(bucket_name, client=None):
     """
     Adds encryption to a bucket
     """
-    s3 = boto3.client("s3")
+    s3 = client or boto3.client("s3")
     response = s3.put_bucket_encryption(
         Bucket=bucket_name,
         ServerSideEncryptionConfiguration={
@@ -124,11 +199,11 @@ def _add_encryption(bucket_name):
     return response
 
 
-def _add_tagging(bucket_name, study_id):
+def _add_tagging(bucket_name, study_id, client=None):
     """
     Adds standard tag set to a bucket
     """
-    s3 = boto3.client("s3")
+    s3 = client or boto3.client("s3")
     response = s3.put_bucket_tagging(
         Bucket=bucket_name,
         Tagging={
@@ -150,11 +225,11 @@ def _add_tagging(bucket_name, study_id):
     return response
 
 
-def _add_logging(bucket_name, study_id):
+def _add_logging(bucket_name, study_id, client=None):
     """
     Adds access logging to a bucket
     """
-    s3 = boto3.client("s3")
+    s3 = client or boto3.client("s3")
     # Logging buckets need to be in the same region, determine based on name
     if "-dr" in bucket_name:
         target_logging_bucket = settings.STUDY_BUCKETS_DR_LOGGING_BUCKET
@@ -186,7 +261,7 @@ def _add_logging(bucket_name, study_id):
             logger.error(err)
 
 
-def _add_replication(bucket_name: str, study_id: str):
+def _add_replication(bucket_name: str, study_id: str, client=None):
     """
     Configures a second bucket with `-dr` suffix and replicates the primary
     bucket to it.
@@ -203,7 +278,7 @@ def _add_replication(bucket_name: str, study_id: str):
         study_id, region=settings.STUDY_BUCKETS_DR_REGION, suffix="dr"
     )
 
-    s3 = boto3.client("s3")
+    s3 = client or boto3.client("s3")
     logger.info(f"Creating a replication bucket at {dr_bucket_name}")
     # Set up a second -dr bucket to replicate to
     try:
@@ -212,19 +287,19 @@ def _add_replication(bucket_name: str, study_id: str):
             Bucket=dr_bucket_name,
             CreateBucketConfiguration={"LocationConstraint": "us-west-2"},
         )
-        _add_policy(dr_bucket_name)
+        _add_policy(dr_bucket_name, s3)
     except s3.exceptions.ClientError as err:
         if err.response["Error"]["Code"] == "BucketAlreadyOwnedByYou":
             logger.info(f"bucket {dr_bucket_name} already exists, continuing")
 
     logger.info("adding encryption to replicated bucket")
-    _add_encryption(dr_bucket_name)
+    _add_encryption(dr_bucket_name, s3)
     logger.info("adding versioning to replicated bucket")
-    _add_versioning(dr_bucket_name)
+    _add_versioning(dr_bucket_name, s3)
     logger.info("adding tagging to replicated bucket")
-    _add_tagging(dr_bucket_name, study_id)
+    _add_tagging(dr_bucket_name, study_id, s3)
     logger.info("adding logging to replicated bucket")
-    _add_logging(dr_bucket_name, study_id)
+    _add_logging(dr_bucket_name, study_id, s3)
 
     # Add the replication rule
     iam_role = settings.STUDY_BUCKETS_REPLICATION_ROLE
@@ -249,11 +324,11 @@ def _add_replication(bucket_name: str, study_id: str):
     return response
 
 
-def _add_cors(bucket):
+def _add_cors(bucket, client=None):
     """
     Adds CORS for Cavatica requests
     """
-    client = boto3.client("s3")
+    client = client or boto3.client("s3")
     return client.put_bucket_cors(
         Bucket=bucket,
         CORSConfiguration={
@@ -281,21 +356,21 @@ def _add_cors(bucket):
     )
 
 
-def _add_policy(bucket):
+def _add_policy(bucket, client=None):
     """
     Adds a policy to the bucket. Will replace whatever policy already exists,
     if there is one.
     """
-    client = boto3.client("s3")
+    client = client or boto3.client("s3")
     policy = POLICY.format(bucket_name=bucket)
     return client.put_bucket_policy(Bucket=bucket, Policy=policy)
 
 
-def _add_inventory(bucket):
+def _add_inventory(bucket, client=None):
     """
     Adds inventory configuration to a bucket
     """
-    client = boto3.client("s3")
+    client = client or boto3.client("s3")
     dest = "arn:aws:s3:::{}".format(settings.STUDY_BUCKETS_LOGGING_BUCKET)
 
     return client.put_bucket_inventory_configuration(
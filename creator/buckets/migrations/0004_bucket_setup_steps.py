@@ -0,0 +1,19 @@
+# Generated by Django 2.2.26 on 2026-10-19 12:00
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buckets', '0003_add_organizations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bucket',
+            name='setup_steps',
+            field=django.contrib.postgres.fields.jsonb.JSONField(default=dict, help_text='The state of each step taken to set up the bucket when it was created by the Study Creator'),
+        ),
+    ]
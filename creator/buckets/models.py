@@ -45,3 +45,10 @@ class Bucket(models.Model):
         default=False,
         help_text="Whether this bucket has been deleted from S3",
     )
+    setup_steps = JSONField(
+        default=dict,
+        help_text=(
+            "The state of each step taken to set up the bucket when it was "
+            "created by the Study Creator"
+        ),
+    )
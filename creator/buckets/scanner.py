@@ -2,6 +2,7 @@ import boto3
 import logging
 import re
 from django.conf import settings
+from django.db import transaction
 from creator.buckets.models import Bucket
 from creator.studies.models import Study
 from creator.organizations.models import Organization
@@ -14,6 +15,10 @@ study_re = re.compile(r".+-(sd-[a-z0-9]{8}).*")
 def sync_buckets():
     """
     Synchronize buckets in s3 with internal models
+
+    The stored buckets and the studies they may belong to are loaded at once
+    and compared to the buckets in S3 so that all changes are written in a
+    few bulk queries, however many buckets there are.
     """
 
     client = boto3.client("s3")
@@ -23,51 +28,66 @@ def sync_buckets():
         logger.error(f"Problem listing buckets in S3: {err}")
         raise
 
-    buckets = [b for b in buckets if f"-{settings.STAGE}-sd-" in b["Name"]]
+    buckets = {
+        b["Name"]: b for b in buckets if f"-{settings.STAGE}-sd-" in b["Name"]
+    }
 
     logger.info(f"Found {len(buckets)} buckets to update")
-    for bucket_info in buckets:
-        try:
-            bucket = Bucket.objects.get(name=bucket_info["Name"])
-        except Bucket.DoesNotExist:
-            logger.info(f"Found new bucket {bucket_info['Name']}")
+    existing = Bucket.objects.in_bulk(list(buckets))
+    study_ids = {name: bucket_study_id(name) for name in buckets}
+    studies = Study.objects.in_bulk(
+        [study_id for study_id in study_ids.values() if study_id]
+    )
+
+    organization = None
+    new_buckets = []
+    changed_buckets = []
+    for name, bucket_info in buckets.items():
+        bucket = existing.get(name)
+        if bucket is None:
+            logger.info(f"Found new bucket {name}")
+            if organization is None:
+                organization = Organization.objects.earliest("created_on")
             bucket = Bucket(
-                name=bucket_info["Name"],
+                name=name,
                 created_on=bucket_info["CreationDate"],
-                organization=Organization.objects.earliest("created_on"),
+                organization=organization,
             )
-
-        link_study(bucket)
+            new_buckets.append(bucket)
+        elif bucket.deleted:
+            changed_buckets.append(bucket)
+
+        study = studies.get(study_ids[name])
+        if study is None:
+            logger.info(f"Could not find a study for bucket {name}")
+        elif bucket.study_id != study.kf_id:
+            logger.info(f"Linked bucket {name} to study {study.kf_id}")
+            if not bucket.deleted and name in existing:
+                changed_buckets.append(bucket)
+            bucket.study = study
 
         bucket.deleted = False
 
-        bucket.save()
+    with transaction.atomic():
+        Bucket.objects.bulk_create(new_buckets)
+        if changed_buckets:
+            Bucket.objects.bulk_update(changed_buckets, ["study", "deleted"])
+
+        deleted = (
+            Bucket.objects.filter(deleted=False)
+            .exclude(name__in=list(buckets))
+            .update(deleted=True)
+        )
 
-    db_buckets = {b.name for b in Bucket.objects.filter(deleted=False).all()}
-    deleted_buckets = db_buckets - {b["Name"] for b in buckets}
-    logger.info(f"Found {len(buckets)} buckets that are no longer in S3")
-    for bucket in deleted_buckets:
-        bucket = Bucket.objects.get(name=bucket)
-        bucket.deleted = True
-        bucket.save()
+    logger.info(f"Found {deleted} buckets that are no longer in S3")
 
 
-def link_study(bucket):
+def bucket_study_id(name):
     """
-    Attempts to link a bucket to a study by extracting a kf_id from its name
+    Returns the kf_id of the study a bucket is named for, if any
     """
-    study_match = study_re.match(bucket.name)
-    if not study_match.group(1):
-        return False
+    study_match = study_re.match(name)
+    if not study_match:
+        return None
 
-    study_id = study_match.group(1).upper().replace("-", "_")
-
-    try:
-        study = Study.objects.get(kf_id=study_id)
-    except Study.DoesNotExist:
-        logger.info(f"Could not find a study for bucket {bucket.name}")
-        return False
-
-    logger.info(f"Linked bucket {bucket.name} to study {study_id}")
-    bucket.study = study
-    return True
+    return study_match.group(1).upper().replace("-", "_")
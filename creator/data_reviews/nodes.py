@@ -1,14 +1,18 @@
 from graphene import relay
 from graphql import GraphQLError
 from graphene_django import DjangoObjectType
-from graphene_django.filter import DjangoFilterConnectionField
-from creator.events.schema import EventNode, EventFilter
+from creator.authorization import get_authorization
+from creator.events.schema import (
+    EventNode,
+    EventFilter,
+    KeysetConnectionField,
+)
 
 from creator.data_reviews.models import DataReview
 
 
 class DataReviewNode(DjangoObjectType):
-    events = DjangoFilterConnectionField(
+    events = KeysetConnectionField(
         EventNode, filterset_class=EventFilter, description="List all events"
     )
 
@@ -22,19 +26,17 @@ class DataReviewNode(DjangoObjectType):
         """
         Check permissions and return
         """
-        user = info.context.user
+        auth = get_authorization(info.context)
 
         try:
             data_review = cls._meta.model.objects.get(pk=id)
         except cls._meta.model.DoesNotExist:
             raise GraphQLError("DataReviews was not found")
 
-        if not (
-            user.has_perm("data_reviews.add_datareview")
-            or (
-                user.has_perm("data_reviews.add_my_study_datareview")
-                and user.studies.filter(kf_id=data_review.study.kf_id).exists()
-            )
+        if not auth.has_study_perm(
+            "data_reviews.add_datareview",
+            "data_reviews.add_my_study_datareview",
+            data_review.study_id,
         ):
             raise GraphQLError("Not allowed")
 
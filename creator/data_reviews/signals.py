@@ -2,7 +2,7 @@ from django.dispatch import receiver
 from django.db.models.signals import pre_delete, post_save
 
 from creator.files.models import Version
-from creator.events.models import Event
+from creator.events.outbox import emit
 from creator.data_reviews.models import DataReview, State
 
 
@@ -30,22 +30,22 @@ def file_version_pre_delete(sender, instance, using, *args, **kwargs):
     Is version part of any Data Review
     Yes - update all related review's state, emit event
     """
-    for dr in instance.data_reviews.all():
+    for dr in instance.data_reviews.select_related("study").all():
         if dr.state == State.WAITING:
             dr.receive_updates()
             dr.save()
-        Event(
-            organization=dr.study.organization,
-            study=dr.study,
-            file=instance.root_file,
-            user=dr.creator,
+        emit(
+            organization_id=dr.study.organization_id,
+            study_id=dr.study_id,
+            file_id=instance.root_file_id,
+            user_id=dr.creator_id,
             data_review=dr,
             description=(
                 "File version {instance.pk} was deleted from data review "
                 f"{dr.pk}"
             ),
             event_type="DR_UPD",
-        ).save()
+        )
 
 
 @receiver(post_save, sender=Version)
@@ -83,14 +83,15 @@ def file_version_post_save(sender, instance, created, *args, **kwargs):
         .filter(
             versions__in=Version.objects.filter(root_file=instance.root_file)
         )
+        .select_related("study")
         .distinct()
     ):
         if dr.state == State.WAITING:
             dr.receive_updates()
             dr.save()
-        Event(
-            organization=dr.study.organization,
-            study=instance.root_file.study,
+        emit(
+            organization_id=dr.study.organization_id,
+            study_id=instance.root_file.study_id,
             file=instance.root_file,
             version=instance,
             user=instance.creator,
@@ -101,4 +102,4 @@ def file_version_post_save(sender, instance, created, *args, **kwargs):
                 f"review {dr.pk}"
             ),
             event_type="DR_UPD",
-        ).save()
+        )
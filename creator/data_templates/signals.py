@@ -1,7 +1,7 @@
 from django.dispatch import receiver
 from django.db.models.signals import post_delete, post_save
 
-from creator.events.models import Event
+from creator.events.outbox import emit
 from creator.data_templates.models import DataTemplate, TemplateVersion
 
 
@@ -18,13 +18,13 @@ def data_template_post_save(sender, instance, created, **kwargs):
         et = "DT_UPD"
     username = getattr(instance.creator, "display_name", "Anonymous user")
 
-    Event(
-        organization=instance.organization,
+    emit(
+        organization_id=instance.organization_id,
         data_template=instance,
         user=instance.creator,
         description=f"{username} {verb} data template {instance.pk}",
         event_type=et,
-    ).save()
+    )
 
 
 @receiver(post_save, sender=TemplateVersion)
@@ -40,13 +40,13 @@ def template_version_post_save(sender, instance, created, **kwargs):
         et = "TV_UPD"
     username = getattr(instance.creator, "display_name", "Anonymous user")
 
-    Event(
-        organization=instance.organization,
+    emit(
+        organization_id=instance.data_template.organization_id,
         template_version=instance,
         user=instance.creator,
         description=f"{username} {verb} template version {instance.pk}",
         event_type=et,
-    ).save()
+    )
 
 
 @receiver(post_delete, sender=DataTemplate)
@@ -55,12 +55,12 @@ def data_template_post_delete(sender, instance, using, *args, **kwargs):
     Fire an event when a data template is deleted
     """
     username = getattr(instance.creator, "display_name", "Anonymous user")
-    Event(
-        organization=instance.organization,
+    emit(
+        organization_id=instance.organization_id,
         user=instance.creator,
         description=f"{username} deleted data template {instance.pk}",
         event_type="DT_DEL",
-    ).save()
+    )
 
 
 @receiver(post_delete, sender=TemplateVersion)
@@ -69,9 +69,9 @@ def template_version_post_delete(sender, instance, using, *args, **kwargs):
     Fire an event when a template version is deleted
     """
     username = getattr(instance.creator, "display_name", "Anonymous user")
-    Event(
-        organization=instance.organization,
+    emit(
+        organization_id=instance.data_template.organization_id,
         user=instance.creator,
         description=f"{username} deleted template version {instance.pk}",
         event_type="TV_DEL",
-    ).save()
+    )
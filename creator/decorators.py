@@ -1,18 +1,19 @@
 import sys
 import logging
+import resource
 import pytz
 import traceback
-from io import StringIO
+from contextvars import ContextVar
 from datetime import datetime
 from functools import wraps
+from rq import get_current_job
 from rq.utils import make_colorizer
-
-from django.conf import settings
-from django.core.files.base import ContentFile
-from django_s3_storage.storage import S3Storage
+from django.db import connection, transaction
 
 from creator.releases.models import Release, ReleaseTask
-from creator.jobs.models import Job, JobLog
+from creator.jobs.models import Job, JobLog, JobRun
+from creator.jobs.logs import LogShipper
+from creator.events.outbox import collect_events
 from creator.version_info import VERSION, COMMIT
 
 logger = logging.getLogger(__name__)
@@ -24,6 +25,35 @@ grey = make_colorizer("lightgray")
 red = make_colorizer("red")
 
 
+# The invocation of a task running in the current context
+_current_run = ContextVar("task_invocation", default=None)
+
+
+class _Invocation:
+    """
+    The state of a single call of a task. Each call has its own so that the
+    same task may run on several threads, or within itself, at once.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.start_time = datetime.utcnow()
+        self.query_count = 0
+        self.shipper = None
+        self.related_instances = []
+        self.new_log = None
+
+    def count_query(self, execute, sql, params, many, context):
+        """
+        Count the database queries made by the task function. Queries made
+        to ship the task's log output are not the task's own and are not
+        counted.
+        """
+        if self.shipper is None or not self.shipper.shipping:
+            self.query_count += 1
+        return execute(sql, params, many, context)
+
+
 class task:
     """
     A decorator to uniformly setup tasks that get enqueued for workers to
@@ -47,22 +77,35 @@ class task:
     def __init__(self, job=None, related_models=None):
         self.job = job
         self.logger = logging.getLogger("TaskLogger")
-        self.start_time = datetime.utcnow()
+        self.related_models = related_models or {}
 
-        self.stream = StringIO()
-        handler = logging.StreamHandler(self.stream)
+    def _capture_logs(self, run):
+        """
+        Install a handler that ships log output to the job logs while the
+        invocation runs. It must be removed with _release_logs when the
+        invocation ends. Only output logged in the invocation's own context
+        is captured, so other tasks running at the same time, or nested
+        within it, keep their output to themselves.
+        """
+        run.shipper = LogShipper()
         formatter = logging.Formatter(
             "[%(asctime)s] %(levelname)s: %(message)s"
         )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        run.shipper.setFormatter(formatter)
+        run.shipper.addFilter(lambda record: _current_run.get() is run)
+        self.logger.addHandler(run.shipper)
         # Add the handler to the base module to capture all log output
-        logging.getLogger("creator").addHandler(handler)
+        logging.getLogger("creator").addHandler(run.shipper)
 
-        self.related_models = related_models or {}
-        self.related_instances = []
+    def _release_logs(self, run):
+        """
+        Remove the invocation's log handler
+        """
+        self.logger.removeHandler(run.shipper)
+        logging.getLogger("creator").removeHandler(run.shipper)
+        run.shipper.close()
 
-    def _resolve_related(self, *args, **kwargs):
+    def _resolve_related(self, run, *args, **kwargs):
         """
         Attempt to resolve arguments to the task to a model instance in the
         database so we can link them back at save.
@@ -92,13 +135,13 @@ class task:
                 )
                 continue
 
-            self.related_instances.append(instance)
+            run.related_instances.append(instance)
 
-    def _attach_related(self, log):
+    def _attach_related(self, run, log):
         """
         Attaches a given log to any related instances that are stored
         """
-        for instance in self.related_instances:
+        for instance in run.related_instances:
             # Only update if the job_log has not yet been saved, otherwise will
             # throw a 'did not affect any rows' error.
             if instance.job_log is None:
@@ -109,141 +152,173 @@ class task:
         @wraps(f)
         def task_wrapper(*args, **kwargs):
             try:
-                self._job = Job.objects.get(name=self.job)
+                job = Job.objects.get(name=self.job)
             except Job.DoesNotExist:
                 logger.info(
                     f"The {self.job} job does not exist. "
                     "Registering a new unscheduled-job for it."
                 )
-                self._job = Job(name=self.job, active=True, scheduled=False)
+                job = Job(name=self.job, active=True, scheduled=False)
 
-            if not self._job.active:
-                logger.info(
-                    f"The {self._job.name} job is not active, will not run"
-                )
+            if not job.active:
+                logger.info(f"The {job.name} job is not active, will not run")
                 return
 
-            self._resolve_related(*args, **kwargs)
+            run = _Invocation(job)
+            token = _current_run.set(run)
+            self._capture_logs(run)
+            try:
+                self._run(run, f, *args, **kwargs)
+            finally:
+                self._release_logs(run)
+                _current_run.reset(token)
+
+        return task_wrapper
 
-            self.log_preamble()
+    def _run(self, run, f, *args, **kwargs):
+        """
+        Run the task function and record the outcome on the Job and its logs
+        """
+        self._resolve_related(run, *args, **kwargs)
 
-            # Used to store any exception that gets raised during execution
-            exception = None
+        self.log_preamble(run)
+        run.shipper.job_logs = self._open_job_logs(run)
+        run.shipper.flush()
 
-            try:
-                f(*args, **kwargs)
-            except Exception as err:
-                exception = err
-                logger.error(
-                    red(
-                        f"There was a problem running the job:\n"
-                        f"{traceback.format_exc()}"
-                    )
-                )
-                self._job.failing = True
-                self._job.last_error = str(err)
-            else:
-                self._job.failing = False
-                self._job.last_error = ""
+        # Used to store any exception that gets raised during execution
+        exception = None
 
-            self._job.last_run = datetime.utcnow()
-            self._job.last_run = self._job.last_run.replace(tzinfo=pytz.UTC)
-            self._job.save()
+        try:
+            with connection.execute_wrapper(run.count_query):
+                with collect_events():
+                    f(*args, **kwargs)
+        except Exception as err:
+            exception = err
+            logger.error(
+                red(
+                    f"There was a problem running the job:\n"
+                    f"{traceback.format_exc()}"
+                )
+            )
+            run.job.failing = True
+            run.job.last_error = str(err)
+        else:
+            run.job.failing = False
+            run.job.last_error = ""
 
-            self.close()
+        run.job.last_run = datetime.utcnow()
+        run.job.last_run = run.job.last_run.replace(tzinfo=pytz.UTC)
+        run.job.save()
 
-            # If there was some exception, throw it now after the Job status
-            # has been updated
-            if exception:
-                raise exception
+        self._record_run(run)
+        self.close(run)
 
-        return task_wrapper
+        # If there was some exception, throw it now after the Job status
+        # has been updated
+        if exception:
+            raise exception
 
-    def close(self):
+    def _record_run(self, run):
         """
-        Close out the log stream for the task by appending it with a couple
-        final details.
-        A new log will be created or an existing log will be appended if the
-        there is already a log existing for the Job invocation.
+        Save the execution metrics of the invocation for the Job
         """
-        duration = (datetime.utcnow() - self.start_time).total_seconds()
+        duration = (datetime.utcnow() - run.start_time).total_seconds()
 
-        # Retrieve any existing job logs from related models so we can append
-        # this session's log output to them. If there are no existing logs,
-        # we will create a new one
-        job_logs = self._get_existing_job_logs()
-        if len(job_logs) == 0:
-            job_logs = [JobLog(job=self._job, error=self._job.failing)]
+        # The time the job spent in the queue is only known when the task is
+        # run by a worker
+        queue_wait = None
+        rq_job = get_current_job()
+        if rq_job is not None and rq_job.enqueued_at is not None:
+            queue_wait = (run.start_time - rq_job.enqueued_at).total_seconds()
+            queue_wait = max(queue_wait, 0)
 
-        self.logger.info(
-            f"Job complete after {duration:.2f}s. "
-            f"Saving to Job Logs: "
-            f"{', '.join(yellow(str(log.id)) for log in job_logs)}, "
-            f"goodbye! 👋"
-        )
+        # Workers run each job in a forked work horse, so the peak for the
+        # process is the peak for the job
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
 
-        for job_log in job_logs:
-            job_log = self._append_previous_log(job_log)
-            if job_log:
-                self._attach_related(job_log)
+        try:
+            with transaction.atomic():
+                JobRun(
+                    job=run.job,
+                    started_at=run.start_time.replace(tzinfo=pytz.UTC),
+                    duration=duration,
+                    queue_wait=queue_wait,
+                    query_count=run.query_count,
+                    peak_rss=peak_rss,
+                    failed=run.job.failing,
+                ).save()
+                JobRun.prune(run.job)
+        except Exception as err:
+            self.logger.error(f"Could not record job metrics: {err}")
 
-    def _append_previous_log(self, job_log):
+    def _open_job_logs(self, run):
         """
-        Append a given job_log's file with the log stream from this session
+        Resolve the job logs that the invocation's output will be shipped to.
+        Existing logs of related instances will be appended to, otherwise a
+        new log is created and attached to the related instances so that the
+        output may be followed while the job runs.
         """
-        # Need to manually configure the log's bucket if we're using S3 storage
-        if (
-            settings.DEFAULT_FILE_STORAGE
-            == "django_s3_storage.storage.S3Storage"
-        ):
-            job_log.log_file.storage = S3Storage(
-                aws_s3_bucket_name=settings.LOG_BUCKET
-            )
+        job_logs = self._get_existing_job_logs(run)
+        if len(job_logs) > 0:
+            return list(job_logs)
 
-        existing_log_contents = ""
-        # This may be a new log with no log file saved yet so don't panic
-        # if there is no contents to read
         try:
-            existing_log_contents = job_log.log_file.open().read().decode()
-            name = job_log.log_file.name
-            # The logging directory is included in the name already and will
-            # be prepended when we write back to the storage, so remove it now
-            name = name.replace(f"{settings.LOG_DIR}", "")
-        except ValueError:
-            name = (
-                f"{datetime.utcnow().strftime('%Y/%m/%d/')}"
-                f"{int(datetime.utcnow().timestamp())}_{self._job.name}.log"
-            )
+            if run.job._state.adding:
+                run.job.save()
+            job_log = JobLog(job=run.job)
+            job_log.save()
         except Exception as err:
-            self.logger.warning(f"Could not read log file to append to: {err}")
-            return
+            self.logger.error(f"Could not create job log: {err}")
+            return []
+
+        self._attach_related(run, job_log)
+        run.new_log = job_log
+        return [job_log]
+
+    def close(self, run):
+        """
+        Close out the log stream for the task by appending it with a couple
+        final details and shipping any output that has not yet been written.
+        """
+        duration = (datetime.utcnow() - run.start_time).total_seconds()
+        job_logs = run.shipper.job_logs
+
+        self.logger.info(
+            f"Job complete after {duration:.2f}s. "
+            f"Saving to Job Logs: "
+            f"{', '.join(yellow(str(log.id)) for log in job_logs)}, "
+            f"goodbye! 👋"
+        )
 
-        content = existing_log_contents + self.stream.getvalue()
         try:
-            job_log.log_file.save(name, ContentFile(content))
-            job_log.save()
+            run.shipper.flush()
         except Exception as err:
             self.logger.error(f"Could not write log file: {err}")
-            return
-        return job_log
+        finally:
+            run.shipper.job_logs = []
+
+        # Only logs created by this invocation reflect its outcome
+        if run.new_log is not None and run.job.failing:
+            run.new_log.error = True
+            run.new_log.save(update_fields=["error"])
 
-    def _get_existing_job_logs(self):
+    def _get_existing_job_logs(self, run):
         """
         Resolve the unique set of related instances' job_logs
         """
         return {
             instance.job_log
-            for instance in self.related_instances
+            for instance in run.related_instances
             if instance.job_log is not None
         }
 
-    def log_preamble(self):
+    def log_preamble(self, run):
         """
         Post some info about the codebase to the start of the log.
         If the job invocation already has a log, don't log the header as it's
         already been included in an earlier log.
         """
-        job_logs = self._get_existing_job_logs()
+        job_logs = self._get_existing_job_logs(run)
         if len(job_logs) > 0:
             self.logger.info("")
             self.logger.info(
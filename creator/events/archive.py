@@ -0,0 +1,125 @@
+"""
+Retention of the Event table.
+
+Events are written for nearly every action taken in the Study Creator and
+by every scheduled sync, so the table grows without bound. Events older
+than EVENT_RETENTION_DAYS are moved into EventArchives, one per day, so that
+the table only holds recent events while old events remain available.
+"""
+import gzip
+import json
+import logging
+from io import BytesIO
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from creator.events.models import Event, EventArchive, _use_archive_storage
+
+logger = logging.getLogger(__name__)
+
+
+def retention_cutoff(days=None):
+    """
+    The time before which events are archived. Always the start of a day so
+    that only whole days are archived.
+    """
+    if days is None:
+        days = settings.EVENT_RETENTION_DAYS
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days)
+
+
+def archive_events(before=None, batch_size=None):
+    """
+    Move all events created before _before_ into daily archives, oldest day
+    first. Defaults to archiving events past the retention period.
+    Returns the archives that were created.
+    """
+    if before is None:
+        before = retention_cutoff()
+    batch_size = batch_size or settings.EVENT_ARCHIVE_BATCH_SIZE
+
+    archives = []
+    while True:
+        oldest = (
+            Event.objects.filter(created_at__lt=before)
+            .order_by("created_at")
+            .values_list("created_at", flat=True)
+            .first()
+        )
+        if oldest is None:
+            break
+
+        start = oldest.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = min(start + timedelta(days=1), before)
+        archive = archive_range(start, end, batch_size)
+        archives.append(archive)
+        logger.info(
+            f"Archived {archive.event_count} events from "
+            f"{start.date().isoformat()} to {archive.archive_file.name}"
+        )
+
+    return archives
+
+
+def archive_range(start, end, batch_size=None):
+    """
+    Write all events created in [start, end) to a new archive and remove
+    them from the Event table
+    """
+    batch_size = batch_size or settings.EVENT_ARCHIVE_BATCH_SIZE
+    events = Event.objects.filter(created_at__gte=start, created_at__lt=end)
+
+    buffer = BytesIO()
+    ids = []
+    with gzip.GzipFile(fileobj=buffer, mode="wb") as f:
+        for event in (
+            events.order_by("created_at", "id")
+            .values()
+            .iterator(chunk_size=batch_size)
+        ):
+            ids.append(event["id"])
+            line = json.dumps(event, cls=DjangoJSONEncoder)
+            f.write(line.encode("utf-8") + b"\n")
+
+    archive = EventArchive(start=start, end=end, event_count=len(ids))
+    _use_archive_storage(archive.archive_file)
+    now = datetime.utcnow()
+    name = f"{start.strftime('%Y/%m/%d')}_{int(now.timestamp())}.jsonl.gz"
+    archive.archive_file.save(name, ContentFile(buffer.getvalue()), save=False)
+
+    # Only the events that were written to the archive are removed so that
+    # any written concurrently with an old timestamp are kept for next time
+    with transaction.atomic():
+        archive.save()
+        for i in range(0, len(ids), batch_size):
+            Event.objects.filter(id__in=ids[i:i + batch_size]).delete()
+
+    return archive
+
+
+def archived_events(start=None, end=None, **filters):
+    """
+    Yield archived events created in [start, end), oldest first, that match
+    the given column _filters_.
+    """
+    archives = EventArchive.objects.order_by("start", "created_at")
+    if start is not None:
+        archives = archives.filter(end__gt=start)
+    if end is not None:
+        archives = archives.filter(start__lt=end)
+
+    for archive in archives.iterator():
+        for event in archive.events(**filters):
+            created_at = parse_datetime(event["created_at"])
+            if start is not None and created_at < start:
+                continue
+            if end is not None and created_at >= end:
+                continue
+            yield event
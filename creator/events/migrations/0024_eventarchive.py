@@ -0,0 +1,30 @@
+# Generated by Django 2.2.26 on 2026-10-19 12:00
+
+import creator.events.models
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0023_event_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventArchive',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('start', models.DateTimeField(help_text='The earliest time an event in the archive may be from')),
+                ('end', models.DateTimeField(help_text='The time all events in the archive are from before')),
+                ('event_count', models.PositiveIntegerField(help_text='The number of events in the archive')),
+                ('archive_file', models.FileField(help_text='The location where the archived events are stored', max_length=1024, upload_to=creator.events.models._get_archive_directory)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Time the archive was created')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='eventarchive',
+            index=models.Index(fields=['start', 'end'], name='events_archive_range_idx'),
+        ),
+    ]
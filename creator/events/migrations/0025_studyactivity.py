@@ -0,0 +1,58 @@
+# Generated by Django 2.2.26 on 2026-10-19 12:00
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+import django.db.models.deletion
+
+
+def rollup_events(apps, schema_editor):
+    """
+    Count the existing events of each study by hour and type
+    """
+    Event = apps.get_model("events", "Event")
+    StudyActivity = apps.get_model("events", "StudyActivity")
+
+    activity = (
+        Event.objects.filter(study__isnull=False)
+        .annotate(hour=TruncHour("created_at"))
+        .values("study_id", "hour", "event_type")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    StudyActivity.objects.bulk_create(
+        (StudyActivity(**row) for row in activity.iterator()),
+        batch_size=1000,
+    )
+
+
+def delete_activity(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0024_eventarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudyActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(help_text='The start of the hour the events happened in')),
+                ('event_type', models.CharField(help_text='The type of the events', max_length=6)),
+                ('count', models.PositiveIntegerField(default=0, help_text='The number of events')),
+                ('study', models.ForeignKey(help_text='The study the events happened in', on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='studies.Study')),
+            ],
+            options={
+                'unique_together': {('study', 'hour', 'event_type')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='studyactivity',
+            index=models.Index(fields=['hour'], name='events_activity_hour_idx'),
+        ),
+        migrations.RunPython(rollup_events, delete_activity),
+    ]
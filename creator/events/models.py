@@ -1,5 +1,11 @@
+import os
+import gzip
+import json
 import uuid
-from django.db import models
+from collections import Counter
+from django.conf import settings
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from creator.studies.models import Study
@@ -11,6 +17,7 @@ from creator.data_reviews.models import DataReview
 from creator.ingest_runs.models import IngestRun, ValidationRun
 from creator.data_templates.models import DataTemplate, TemplateVersion
 from creator.referral_tokens.models import ReferralToken
+from django_s3_storage.storage import S3Storage
 
 User = get_user_model()
 
@@ -28,6 +35,18 @@ class Event(models.Model):
                 "Can view all events in studies user is a member of",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="events_created_idx"
+            ),
+            models.Index(
+                fields=["study", "created_at"], name="events_study_created_idx"
+            ),
+            models.Index(
+                fields=["event_type", "created_at"],
+                name="events_type_created_idx",
+            ),
+        ]
 
     uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     created_at = models.DateTimeField(
@@ -214,3 +233,135 @@ class Event(models.Model):
         related_name="events",
         help_text="Referral token related to this event",
     )
+
+
+def _get_archive_directory(instance, filename):
+    """
+    Resolves the directory where an event archive should be stored
+    """
+    return os.path.join(settings.EVENT_ARCHIVE_DIR, filename)
+
+
+def _use_archive_storage(archive_file):
+    """
+    Need to manually configure an archive's bucket if using S3 storage
+    """
+    if settings.DEFAULT_FILE_STORAGE == "django_s3_storage.storage.S3Storage":
+        archive_file.storage = S3Storage(
+            aws_s3_bucket_name=settings.EVENT_ARCHIVE_BUCKET
+        )
+
+
+class EventArchive(models.Model):
+    """
+    Events that were removed from the Event table after their retention
+    period. Each archive holds the events of one day as gzipped JSON lines,
+    one event per line.
+    """
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["start", "end"], name="events_archive_range_idx"
+            )
+        ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    start = models.DateTimeField(
+        help_text="The earliest time an event in the archive may be from"
+    )
+    end = models.DateTimeField(
+        help_text="The time all events in the archive are from before"
+    )
+    event_count = models.PositiveIntegerField(
+        help_text="The number of events in the archive"
+    )
+    archive_file = models.FileField(
+        upload_to=_get_archive_directory,
+        max_length=1024,
+        help_text="The location where the archived events are stored",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        null=False,
+        help_text="Time the archive was created",
+    )
+
+    def events(self, **filters):
+        """
+        Yield the archived events, as dicts of their column values, that
+        match all of the given _filters_. Filters compare a column to a
+        value, eg: events(study_id="SD_00000000", event_type="SF_CRE")
+        """
+        _use_archive_storage(self.archive_file)
+        with self.archive_file.open("rb") as f:
+            with gzip.open(f, "rt", encoding="utf-8") as lines:
+                for line in lines:
+                    event = json.loads(line)
+                    if all(
+                        event.get(key) == value
+                        for key, value in filters.items()
+                    ):
+                        yield event
+
+
+class StudyActivity(models.Model):
+    """
+    The number of events of each type that happened in a study during each
+    hour. Kept up to date as events are created so that summaries of recent
+    activity don't need to count events.
+    """
+
+    class Meta:
+        unique_together = ("study", "hour", "event_type")
+        indexes = [
+            models.Index(fields=["hour"], name="events_activity_hour_idx")
+        ]
+
+    study = models.ForeignKey(
+        Study,
+        on_delete=models.CASCADE,
+        related_name="activity",
+        help_text="The study the events happened in",
+    )
+    hour = models.DateTimeField(
+        help_text="The start of the hour the events happened in"
+    )
+    event_type = models.CharField(
+        max_length=6, help_text="The type of the events"
+    )
+    count = models.PositiveIntegerField(
+        default=0, help_text="The number of events"
+    )
+
+    @classmethod
+    def record(cls, events):
+        """
+        Add the given new _events_ to the activity of their studies
+        """
+        counts = Counter(
+            (
+                event.study_id,
+                event.created_at.replace(minute=0, second=0, microsecond=0),
+                event.event_type,
+            )
+            for event in events
+            if event.study_id is not None
+        )
+        for (study_id, hour, event_type), count in counts.items():
+            activity = cls.objects.filter(
+                study_id=study_id, hour=hour, event_type=event_type
+            )
+            if activity.update(count=F("count") + count):
+                continue
+            try:
+                with transaction.atomic():
+                    cls(
+                        study_id=study_id,
+                        hour=hour,
+                        event_type=event_type,
+                        count=count,
+                    ).save()
+            except IntegrityError:
+                # Created concurrently since we tried to update it
+                activity.update(count=F("count") + count)
@@ -0,0 +1,123 @@
+"""
+An outbox for events emitted by signal handlers.
+
+Events emitted while collecting, such as during a GraphQL operation or a
+task, are held until the collection ends and are then written with a single
+insert. When the collected work runs inside a transaction, its events are
+written in that same transaction and are committed or rolled back with it.
+Events emitted outside of a collection are saved immediately.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import IntegrityError, connection, transaction
+
+from creator.events.models import Event, StudyActivity
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def emit(**fields):
+    """
+    Create a new Event with the given fields, deferring its write to the end
+    of the current collection if there is one
+    """
+    event = Event(**fields)
+    pending = getattr(_local, "pending", None)
+    if pending is None:
+        event.save()
+    else:
+        pending.append(event)
+    return event
+
+
+@contextmanager
+def collect_events():
+    """
+    Collect the events emitted inside the block and write them once the
+    block exits. A collection started inside another joins the outer one.
+    """
+    if getattr(_local, "pending", None) is not None:
+        yield
+        return
+
+    _local.pending = []
+    try:
+        yield
+    finally:
+        pending, _local.pending = _local.pending, None
+        flush(pending)
+
+
+def flush(events):
+    """
+    Write the given events in one insert and add them to their studies'
+    activity. A failure to save events is logged rather than failing the
+    work that emitted them.
+
+    Events may refer to objects that were deleted later in the same
+    collection, such as the file of an event emitted while the file's
+    versions were being deleted. If so, those references are cleared and
+    the events are saved one at a time so that no others are lost.
+    """
+    if not events:
+        return
+    try:
+        _write(events)
+    except IntegrityError as err:
+        logger.warning(
+            f"Could not save {len(events)} events at once, saving them "
+            f"individually: {err}"
+        )
+        _clear_missing_relations(events)
+        _write_each(events)
+    except Exception as err:
+        logger.error(f"Could not save {len(events)} events: {err}")
+
+
+def _write(events):
+    with transaction.atomic():
+        Event.objects.bulk_create(events)
+        # Foreign keys are only checked when the transaction commits, so
+        # check them now to fail here rather than in the caller's commit
+        connection.check_constraints()
+        StudyActivity.record(events)
+
+
+def _clear_missing_relations(events):
+    """
+    Clear the nullable relations of the events that refer to objects which
+    no longer exist
+    """
+    for field in Event._meta.concrete_fields:
+        if not field.is_relation or not field.null:
+            continue
+        ids = {getattr(event, field.attname) for event in events}
+        ids.discard(None)
+        if not ids:
+            continue
+        existing = set(
+            field.related_model._default_manager.filter(
+                pk__in=ids
+            ).values_list("pk", flat=True)
+        )
+        for event in events:
+            if getattr(event, field.attname) not in existing:
+                setattr(event, field.name, None)
+
+
+def _write_each(events):
+    for event in events:
+        event.pk = None
+        try:
+            with transaction.atomic():
+                event.save()
+                connection.check_constraints()
+        except Exception as err:
+            logger.error(
+                f"Could not save {event.event_type} event "
+                f"'{event.description}': {err}"
+            )
@@ -1,19 +1,134 @@
+import base64
+from itertools import islice
+
 import graphene
 import django_filters
 from graphene import relay, ObjectType, Field
 from graphene_django import DjangoObjectType
 from graphene_django.filter import DjangoFilterConnectionField
 from django_filters import OrderingFilter
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 from graphql import GraphQLError
 
-from creator.events.models import Event
+from creator.events.models import Event, EventArchive
+from creator.events.archive import archived_events
+
+
+class EventConnection(graphene.Connection):
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int(
+        description="The total number of events. Only counted when requested"
+    )
+
+    def resolve_total_count(root, info, **kwargs):
+        return root.iterable.count()
 
 
 class EventNode(DjangoObjectType):
     class Meta:
         model = Event
         interfaces = (relay.Node,)
+        connection_class = EventConnection
+
+
+def _encode_cursor(event):
+    value = f"{event.created_at.isoformat()}|{event.pk}"
+    return base64.b64encode(value.encode("utf-8")).decode("utf-8")
+
+
+def _decode_cursor(cursor):
+    try:
+        value = base64.b64decode(cursor.encode("utf-8")).decode("utf-8")
+        created_at, pk = value.split("|")
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError
+        return created_at, int(pk)
+    except (ValueError, UnicodeDecodeError, TypeError):
+        raise GraphQLError(f"Invalid cursor: {cursor}")
+
+
+class KeysetConnectionField(DjangoFilterConnectionField):
+    """
+    A connection of events that is paginated by (created_at, id) rather than
+    by offset so that pages deep in the feed are as fast to fetch as the
+    first. Cursors encode the created_at and id of their event, and the
+    total count is only computed if requested.
+
+    Events are ordered by oldest first unless ordered by -created_at.
+    Requests that use the offset argument are paginated by offset.
+    """
+
+    @classmethod
+    def resolve_connection(cls, connection, args, iterable, max_limit=None):
+        if args.get("offset"):
+            return super().resolve_connection(
+                connection, args, iterable, max_limit=max_limit
+            )
+        args.pop("offset", None)
+
+        descending = list(iterable.query.order_by[:1]) == ["-created_at"]
+        first = args.get("first")
+        last = args.get("last")
+        after = args.get("after")
+        before = args.get("before")
+
+        queryset = iterable
+        if after:
+            queryset = queryset.filter(cls._after(after, descending))
+        if before:
+            queryset = queryset.filter(cls._after(before, not descending))
+
+        # Paginating backwards from the end of the list reverses the order
+        # which is then restored once the page is fetched
+        backwards = last is not None and first is None
+        limit = (last if backwards else first) or max_limit
+        order = ["created_at", "id"]
+        if descending != backwards:
+            order = ["-created_at", "-id"]
+        queryset = queryset.order_by(*order)
+
+        if limit is None:
+            events = list(queryset)
+            has_more = False
+        else:
+            events = list(queryset[:limit + 1])
+            has_more = len(events) > limit
+            events = events[:limit]
+        if backwards:
+            events.reverse()
+
+        edges = [
+            connection.Edge(node=event, cursor=_encode_cursor(event))
+            for event in events
+        ]
+        page_info = relay.PageInfo(
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+            has_previous_page=has_more if backwards else bool(after),
+            has_next_page=bool(before) if backwards else has_more,
+        )
+        connection = connection(edges=edges, page_info=page_info)
+        connection.iterable = iterable
+        return connection
+
+    @staticmethod
+    def _after(cursor, descending):
+        """
+        Filter for the events that follow the cursor in the given order
+        """
+        created_at, pk = _decode_cursor(cursor)
+        if descending:
+            return Q(created_at__lt=created_at) | Q(
+                created_at=created_at, id__lt=pk
+            )
+        return Q(created_at__gt=created_at) | Q(
+            created_at=created_at, id__gt=pk
+        )
 
 
 class EventFilter(django_filters.FilterSet):
@@ -43,11 +158,73 @@ class EventFilter(django_filters.FilterSet):
     order_by = OrderingFilter(fields=("created_at",))
 
 
+class EventArchiveNode(DjangoObjectType):
+    class Meta:
+        model = EventArchive
+        interfaces = (relay.Node,)
+        filter_fields = {"start": ["lt", "gte"], "end": ["gt", "lte"]}
+
+
+class ArchivedEvent(ObjectType):
+    """
+    An event that has been moved from the event table into an archive.
+    Related objects are given by their primary keys.
+    """
+
+    uuid = graphene.UUID()
+    created_at = graphene.DateTime()
+    event_type = graphene.String()
+    description = graphene.String()
+    organization = graphene.String()
+    study = graphene.String()
+    file = graphene.String()
+    version = graphene.String()
+    user = graphene.String()
+    data_review = graphene.String()
+
+    def resolve_created_at(root, info):
+        return parse_datetime(root["created_at"])
+
+    def resolve_organization(root, info):
+        return root.get("organization_id")
+
+    def resolve_study(root, info):
+        return root.get("study_id")
+
+    def resolve_file(root, info):
+        return root.get("file_id")
+
+    def resolve_version(root, info):
+        return root.get("version_id")
+
+    def resolve_user(root, info):
+        return root.get("user_id")
+
+    def resolve_data_review(root, info):
+        return root.get("data_review_id")
+
+
 class Query(object):
-    all_events = DjangoFilterConnectionField(
+    all_events = KeysetConnectionField(
         EventNode, filterset_class=EventFilter, description="List all events"
     )
 
+    all_event_archives = DjangoFilterConnectionField(
+        EventArchiveNode, description="List all event archives"
+    )
+    archived_events = graphene.List(
+        ArchivedEvent,
+        created_after=graphene.DateTime(required=True),
+        created_before=graphene.DateTime(required=True),
+        study_kf_id=graphene.String(),
+        event_type=graphene.String(),
+        first=graphene.Int(default_value=1000),
+        description=(
+            "Search the archives for events created in the given range. "
+            "Only archives overlapping the range are read."
+        ),
+    )
+
     def resolve_all_events(self, info, **kwargs):
         """
         Resolves events for given user
@@ -63,3 +240,38 @@ class Query(object):
             return Event.objects.filter(study__in=user.studies.all())
 
         raise GraphQLError("Not allowed")
+
+    def resolve_all_event_archives(self, info, **kwargs):
+        """
+        Only admins may list the event archives
+        """
+        user = info.context.user
+        if not user.has_perm("events.view_event"):
+            raise GraphQLError("Not allowed")
+        return EventArchive.objects.all()
+
+    def resolve_archived_events(
+        self,
+        info,
+        created_after,
+        created_before,
+        study_kf_id=None,
+        event_type=None,
+        first=1000,
+        **kwargs,
+    ):
+        """
+        Only admins may search the event archives
+        """
+        user = info.context.user
+        if not user.has_perm("events.view_event"):
+            raise GraphQLError("Not allowed")
+
+        filters = {}
+        if study_kf_id is not None:
+            filters["study_id"] = study_kf_id
+        if event_type is not None:
+            filters["event_type"] = event_type
+
+        events = archived_events(created_after, created_before, **filters)
+        return list(islice(events, first))
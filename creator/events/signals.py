@@ -1,7 +1,8 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from creator.files.models import File, Version
-from .models import Event
+from .models import Event, StudyActivity
+from .outbox import emit
 
 
 @receiver(post_save, sender=File)
@@ -15,15 +16,14 @@ def new_file(signal, sender, instance, created, **kwargs):
     username = getattr(instance.creator, "display_name", "Anonymous user")
     message = f"{username} created file {instance.kf_id}"
 
-    event = Event(
-        organization=instance.study.organization,
+    emit(
+        organization_id=instance.study.organization_id,
         file=instance,
-        study=instance.study,
+        study_id=instance.study_id,
         user=instance.creator,
         description=message,
         event_type="SF_CRE",
     )
-    event.save()
 
 
 @receiver(post_delete, sender=File)
@@ -33,14 +33,13 @@ def delete_file(signal, sender, instance, **kwargs):
     """
     username = getattr(instance.creator, "display_name", "Anonymous user")
     message = f"{username} deleted file {instance.kf_id}"
-    event = Event(
-        organization=instance.study.organization,
-        study=instance.study,
+    emit(
+        organization_id=instance.study.organization_id,
+        study_id=instance.study_id,
         user=instance.creator,
         description=message,
         event_type="SF_DEL",
     )
-    event.save()
 
 
 @receiver(post_save, sender=Version)
@@ -72,8 +71,8 @@ def new_version(signal, sender, instance, created, **kwargs):
         # event if this is somehow the case.
         return
 
-    ev = Event(
-        organization=study.organization,
+    emit(
+        organization_id=study.organization_id,
         study=study,
         file=instance.root_file,
         version=instance,
@@ -81,4 +80,13 @@ def new_version(signal, sender, instance, created, **kwargs):
         description=message,
         event_type=event_type,
     )
-    ev.save()
+
+
+@receiver(post_save, sender=Event)
+def new_event(signal, sender, instance, created, **kwargs):
+    """
+    Add new events to their study's activity. Events written in bulk by the
+    outbox are recorded when they are written.
+    """
+    if created:
+        StudyActivity.record([instance])
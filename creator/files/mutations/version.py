@@ -9,6 +9,7 @@ from graphql_relay import from_global_id
 from botocore.exceptions import ClientError
 
 from creator.analyses.analyzer import analyze_version
+from creator.authorization import get_authorization
 from creator.studies.models import Study
 from creator.files.models import File, Version
 from creator.files.nodes.version import VersionNode
@@ -259,7 +260,6 @@ class EvaluateTemplateMatchMutation(graphene.Mutation):
         file belongs to. See creator.files.utils.evaluate_template_match
         for details
         """
-        user = info.context.user
         file_version = input.get("file_version")
         study = input.get("study")
 
@@ -282,16 +282,13 @@ class EvaluateTemplateMatchMutation(graphene.Mutation):
             raise GraphQLError(f"Study {study_id} does not exist")
 
         # Check permissions - user should be able to view file and study
+        auth = get_authorization(info.context)
         allowed_view_file = (
-            user.has_perm("files.view_file")
-            or user.has_perm("files.view_my_file")
+            auth.has_perm("files.view_file")
+            or auth.has_perm("files.view_my_file")
         )
-        allowed_view_study = (
-            user.has_perm("studies.view_study")
-            or (
-                user.has_perm("studies.view_my_study")
-                and user.studies.filter(kf_id=study.pk).exists()
-            )
+        allowed_view_study = auth.has_study_perm(
+            "studies.view_study", "studies.view_my_study", study.pk
         )
         if not (allowed_view_file and allowed_view_study):
             raise GraphQLError("Not allowed")
@@ -6,6 +6,7 @@ from graphene_django.filter import DjangoFilterConnectionField
 from graphql import GraphQLError
 
 from ..models import File, FileType as FileTypeEnum
+from creator.authorization import get_authorization
 from creator.analyses.file_types import FILE_TYPES
 from creator.files.nodes.version import VersionNode
 from creator.files.schema.version import VersionFilter
@@ -48,10 +49,9 @@ class FileNode(DjangoObjectType):
         except cls._meta.model.DoesNotExist:
             raise GraphQLError("File was not found")
 
-        user = info.context.user
-        if user.has_perm("files.view_file") or (
-            user.has_perm("files.view_my_file")
-            and user.studies.filter(kf_id=file.study.kf_id).exists()
+        auth = get_authorization(info.context)
+        if auth.has_study_perm(
+            "files.view_file", "files.view_my_file", file.study_id
         ):
             return file
 
@@ -5,6 +5,7 @@ from graphene_django import DjangoObjectType
 from graphql import GraphQLError
 
 from ..models import Version
+from creator.authorization import get_authorization
 
 
 class VersionNode(DjangoObjectType):
@@ -29,14 +30,17 @@ class VersionNode(DjangoObjectType):
         Only return node if user is an admin or is in the study group
         """
         try:
-            obj = cls._meta.model.objects.get(kf_id=kf_id)
+            obj = cls._meta.model.objects.select_related("root_file").get(
+                kf_id=kf_id
+            )
         except cls._meta.model.DoesNotExist:
             raise GraphQLError("Version was not found")
 
-        user = info.context.user
-        if user.has_perm("files.view_version") or (
-            user.has_perm("files.view_my_version")
-            and user.studies.filter(kf_id=obj.root_file.study.kf_id).exists()
+        auth = get_authorization(info.context)
+        if auth.has_perm("files.view_version") or (
+            auth.has_perm("files.view_my_version")
+            and obj.root_file is not None
+            and auth.is_member(obj.root_file.study_id)
         ):
             return obj
 
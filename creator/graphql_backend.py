@@ -0,0 +1,118 @@
+"""
+Caching of parsed and validated GraphQL documents and persisted queries.
+
+The api's clients send a small, fixed set of operations, so each distinct
+document only needs to be parsed and validated against the schema once per
+process. Clients may also register a query once and afterwards refer to it
+only by its sha256 hash, following the Apollo automatic persisted query
+protocol.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql import parse, validate, execute
+from graphql.backend.core import GraphQLCoreBackend
+from graphql.backend.base import GraphQLDocument
+from graphql.execution import ExecutionResult
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class CachedDocumentBackend(GraphQLCoreBackend):
+    """
+    A GraphQL backend that keeps the most recently used valid documents in an
+    LRU cache keyed by the hash of their query so that they are executed
+    without being parsed or validated again.
+    """
+
+    def __init__(self, max_size=None, executor=None):
+        super().__init__(executor=executor)
+        self.max_size = max_size
+        self.documents = OrderedDict()
+        self.lock = threading.Lock()
+
+    def document_from_string(self, schema, document_string):
+        if not isinstance(document_string, str):
+            return super().document_from_string(schema, document_string)
+
+        key = (id(schema), query_hash(document_string))
+        with self.lock:
+            document = self.documents.get(key)
+            if document is not None:
+                self.documents.move_to_end(key)
+                return document
+
+        document_ast = parse(document_string)
+        errors = validate(schema, document_ast)
+        if errors:
+            # Invalid documents are not cached
+            return GraphQLDocument(
+                schema=schema,
+                document_string=document_string,
+                document_ast=document_ast,
+                execute=partial(_invalid, errors),
+            )
+
+        document = GraphQLDocument(
+            schema=schema,
+            document_string=document_string,
+            document_ast=document_ast,
+            execute=partial(
+                execute, schema, document_ast, **self.execute_params
+            ),
+        )
+
+        max_size = self.max_size or settings.GRAPHQL_DOCUMENT_CACHE_SIZE
+        with self.lock:
+            self.documents[key] = document
+            while len(self.documents) > max_size:
+                self.documents.popitem(last=False)
+
+        return document
+
+
+def _invalid(errors, *args, **kwargs):
+    return ExecutionResult(errors=errors, invalid=True)
+
+
+document_backend = CachedDocumentBackend()
+
+
+class PersistedQueryNotFound(Exception):
+    """
+    The client referred to a persisted query that has not been registered
+    """
+
+    def __init__(self):
+        super().__init__("PersistedQueryNotFound")
+
+
+def resolve_persisted_query(query, persisted):
+    """
+    Resolve the query for a request's persistedQuery extension.
+
+    If the query is provided, it is registered under its hash so later
+    requests may send only the hash. Otherwise, the registered query for the
+    hash is returned.
+    """
+    sha = persisted.get("sha256Hash")
+    if not sha:
+        raise ValueError("persistedQuery must include a sha256Hash")
+
+    key = f"PERSISTED_QUERY:{sha}"
+    if query:
+        if query_hash(query) != sha:
+            raise ValueError("provided sha does not match query")
+        cache.set(key, query, settings.GRAPHQL_PERSISTED_QUERY_TIMEOUT)
+        return query
+
+    query = cache.get(key)
+    if query is None:
+        raise PersistedQueryNotFound()
+    return query
@@ -0,0 +1,124 @@
+"""
+Per-operation performance profiles of GraphQL requests.
+
+Each operation records its total time and the SQL queries it makes,
+including statements that are repeated, which usually indicate an N+1
+lookup in a resolver. When GRAPHQL_PROFILE_RESOLVERS is enabled, the time
+spent in each resolver is also recorded by the ProfilingMiddleware.
+"""
+import time
+import logging
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OperationProfile:
+    """
+    Timings and database queries of a single GraphQL operation
+    """
+
+    def __init__(self, operation_name=None):
+        self.operation_name = operation_name or "anonymous"
+        self.started = time.perf_counter()
+        self.duration = None
+        self.resolvers = defaultdict(float)
+        self.resolver_calls = Counter()
+        self.queries = Counter()
+
+    def record_query(self, execute, sql, params, many, context):
+        """
+        A database execute wrapper that counts each statement executed
+        """
+        self.queries[sql] += 1
+        return execute(sql, params, many, context)
+
+    def record_resolver(self, field, duration):
+        self.resolvers[field] += duration
+        self.resolver_calls[field] += 1
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    @property
+    def duplicate_queries(self):
+        """
+        Statements that were executed more than once, most repeated first
+        """
+        return [
+            (sql, count)
+            for sql, count in self.queries.most_common()
+            if count > 1
+        ]
+
+    def summary(self, limit=5):
+        """
+        A summary of the profile, suitable for JSON encoding
+        """
+        slowest = sorted(
+            self.resolvers.items(), key=lambda item: item[1], reverse=True
+        )[:limit]
+        return {
+            "operation": self.operation_name,
+            "duration_ms": round((self.duration or 0) * 1000, 2),
+            "query_count": self.query_count,
+            "duplicate_queries": [
+                {"sql": sql[:200], "count": count}
+                for sql, count in self.duplicate_queries[:limit]
+            ],
+            "resolvers": [
+                {
+                    "field": field,
+                    "duration_ms": round(duration * 1000, 2),
+                    "calls": self.resolver_calls[field],
+                }
+                for field, duration in slowest
+            ],
+        }
+
+    def log(self):
+        duplicates = self.duplicate_queries
+        message = (
+            f"GraphQL {self.operation_name} took {self.duration * 1000:.1f}ms "
+            f"and made {self.query_count} queries"
+        )
+        if duplicates:
+            repeated = sum(count for _, count in duplicates)
+            logger.warning(
+                f"{message}, {repeated} of which repeat "
+                f"{len(duplicates)} statements. Most repeated: "
+                f"{duplicates[0][1]}x {duplicates[0][0][:200]}"
+            )
+        else:
+            logger.info(message)
+
+
+def get_profile(request):
+    return getattr(request, "_graphql_profile", None)
+
+
+class ProfilingMiddleware:
+    """
+    Graphene middleware that records the time spent in each resolver of an
+    operation that is being profiled
+    """
+
+    def resolve(self, next, root, info, **args):
+        profile = get_profile(info.context)
+        if profile is None or not settings.GRAPHQL_PROFILE_RESOLVERS:
+            return next(root, info, **args)
+
+        start = time.perf_counter()
+        try:
+            return next(root, info, **args)
+        finally:
+            profile.record_resolver(
+                f"{info.parent_type.name}.{info.field_name}",
+                time.perf_counter() - start,
+            )
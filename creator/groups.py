@@ -14,6 +14,7 @@ GROUPS = {
         "list_all_releasetask",
         "add_releasetask",
         "change_releasetask",
+        "report_releasetask",
         "view_releaseservice",
         "list_all_releaseservice",
         "add_releaseservice",
@@ -188,6 +189,7 @@ GROUPS = {
         "list_all_datatemplate",
     ],
     "Services": [
+        "report_releasetask",
         "view_study",
         "add_file",
         "view_file",
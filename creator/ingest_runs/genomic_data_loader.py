@@ -20,6 +20,16 @@ SEQ_EXP_GEN_FILES = "sequencing-experiment-genomic-files"
 BIO_GEN_FILE = "biospecimen_genomic_file"
 BIO_GEN_FILES = "biospecimen-genomic-files"
 LOAD_ENTITY_TYPES = {GEN_FILE, BIO_GEN_FILE, SEQ_EXP_GEN_FILE}
+# Manifest columns used by the ingest process. All other manifest columns are
+# dropped when the manifests are read.
+GWO_MANIFEST_COLUMNS = [
+    "KF Biospecimen ID",
+    "Data Type",
+    "Filepath",
+    "Source Read",
+]
+# Low cardinality manifest columns which are stored as categoricals
+GWO_MANIFEST_DTYPES = {"Data Type": "category"}
 
 logger = logging.getLogger(__name__)
 
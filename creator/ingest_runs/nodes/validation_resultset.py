@@ -4,6 +4,7 @@ from graphene import relay
 from graphql import GraphQLError
 from graphene_django import DjangoObjectType
 
+from creator.authorization import get_authorization
 from creator.ingest_runs.models import ValidationResultset
 
 
@@ -28,21 +29,17 @@ class ValidationResultsetNode(DjangoObjectType):
         """
         Check permissions and return
         """
-        user = info.context.user
+        auth = get_authorization(info.context)
 
         try:
             validation_rs = cls._meta.model.objects.get(id=id)
         except cls._meta.model.DoesNotExist:
             raise GraphQLError("ValidationResultsets was not found")
 
-        if not (
-            user.has_perm("data_reviews.view_datareview")
-            or (
-                user.has_perm("data_reviews.view_my_study_datareview")
-                and user.studies.filter(
-                    kf_id=validation_rs.study.kf_id
-                ).exists()
-            )
+        if not auth.has_study_perm(
+            "data_reviews.view_datareview",
+            "data_reviews.view_my_study_datareview",
+            validation_rs.study.kf_id,
         ):
             raise GraphQLError("Not allowed")
 
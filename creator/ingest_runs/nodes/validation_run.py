@@ -2,6 +2,7 @@ from graphene import relay
 from graphql import GraphQLError
 from graphene_django import DjangoObjectType
 
+from creator.authorization import get_authorization
 from creator.ingest_runs.models import ValidationRun
 
 
@@ -15,21 +16,17 @@ class ValidationRunNode(DjangoObjectType):
         """
         Check permissions and return
         """
-        user = info.context.user
+        auth = get_authorization(info.context)
 
         try:
             validation_run = cls._meta.model.objects.get(id=id)
         except cls._meta.model.DoesNotExist:
             raise GraphQLError("ValidationRuns was not found")
 
-        if not (
-            user.has_perm("ingest_runs.view_validationrun")
-            or (
-                user.has_perm("ingest_runs.view_my_study_validationrun")
-                and user.studies.filter(
-                    kf_id=validation_run.study.kf_id
-                ).exists()
-            )
+        if not auth.has_study_perm(
+            "ingest_runs.view_validationrun",
+            "ingest_runs.view_my_study_validationrun",
+            validation_run.study.kf_id,
         ):
             raise GraphQLError("Not allowed")
 
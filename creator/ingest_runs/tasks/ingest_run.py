@@ -5,9 +5,13 @@ from django.conf import settings
 import pandas
 
 from creator.decorators import task
-from creator.analyses.analyzer import extract_data
+from creator.analyses.analyzer import extract_dataframe
 from creator.files.models import FileType
-from creator.ingest_runs.genomic_data_loader import GenomicDataLoader
+from creator.ingest_runs.genomic_data_loader import (
+    GenomicDataLoader,
+    GWO_MANIFEST_COLUMNS,
+    GWO_MANIFEST_DTYPES,
+)
 from creator.ingest_runs.models import IngestRun
 
 logger = logging.getLogger(__name__)
@@ -82,10 +86,19 @@ def ingest_genomic_workflow_output_manifests(ingest_run):
         "Begin ingesting genomic workflow manifests: "
         f"{len(versions)}: {pformat(list(versions))}"
     )
-    rows = []
-    for version in ingest_run.versions.all():
-        rows.extend(extract_data(version))
-    manifest_df = pandas.DataFrame(rows)
+    # Read each manifest straight into a DataFrame with only the columns
+    # needed for ingest instead of materializing every row as a dict
+    manifest_df = pandas.concat(
+        [
+            extract_dataframe(
+                version,
+                columns=GWO_MANIFEST_COLUMNS,
+                dtype=GWO_MANIFEST_DTYPES,
+            )
+            for version in versions
+        ],
+        ignore_index=True,
+    ).astype(GWO_MANIFEST_DTYPES)
 
-    loader = GenomicDataLoader(version.root_file.study)
+    loader = GenomicDataLoader(versions[0].root_file.study)
     loader.ingest_gwo(manifest_df)
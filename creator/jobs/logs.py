@@ -0,0 +1,71 @@
+import time
+import logging
+import threading
+from io import StringIO
+
+from django.conf import settings
+
+
+class LogShipper(logging.Handler):
+    """
+    A logging handler that buffers the output of a running task and ships it
+    to the task's job logs as new chunks so that the output may be followed
+    while the task runs.
+
+    Buffered output is shipped once it grows to LOG_SHIP_BYTES or when a
+    record arrives more than LOG_SHIP_INTERVAL seconds after the last
+    shipment. Any remaining output is shipped when the handler is flushed.
+    """
+
+    def __init__(self, job_logs=None, max_bytes=None, interval=None):
+        super().__init__()
+        self.job_logs = list(job_logs or [])
+        self.max_bytes = max_bytes or settings.LOG_SHIP_BYTES
+        self.interval = interval or settings.LOG_SHIP_INTERVAL
+        self.buffer = StringIO()
+        self.last_shipped = time.monotonic()
+        # The thread currently writing buffered output to the job logs
+        self._shipping_thread = None
+
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+            self.buffer.write(msg + "\n")
+            if (
+                self.buffer.tell() >= self.max_bytes
+                or time.monotonic() - self.last_shipped >= self.interval
+            ):
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    @property
+    def shipping(self):
+        """
+        Whether the calling thread is writing output to the job logs
+        """
+        return self._shipping_thread == threading.get_ident()
+
+    def flush(self):
+        """
+        Ship any buffered output to the job logs
+        """
+        self.acquire()
+        try:
+            # Writing a chunk may itself log, don't ship recursively
+            if self._shipping_thread is not None or not self.job_logs:
+                return
+            content = self.buffer.getvalue()
+            if not content:
+                return
+
+            self._shipping_thread = threading.get_ident()
+            try:
+                self.buffer = StringIO()
+                self.last_shipped = time.monotonic()
+                for job_log in self.job_logs:
+                    job_log.append(content)
+            finally:
+                self._shipping_thread = None
+        finally:
+            self.release()
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.26 on 2026-10-19 12:00
+
+import creator.jobs.models
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_move_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='joblog',
+            name='log_file',
+            field=models.FileField(blank=True, help_text='The location where the log file is stored. Only used by logs written before logs were stored in chunks', max_length=1024, upload_to=creator.jobs.models._get_upload_directory),
+        ),
+        migrations.CreateModel(
+            name='JobLogChunk',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('index', models.PositiveIntegerField(help_text='The position of the chunk in the log')),
+                ('log_file', models.FileField(help_text="The location where the chunk's output is stored", max_length=1024, upload_to=creator.jobs.models._get_upload_directory)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Time the chunk was created')),
+                ('job_log', models.ForeignKey(help_text='The Job Log that this chunk is part of', on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='jobs.JobLog')),
+            ],
+            options={
+                'unique_together': {('job_log', 'index')},
+            },
+        ),
+    ]
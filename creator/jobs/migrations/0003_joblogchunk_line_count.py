@@ -0,0 +1,18 @@
+# Generated by Django 2.2.26 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_joblogchunk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joblogchunk',
+            name='line_count',
+            field=models.PositiveIntegerField(default=0, help_text='The number of lines of output in the chunk'),
+        ),
+    ]
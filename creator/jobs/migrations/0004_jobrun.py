@@ -0,0 +1,31 @@
+# Generated by Django 2.2.26 on 2026-10-19 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_joblogchunk_line_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(help_text='Time the run started')),
+                ('duration', models.FloatField(help_text='Seconds the run took to complete')),
+                ('queue_wait', models.FloatField(help_text='Seconds the run waited in the queue before starting', null=True)),
+                ('query_count', models.PositiveIntegerField(default=0, help_text='Number of database queries made by the run')),
+                ('peak_rss', models.BigIntegerField(help_text='Peak resident memory of the worker in KiB', null=True)),
+                ('failed', models.BooleanField(default=False, help_text='If the run raised an error')),
+                ('job', models.ForeignKey(help_text='The Job that was run', on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='jobs.Job')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='jobrun',
+            index=models.Index(fields=['job', '-started_at'], name='jobs_jobrun_started_idx'),
+        ),
+    ]
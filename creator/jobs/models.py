@@ -1,10 +1,14 @@
 import os
+import math
 import pytz
 import uuid
 from datetime import datetime
 import django_rq
 from django.conf import settings
-from django.db import models
+from django.core.files.base import ContentFile
+from django.db import models, transaction
+from django.db.models import Max
+from django_s3_storage.storage import S3Storage
 
 
 class Job(models.Model):
@@ -77,6 +81,88 @@ class Job(models.Model):
             return None
         return dt.replace(tzinfo=pytz.UTC)
 
+    def run_metrics(self, last=100):
+        """
+        Summarize the execution metrics of the Job's _last_ runs as the median
+        and 95th percentile of each metric.
+        """
+        runs = list(
+            self.runs.order_by("-started_at").values(
+                "duration", "queue_wait", "query_count", "peak_rss", "failed"
+            )[:last]
+        )
+        metrics = {
+            "runs": len(runs),
+            "failures": sum(run["failed"] for run in runs),
+        }
+        for field in ["duration", "queue_wait", "query_count", "peak_rss"]:
+            values = sorted(
+                run[field] for run in runs if run[field] is not None
+            )
+            metrics[f"{field}_p50"] = _percentile(values, 50)
+            metrics[f"{field}_p95"] = _percentile(values, 95)
+        return metrics
+
+
+def _percentile(values, percent):
+    """
+    Nearest-rank percentile of a sorted list of values
+    """
+    if not values:
+        return None
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank, 1) - 1]
+
+
+class JobRun(models.Model):
+    """
+    Execution metrics of a single invocation of a Job
+    """
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["job", "-started_at"], name="jobs_jobrun_started_idx"
+            )
+        ]
+
+    job = models.ForeignKey(
+        Job,
+        related_name="runs",
+        help_text="The Job that was run",
+        on_delete=models.CASCADE,
+    )
+    started_at = models.DateTimeField(help_text="Time the run started")
+    duration = models.FloatField(help_text="Seconds the run took to complete")
+    queue_wait = models.FloatField(
+        null=True,
+        help_text="Seconds the run waited in the queue before starting",
+    )
+    query_count = models.PositiveIntegerField(
+        default=0, help_text="Number of database queries made by the run"
+    )
+    peak_rss = models.BigIntegerField(
+        null=True, help_text="Peak resident memory of the worker in KiB"
+    )
+    failed = models.BooleanField(
+        default=False, help_text="If the run raised an error"
+    )
+
+    @classmethod
+    def prune(cls, job):
+        """
+        Remove all but the JOB_RUN_RETENTION most recent runs of a _job_
+        """
+        started = (
+            cls.objects.filter(job=job)
+            .order_by("-started_at")
+            .values_list("started_at", flat=True)
+        )
+        oldest_kept = started[settings.JOB_RUN_RETENTION - 1:][:1]
+        oldest_kept = list(oldest_kept)
+        if oldest_kept:
+            cls.objects.filter(job=job, started_at__lt=oldest_kept[0]).delete()
+
 
 def _get_upload_directory(instance, filename):
     """
@@ -117,7 +203,9 @@ class JobLog(models.Model):
     log_file = models.FileField(
         upload_to=_get_upload_directory,
         max_length=1024,
-        help_text="The location where the log file is stored",
+        blank=True,
+        help_text="The location where the log file is stored. Only used by "
+        "logs written before logs were stored in chunks",
     )
 
     created_at = models.DateTimeField(
@@ -131,3 +219,117 @@ class JobLog(models.Model):
         """
         download_url = f"/logs/{self.id}"
         return download_url
+
+    def append(self, content):
+        """
+        Append _content_ to the log by writing it to a new chunk.
+        Existing output is never read or re-written.
+        """
+        with transaction.atomic():
+            # Lock the log so concurrent writers get their own chunk index
+            JobLog.objects.select_for_update().get(pk=self.pk)
+            last = self.chunks.aggregate(last=Max("index"))["last"]
+            index = 0 if last is None else last + 1
+
+            chunk = JobLogChunk(
+                job_log=self,
+                index=index,
+                line_count=len(content.splitlines()),
+            )
+            _use_log_storage(chunk.log_file)
+            now = datetime.utcnow()
+            name = (
+                f"{now.strftime('%Y/%m/%d/')}{int(now.timestamp())}_"
+                f"{self.job_id}_{self.pk}_{index:05d}.log"
+            )
+            chunk.log_file.save(name, ContentFile(content))
+
+        return chunk
+
+    def stream(self):
+        """
+        Yield the contents of the log in order, one file at a time
+        """
+        if self.log_file:
+            _use_log_storage(self.log_file)
+            with self.log_file.open() as f:
+                yield f.read()
+
+        for chunk in self.chunks.order_by("index").all():
+            _use_log_storage(chunk.log_file)
+            with chunk.log_file.open() as f:
+                yield f.read()
+
+    def read_lines(self, after=0):
+        """
+        Return the lines of the log following the first _after_ lines along
+        with the number of lines read so far, which may be passed back as
+        _after_ to follow the log while it is being written.
+        Only the chunks that contain new lines are read.
+        """
+        lines = []
+        offset = 0
+
+        if self.log_file:
+            _use_log_storage(self.log_file)
+            with self.log_file.open() as f:
+                content = f.read()
+            if isinstance(content, bytes):
+                content = content.decode("utf-8", errors="replace")
+            legacy = content.splitlines()
+            lines.extend(legacy[after:])
+            offset = len(legacy)
+
+        for chunk in self.chunks.order_by("index").all():
+            end = offset + chunk.line_count
+            if end > after:
+                _use_log_storage(chunk.log_file)
+                with chunk.log_file.open() as f:
+                    content = f.read()
+                if isinstance(content, bytes):
+                    content = content.decode("utf-8", errors="replace")
+                skip = max(after - offset, 0)
+                lines.extend(content.splitlines()[skip:])
+            offset = end
+
+        return lines, max(offset, after)
+
+
+class JobLogChunk(models.Model):
+    """
+    A piece of a Job Log's output shipped by a running task.
+    A log is made up of its chunks in order of their index.
+    """
+
+    class Meta:
+        unique_together = ("job_log", "index")
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job_log = models.ForeignKey(
+        JobLog,
+        related_name="chunks",
+        help_text="The Job Log that this chunk is part of",
+        on_delete=models.CASCADE,
+    )
+    index = models.PositiveIntegerField(
+        help_text="The position of the chunk in the log"
+    )
+    line_count = models.PositiveIntegerField(
+        default=0, help_text="The number of lines of output in the chunk"
+    )
+    log_file = models.FileField(
+        upload_to=_get_upload_directory,
+        max_length=1024,
+        help_text="The location where the chunk's output is stored",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, null=False, help_text="Time the chunk was created"
+    )
+
+
+def _use_log_storage(log_file):
+    """
+    Need to manually configure a log file's bucket if using S3 storage
+    """
+    if settings.DEFAULT_FILE_STORAGE == "django_s3_storage.storage.S3Storage":
+        log_file.storage = S3Storage(aws_s3_bucket_name=settings.LOG_BUCKET)
@@ -18,13 +18,50 @@ class JobFilter(FilterSet):
         fields = ["name", "active", "failing"]
 
 
+class JobMetrics(graphene.ObjectType):
+    runs = graphene.Int(description="Number of runs summarized")
+    failures = graphene.Int(description="Number of the runs that failed")
+    duration_p50 = graphene.Float(description="Median run time in seconds")
+    duration_p95 = graphene.Float(
+        description="95th percentile run time in seconds"
+    )
+    queue_wait_p50 = graphene.Float(
+        description="Median seconds spent waiting in the queue"
+    )
+    queue_wait_p95 = graphene.Float(
+        description="95th percentile seconds spent waiting in the queue"
+    )
+    query_count_p50 = graphene.Int(
+        description="Median number of database queries"
+    )
+    query_count_p95 = graphene.Int(
+        description="95th percentile number of database queries"
+    )
+    peak_rss_p50 = graphene.Float(
+        description="Median peak worker memory in KiB"
+    )
+    peak_rss_p95 = graphene.Float(
+        description="95th percentile peak worker memory in KiB"
+    )
+
+
 class JobNode(DjangoObjectType):
     enqueued_at = graphene.DateTime()
+    metrics = graphene.Field(
+        JobMetrics,
+        last=graphene.Int(
+            default_value=100, description="Number of recent runs to include"
+        ),
+        description="Execution metrics of the Job's most recent runs",
+    )
 
     class Meta:
         model = Job
         interfaces = (graphene.relay.Node,)
 
+    def resolve_metrics(self, info, last=100):
+        return JobMetrics(**self.run_metrics(last=max(last, 1)))
+
     @classmethod
     def get_node(cls, info, name):
         """
@@ -52,6 +89,14 @@ class JobLogFilter(FilterSet):
         fields = ["job"]
 
 
+class JobLogLines(graphene.ObjectType):
+    lines = graphene.List(graphene.String, description="New lines of the log")
+    offset = graphene.Int(
+        description="The number of lines read so far. Pass as 'after' to "
+        "retrieve only lines written since"
+    )
+
+
 class JobLogNode(DjangoObjectType):
     class Meta:
         model = JobLog
@@ -60,11 +105,22 @@ class JobLogNode(DjangoObjectType):
         exclude = ("log_file",)
 
     download_url = graphene.String()
+    log_lines = graphene.Field(
+        JobLogLines,
+        after=graphene.Int(
+            default_value=0, description="Only return lines after this line"
+        ),
+        description="Lines of the log, used to follow a running job",
+    )
 
     def resolve_download_url(self, info):
         protocol = "http" if settings.DEVELOP else "https"
         return f"{protocol}://{info.context.get_host()}{self.path}"
 
+    def resolve_log_lines(self, info, after=0):
+        lines, offset = self.read_lines(after=max(after, 0))
+        return JobLogLines(lines=lines, offset=offset)
+
     @classmethod
     def get_node(cls, info, id):
         """
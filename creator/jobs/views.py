@@ -1,10 +1,9 @@
 import urllib
-from django.http import HttpResponse, HttpResponseNotFound
-from django.conf import settings
-from django.core.files.base import ContentFile
-from django_s3_storage.storage import S3Storage
-from botocore.exceptions import ClientError
-from creator.files.models import File, Version, DevDownloadToken, DownloadToken
+from django.http import (
+    HttpResponse,
+    HttpResponseNotFound,
+    StreamingHttpResponse,
+)
 from creator.jobs.models import JobLog
 
 
@@ -22,14 +21,13 @@ def download_log(request, log_id):
     except JobLog.DoesNotExist:
         return HttpResponseNotFound("No log exists with given ID")
 
-    # Need to set storage location for study bucket if using S3 backend
-    if settings.DEFAULT_FILE_STORAGE == "django_s3_storage.storage.S3Storage":
-        log.log_file.storage = S3Storage(
-            aws_s3_bucket_name=settings.LOG_BUCKET
-        )
+    if log.log_file:
+        filename = log.log_file.name.split("/")[-1]
+    else:
+        filename = f"{int(log.created_at.timestamp())}_{log.job_id}.log"
 
-    response = HttpResponse(log.log_file)
-    filename = log.log_file.name.split("/")[-1]
+    # Stream the log's chunks in order rather than loading the whole log
+    response = StreamingHttpResponse(log.stream())
     response[
         "Content-Disposition"
     ] = f"attachment; filename*=UTF-8''{filename}"
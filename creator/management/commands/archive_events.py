@@ -0,0 +1,53 @@
+import logging
+from datetime import datetime
+
+import pytz
+from django.core.management.base import BaseCommand, CommandError
+
+from creator.events.archive import archive_events, retention_cutoff
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive events older than the retention period. May be used to "
+        "backfill archives for an existing Event table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Archive events older than this many days. "
+            "Defaults to EVENT_RETENTION_DAYS",
+        )
+        parser.add_argument(
+            "--before",
+            help="Archive events created before this date (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="The number of events to read or delete at once",
+        )
+
+    def handle(self, *args, **options):
+        if options["before"] and options["days"] is not None:
+            raise CommandError("Only one of --before or --days may be given")
+
+        if options["before"]:
+            try:
+                before = datetime.strptime(options["before"], "%Y-%m-%d")
+            except ValueError:
+                raise CommandError("--before must be a date like YYYY-MM-DD")
+            before = before.replace(tzinfo=pytz.UTC)
+        else:
+            before = retention_cutoff(options["days"])
+
+        logger.info(f"Archiving events created before {before.isoformat()}")
+        archives = archive_events(
+            before=before, batch_size=options["batch_size"]
+        )
+        total = sum(archive.event_count for archive in archives)
+        logger.info(f"Archived {total} events in {len(archives)} archives")
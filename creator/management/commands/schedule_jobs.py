@@ -12,7 +12,9 @@ from creator.releases.tasks import (
 )
 from creator.tasks import (
     analyzer_task,
+    archive_events_task,
     sync_cavatica_projects_task,
+    poll_delivery_imports_task,
     sync_dataservice_studies_task,
     sync_buckets_task,
     slack_notify_task,
@@ -37,10 +39,12 @@ class Command(BaseCommand):
         jobs = list(self.default_scheduler.get_jobs())
         logger.info(f"Found {len(jobs)} jobs scheduled on the default queue")
         self.setup_analyzer()
+        self.setup_archive_events()
 
         jobs = list(self.cavatica_scheduler.get_jobs())
         logger.info(f"Found {len(jobs)} jobs scheduled on the Cavatica queue")
         self.setup_cavatica_sync()
+        self.setup_delivery_imports()
 
         jobs = list(self.dataservice_scheduler.get_jobs())
         logger.info(
@@ -84,6 +88,25 @@ class Command(BaseCommand):
         job.scheduled = True
         job.save()
 
+    def setup_archive_events(self):
+        logger.info("Scheduling Event Archive jobs")
+        name = "archive_events"
+        description = "Archive events older than the retention period"
+
+        self.default_scheduler.cancel(name)
+
+        self.default_scheduler.cron(
+            "0 7 * * *",
+            id=name,
+            description=description,
+            func=archive_events_task,
+        )
+        job, created = Job.objects.get_or_create(
+            name=name, description=description, scheduler="default"
+        )
+        job.scheduled = True
+        job.save()
+
     def setup_cavatica_sync(self):
         logger.info("Scheduling Cavatica Sync jobs")
         name = "cavatica_sync"
@@ -105,6 +128,27 @@ class Command(BaseCommand):
         job.scheduled = True
         job.save()
 
+    def setup_delivery_imports(self):
+        logger.info("Scheduling Delivery Import jobs")
+        name = "delivery_imports"
+        description = "Poll the state of imports to Cavatica delivery projects"
+
+        self.cavatica_scheduler.cancel(name)
+
+        self.cavatica_scheduler.schedule(
+            id=name,
+            description=description,
+            scheduled_time=datetime.utcnow(),
+            func=poll_delivery_imports_task,
+            repeat=None,
+            interval=120,
+        )
+        job, created = Job.objects.get_or_create(
+            name=name, description=description, scheduler="cavatica"
+        )
+        job.scheduled = True
+        job.save()
+
     def setup_dataservice_sync(self):
         logger.info("Scheduling Dataservice Sync jobs")
         name = "dataservice_sync"
@@ -160,7 +204,7 @@ class Command(BaseCommand):
             scheduled_time=datetime.utcnow(),
             func=scan_tasks,
             repeat=None,
-            interval=30,
+            interval=settings.RELEASE_TASK_POLL_INTERVAL,
         )
         job, created = Job.objects.get_or_create(
             name=name, description=description, scheduler="releases"
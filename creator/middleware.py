@@ -1,11 +1,15 @@
 import logging
+import hashlib
 import json
 import jwt
 import re
+import time
+import threading
 import requests
 from django.conf import settings
 from django.core.cache import cache
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.utils.functional import SimpleLazyObject
 from django.contrib.auth.models import AnonymousUser, Group
 from django.contrib.auth.models import update_last_login
@@ -79,9 +83,24 @@ class Auth0AuthenticationMiddleware:
             return AnonymousUser()
         encoded = encoded.replace("Bearer ", "")
 
+        # A token that was recently verified may be resolved to its user
+        # without being validated again
+        cache_key = Auth0AuthenticationMiddleware._token_cache_key(encoded)
+        user_id = cache.get(cache_key)
+        if user_id is not None:
+            User = get_user_model()
+            user = User.objects.filter(pk=user_id).first()
+            if user is not None:
+                Auth0AuthenticationMiddleware._update_last_login(user)
+                return user
+
         try:
-            # Validate JWT using the Auth0 key
-            public_key = Auth0AuthenticationMiddleware._get_auth0_key()
+            # Validate JWT using the Auth0 key that signed it
+            kid = jwt.get_unverified_header(encoded).get("kid")
+            public_key = Auth0AuthenticationMiddleware._get_auth0_key(kid)
+            if public_key is None:
+                logger.warning(f"Token was signed by an unknown key: {kid}")
+                return AnonymousUser()
             token = jwt.decode(
                 encoded,
                 public_key,
@@ -112,7 +131,7 @@ class Auth0AuthenticationMiddleware:
         try:
             user = User.objects.get(sub=sub)
             # The user is already in the database, update their last login
-            update_last_login(None, user)
+            Auth0AuthenticationMiddleware._update_last_login(user)
         except User.DoesNotExist:
             profile = None
             if token.get("gty") == "client-credentials":
@@ -139,15 +158,44 @@ class Auth0AuthenticationMiddleware:
                 service_group = Group.objects.filter(name="Services").first()
                 user.groups.add(service_group)
 
-            update_last_login(None, user)
+            Auth0AuthenticationMiddleware._update_last_login(user)
 
-        # Elevate the user to admin if they have the right role
+        # Elevate the user to admin if they have the right role.
+        # Roles are fixed for the life of a token, so this is only done when
+        # a token is first seen
         if "ADMIN" in roles:
             admins = Group.objects.filter(name="Administrators").first()
             user.groups.add(admins)
 
+        # Remember the token's user until the token expires
+        timeout = min(
+            settings.CACHE_AUTH0_TOKEN_TIMEOUT,
+            int(token.get("exp", 0) - time.time()),
+        )
+        if timeout > 0:
+            cache.set(cache_key, user.pk, timeout)
+
         return user
 
+    @staticmethod
+    def _token_cache_key(encoded):
+        """
+        The cache key for a token's user. Only a hash of the token is stored.
+        """
+        digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        return f"AUTH0_TOKEN:{digest}"
+
+    @staticmethod
+    def _update_last_login(user):
+        """
+        Update the user's last login if it has not been updated recently
+        """
+        if user.last_login is None or (
+            (timezone.now() - user.last_login).total_seconds()
+            >= settings.LAST_LOGIN_INTERVAL
+        ):
+            update_last_login(None, user)
+
     def _get_profile(encoded):
         """
         Retrives user's profile from Auth0 to populate fields such as email
@@ -202,26 +250,99 @@ class Auth0AuthenticationMiddleware:
         return profile
 
     @staticmethod
-    def _get_auth0_key():
+    def _get_auth0_key(kid=None):
         """
-        Attempts to retrieve the auth0 public key from the cache. If it's not
-        there or is expired, fetch a new one from auth0 and store it back in
-        the cache.
+        Returns the Auth0 public key with the given kid, or the first key if
+        no kid is given, from the process's cache of parsed keys.
         """
-        key = cache.get(settings.CACHE_AUTH0_KEY, None)
-        # If key is not set in cache (or has timed out), get a new one
-        if key is None:
-            key = Auth0AuthenticationMiddleware._get_new_key()
-            cache.set(
-                settings.CACHE_AUTH0_KEY, key, settings.CACHE_AUTH0_TIMEOUT
-            )
-        public_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-        return public_key
+        return auth0_keys.get(kid)
 
     @staticmethod
-    def _get_new_key():
+    def _get_new_keys():
         """
-        Get a public key from Auth0 jwks
+        Get the public keys from Auth0 jwks
         """
         resp = requests.get(settings.AUTH0_JWKS, timeout=10)
-        return resp.json()["keys"][0]
+        return resp.json()["keys"]
+
+
+class Auth0KeyCache:
+    """
+    A process-local cache of Auth0's parsed public keys, keyed by kid.
+
+    Keys are loaded from the shared cache, or from Auth0 if they are not
+    there, when first needed, when they are older than CACHE_AUTH0_TIMEOUT,
+    or when a token is signed by an unknown key. Only one thread at a time
+    will load keys, and unknown keys will trigger a reload at most once every
+    AUTH0_JWKS_REFRESH_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.keys = {}
+        self.first = None
+        self.loaded_at = None
+
+    def get(self, kid=None):
+        key = self._lookup(kid)
+        if key is not None:
+            return key
+
+        with self.lock:
+            # Another thread may have loaded the key while we were waiting
+            key = self._lookup(kid)
+            if key is not None:
+                return key
+
+            if self._fresh() and (
+                time.monotonic() - self.loaded_at
+                < settings.AUTH0_JWKS_REFRESH_INTERVAL
+            ):
+                return None
+
+            self._load(kid)
+            return self._lookup(kid)
+
+    def _fresh(self):
+        return self.loaded_at is not None and (
+            time.monotonic() - self.loaded_at
+            < int(settings.CACHE_AUTH0_TIMEOUT)
+        )
+
+    def _lookup(self, kid):
+        if not self._fresh():
+            return None
+        if kid is None:
+            return self.first
+        return self.keys.get(kid)
+
+    def _load(self, kid):
+        """
+        Load and parse the keys, going to Auth0 if the shared cache does not
+        have the needed key
+        """
+        jwks = cache.get(settings.CACHE_AUTH0_KEY, None)
+        if not isinstance(jwks, list) or not any(
+            kid is None or key.get("kid") == kid for key in jwks
+        ):
+            jwks = Auth0AuthenticationMiddleware._get_new_keys()
+            cache.set(
+                settings.CACHE_AUTH0_KEY, jwks, settings.CACHE_AUTH0_TIMEOUT
+            )
+
+        keys = {}
+        first = None
+        for key in jwks:
+            public_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
+            keys[key.get("kid")] = public_key
+            first = first or public_key
+
+        self.keys = keys
+        self.first = first
+        self.loaded_at = time.monotonic()
+
+
+auth0_keys = Auth0KeyCache()
@@ -1,12 +1,21 @@
-from datetime import datetime
 import logging
 import pytz
 import sevenbridges as sbg
-from sevenbridges.errors import NotFound, Conflict
+from sevenbridges.errors import NotFound
 from django.conf import settings
+from django.core.cache import cache
 from creator.organizations.models import Organization
 from creator.projects.models import Project, WORKFLOW_TYPES
 from creator.events.models import Event
+from creator.events.outbox import collect_events, emit
+from creator.utils import ContextThreadPoolExecutor
+from creator.projects.delivery import (
+    delivery_folder_name,
+    get_delivery_folder,
+    poll_imports,
+    submit_imports,
+    volume_locations,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -206,10 +215,36 @@ def setup_cavatica(study, workflows=None, user=None):
     return projects
 
 
-def sync_cavatica_account(project_type):
+# The fields of a Project that are copied from its Cavatica project
+SYNCED_FIELDS = [
+    "name",
+    "description",
+    "url",
+    "workflow_type",
+    "created_by",
+    "created_on",
+    "modified_on",
+]
+
+
+def _project_fields(cavatica_project):
     """
-    Look at all projects for given project type and update or create projects
-    as needed and return changes
+    The values of the SYNCED_FIELDS of a Cavatica project
+    """
+    return {
+        "name": cavatica_project.name,
+        "description": cavatica_project.description or "",
+        "url": cavatica_project.href,
+        "workflow_type": "bwa_mem",
+        "created_by": cavatica_project.created_by,
+        "created_on": cavatica_project.created_on.replace(tzinfo=pytz.UTC),
+        "modified_on": cavatica_project.modified_on.replace(tzinfo=pytz.UTC),
+    }
+
+
+def fetch_cavatica_projects(project_type):
+    """
+    List all of the projects in the Cavatica account for a project type
     """
     token = None
     if project_type == "HAR":
@@ -221,119 +256,176 @@ def sync_cavatica_account(project_type):
 
     api = sbg.Api(url=settings.CAVATICA_URL, token=token)
 
-    created_projects = []
-    updated_projects = []
-    # Keep track of all the projects Cavatica side so we can compare internally
-    # later to determine if anything was deleted
-    seen_projects = set()
-    db_projects = {
-        project["project_id"]
-        for project in Project.objects.filter(
-            project_type=project_type, deleted=False
-        )
-        .values("project_id")
-        .all()
-    }
+    return list(
+        api.projects.query(limit=settings.CAVATICA_SYNC_PAGE_SIZE).all()
+    )
 
-    for cavatica_project in api.projects.query().all():
-        seen_projects.add(cavatica_project.id)
 
-        description = (
-            cavatica_project.description
-            if cavatica_project.description
-            else ""
-        )
+def _watermark_key(project_type):
+    return f"CAVATICA_SYNC_WATERMARK:{project_type}"
 
-        try:
-            project = Project.objects.get(project_id=cavatica_project.id)
-            modified_on = project.modified_on
-        except Project.DoesNotExist:
-            project = None
-            modified_on = None
-
-        project, created = Project.objects.update_or_create(
-            project_id=cavatica_project.id,
-            defaults={
-                "name": cavatica_project.name,
-                "description": description,
-                "url": cavatica_project.href,
-                "workflow_type": "bwa_mem",
-                "created_by": cavatica_project.created_by,
-                "created_on": cavatica_project.created_on.replace(
-                    tzinfo=pytz.UTC
-                ),
-                "modified_on": cavatica_project.modified_on.replace(
-                    tzinfo=pytz.UTC
-                ),
-            },
+
+def sync_cavatica_account(project_type, cavatica_projects=None, full=True):
+    """
+    Look at all projects for given project type and update or create projects
+    as needed and return changes
+
+    The projects in the database are loaded at once and compared to those in
+    Cavatica so that all changes are written in a few bulk queries, however
+    many projects there are.
+
+    Unless a _full_ sync is requested, projects that were already synced and
+    have not been modified since the last successful sync of the account
+    are skipped.
+    _cavatica_projects_ may be given if the account's projects have already
+    been listed.
+    """
+    if cavatica_projects is None:
+        cavatica_projects = fetch_cavatica_projects(project_type)
+    cavatica_projects = {
+        cavatica_project.id: cavatica_project
+        for cavatica_project in cavatica_projects
+    }
+
+    # Only projects modified since the last sync, or that we have never
+    # seen, need to be compared to what is stored
+    watermark = None if full else cache.get(_watermark_key(project_type))
+    candidates = list(cavatica_projects)
+    if watermark is not None:
+        known = set(
+            Project.objects.filter(project_id__in=candidates).values_list(
+                "project_id", flat=True
+            )
+        )
+        candidates = [
+            project_id
+            for project_id, cavatica_project in cavatica_projects.items()
+            if project_id not in known
+            or cavatica_project.modified_on.replace(tzinfo=pytz.UTC)
+            > watermark
+        ]
+        skipped = len(cavatica_projects) - len(candidates)
+        logger.info(
+            f"Skipping {skipped} {project_type} projects unmodified since "
+            f"{watermark.isoformat()}"
         )
+    existing = Project.objects.in_bulk(candidates)
+
+    created_projects = []
+    updated_projects = []
+    changed_projects = []
+    for project_id in candidates:
+        cavatica_project = cavatica_projects[project_id]
+        fields = _project_fields(cavatica_project)
+        project = existing.get(project_id)
+        if project is None:
+            created_projects.append(
+                Project(
+                    project_id=project_id, project_type=project_type, **fields
+                )
+            )
+            continue
 
-        if created:
-            created_projects.append(project)
-        elif modified_on and modified_on < project.modified_on:
+        modified_on = project.modified_on
+        if any(getattr(project, k) != v for k, v in fields.items()):
+            for field, value in fields.items():
+                setattr(project, field, value)
+            changed_projects.append(project)
+        if modified_on < project.modified_on:
             updated_projects.append(project)
 
     # If there are projects in the database that weren't seen in Cavatica,
     # mark them as deleted
-    deleted_projects = db_projects - seen_projects
-    for project in deleted_projects:
-        Project.objects.filter(project_id=project).update(deleted=True)
     deleted_projects = list(
-        Project.objects.in_bulk(list(deleted_projects)).values()
+        Project.objects.filter(
+            project_type=project_type, deleted=False
+        ).exclude(project_id__in=list(cavatica_projects))
     )
+    for project in deleted_projects:
+        project.deleted = True
 
     # Save everything
-    for project in created_projects + updated_projects + deleted_projects:
-        project.save()
+    Project.objects.bulk_create(created_projects)
+    if changed_projects:
+        Project.objects.bulk_update(changed_projects, SYNCED_FIELDS)
+    if deleted_projects:
+        Project.objects.bulk_update(deleted_projects, ["deleted"])
 
     # Emit events
-    for project in created_projects:
-        message = (
-            f"New project was discovered in Cavatica: {cavatica_project.id}"
-        )
-        event = Event(
-            organization=Organization.objects.earliest("created_on"),
-            project=project,
-            description=message,
-            event_type="PR_CRE",
-        )
-        event.save()
-
-    for project in updated_projects:
-        message = f"Project was updated in Cavatica: {cavatica_project.id}"
-        event = Event(
-            organization=Organization.objects.earliest("created_on"),
-            project=project,
-            description=message,
-            event_type="PR_UPD",
-        )
-        event.save()
+    if created_projects or updated_projects or deleted_projects:
+        organization = Organization.objects.earliest("created_on")
+
+    with collect_events():
+        for project in created_projects:
+            emit(
+                organization=organization,
+                project=project,
+                description=(
+                    "New project was discovered in Cavatica: "
+                    f"{project.project_id}"
+                ),
+                event_type="PR_CRE",
+            )
 
-    for project in deleted_projects:
-        message = f"Project was deleted in Cavatica: {cavatica_project.id}"
-        event = Event(
-            organization=Organization.objects.earliest("created_on"),
-            project=project,
-            description=message,
-            event_type="PR_DEL",
+        for project in updated_projects:
+            emit(
+                organization=organization,
+                project=project,
+                description=(
+                    f"Project was updated in Cavatica: {project.project_id}"
+                ),
+                event_type="PR_UPD",
+            )
+
+        for project in deleted_projects:
+            emit(
+                organization=organization,
+                project=project,
+                description=(
+                    f"Project was deleted in Cavatica: {project.project_id}"
+                ),
+                event_type="PR_DEL",
+            )
+
+    if cavatica_projects:
+        cache.set(
+            _watermark_key(project_type),
+            max(
+                p.modified_on.replace(tzinfo=pytz.UTC)
+                for p in cavatica_projects.values()
+            ),
+            None,
         )
-        event.save()
 
     return created_projects, updated_projects, deleted_projects
 
 
-def sync_cavatica_projects():
+def sync_cavatica_projects(full=True):
     """
     Synchronize projects for all types
+
+    The accounts' projects are listed from Cavatica concurrently and then
+    synced one account at a time.
     """
-    created_har, updated_har, deleted_har = sync_cavatica_account("HAR")
-    created_del, updated_del, deleted_del = sync_cavatica_account("DEL")
+    project_types = ["HAR", "DEL"]
+    with ContextThreadPoolExecutor(max_workers=len(project_types)) as pool:
+        listings = dict(
+            zip(
+                project_types,
+                pool.map(fetch_cavatica_projects, project_types),
+            )
+        )
 
-    return (
-        created_har + created_del,
-        updated_har + updated_del,
-        deleted_har + deleted_del,
-    )
+    created, updated, deleted = [], [], []
+    for project_type in project_types:
+        c, u, d = sync_cavatica_account(
+            project_type, listings[project_type], full=full
+        )
+        created += c
+        updated += u
+        deleted += d
+
+    return created, updated, deleted
 
 
 class NotLinkedError(Exception):
@@ -370,56 +462,30 @@ def import_volume_files(project):
             "It may not be attached to the current user's account"
         )
 
-    # Create a new folder
-    folder_name = f"{datetime.now().strftime('%Y-%m-%d')}-kf-data-delivery"
-    try:
-        delivery_folder = api.files.create_folder(
-            name=folder_name, project=project.project_id
-        )
-    except Conflict:
-        # There is no way to get a sigle folder by name in Cavatica so we
-        # have to iterate through all of them
-        delivery_folder = None
-        folders = api.files.query(project=project.project_id)
-        for folder in folders:
-            if folder.name == folder_name:
-                delivery_folder = folder
-                break
-        else:
-            raise NotFound(
-                f"Could not create or find the delivery folder '{folder_name}'"
-            )
+    folder_name = delivery_folder_name()
+    folder_id = get_delivery_folder(api, project.project_id, folder_name)
 
-    imports = []
-
-    # Iterate all source/ prefixes and import them individually
-    prefixes = volume.list(prefix="source").prefixes
-    for prefix in prefixes:
-        # Uploads is the study creator files, we don't want to deliver them
-        if prefix.prefix == "source/uploads":
-            continue
-        imp = {
-            "volume": volume_id,
-            "parent": delivery_folder.id,
-            "location": prefix.prefix + "/",
-            "overwrite": True,
-        }
-        imports.append(imp)
-
-    # Iterate all files at the source/ level
-    for obj in volume.list(prefix="source"):
-        imp = {
-            "volume": volume_id,
-            "parent": delivery_folder.id,
-            "location": obj.location,
-            "overwrite": True,
-        }
-        imports.append(imp)
-
-    res = api.imports.bulk_submit(imports)
+    imports = submit_imports(
+        api,
+        project,
+        volume_id,
+        folder_id,
+        folder_name,
+        volume_locations(volume),
+    )
 
     logger.info(
-        f"Started {len(imports)} imports from {volume_id} "
-        f"to {delivery_folder.name} in project {project.project_id}"
+        f"Started {imports} imports from {volume_id} "
+        f"to {folder_name} in project {project.project_id}"
     )
     return folder_name
+
+
+def poll_delivery_imports():
+    """
+    Update the state of imports to delivery projects that have not finished
+    """
+    api = sbg.Api(
+        url=settings.CAVATICA_URL, token=settings.CAVATICA_DELIVERY_TOKEN
+    )
+    return poll_imports(api)
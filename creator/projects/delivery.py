@@ -0,0 +1,239 @@
+"""
+Delivery of a study's files from its volume to its Cavatica delivery project.
+
+Everything under the volume's source/ directory is imported into a dated
+delivery folder in the project. The volume is listed one page at a time,
+imports are submitted in chunks no larger than the bulk api accepts, and
+each accepted import is recorded as a DeliveryImport so that the imports
+still running may be polled for completion in bulk.
+"""
+import logging
+from collections import deque
+from datetime import datetime
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from sevenbridges.errors import Conflict, NotFound, PaginationError
+
+from creator.projects.models import DeliveryImport
+from creator.utils import ContextThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# The most imports that Cavatica will submit or get in one bulk request
+BULK_LIMIT = 100
+
+# The study creator's own uploads are not delivered
+EXCLUDED_PREFIXES = {"source/uploads"}
+
+UNFINISHED_STATES = ["PENDING", "RUNNING"]
+
+
+class ImportsRejected(Exception):
+    pass
+
+
+def chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def delivery_folder_name(date=None):
+    date = date or datetime.now()
+    return f"{date.strftime('%Y-%m-%d')}-kf-data-delivery"
+
+
+def get_delivery_folder(api, project_id, name):
+    """
+    Returns the id of the folder _name_ in a project, creating it if it does
+    not exist yet. The id is cached so that later deliveries to the same
+    folder do not need to look for it again.
+    """
+    key = f"CAVATICA_DELIVERY_FOLDER:{project_id}:{name}"
+    folder_id = cache.get(key)
+    if folder_id is not None:
+        return folder_id
+
+    try:
+        folder = api.files.create_folder(name=name, project=project_id)
+    except Conflict:
+        folders = api.files.query(project=project_id, names=[name])
+        folder = next((f for f in folders if f.name == name), None)
+        if folder is None:
+            raise NotFound(
+                f"Could not create or find the delivery folder '{name}'"
+            )
+
+    cache.set(key, folder.id, settings.CAVATICA_DELIVERY_FOLDER_TIMEOUT)
+    return folder.id
+
+
+def volume_locations(volume, prefix="source"):
+    """
+    Yield the locations to import under _prefix_ in a volume: each of its
+    directories, other than excluded ones, and each of its objects.
+    The listing is requested one page at a time as the locations are used.
+    """
+    page = volume.list(
+        prefix=prefix, limit=settings.CAVATICA_VOLUME_PAGE_SIZE
+    )
+    while True:
+        for volume_prefix in page.prefixes:
+            if volume_prefix.prefix in EXCLUDED_PREFIXES:
+                continue
+            yield volume_prefix.prefix + "/"
+
+        for obj in page:
+            yield obj.location
+
+        try:
+            page = page.next_page()
+        except PaginationError:
+            break
+
+
+def submit_imports(api, project, volume_id, folder_id, folder, locations):
+    """
+    Submit imports of _locations_ in a volume to a folder of a project.
+
+    The locations are read in chunks as they are listed and each chunk is
+    submitted as soon as it is read, several at a time, so that the whole
+    listing is never held at once. Each import that Cavatica accepts is
+    recorded as a DeliveryImport.
+    Returns the number of imports accepted.
+    Raises ImportsRejected if any import was not accepted.
+    """
+    size = min(settings.CAVATICA_IMPORT_CHUNK_SIZE, BULK_LIMIT)
+    workers = settings.CAVATICA_IMPORT_WORKERS
+    locations = iter(locations)
+
+    accepted = 0
+    rejected = 0
+    error = None
+    in_flight = deque()
+
+    def record_oldest():
+        nonlocal accepted, rejected, error
+        batch, future = in_flight.popleft()
+        try:
+            records = future.result()
+        except Exception as err:
+            error = error or err
+            rejected += len(batch)
+            return
+        imports = _record_imports(project, folder, batch, records)
+        accepted += len(imports)
+        rejected += len(batch) - len(imports)
+
+    # Only the requests are made concurrently, the imports are recorded on
+    # this thread
+    with ContextThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = [
+                {
+                    "volume": volume_id,
+                    "parent": folder_id,
+                    "location": location,
+                    "overwrite": True,
+                }
+                for location in islice(locations, size)
+            ]
+            if not batch:
+                break
+            in_flight.append(
+                (batch, executor.submit(api.imports.bulk_submit, batch))
+            )
+            # Once every worker is busy, wait for the oldest batch before
+            # reading more of the listing
+            if len(in_flight) >= workers:
+                record_oldest()
+
+        while in_flight:
+            record_oldest()
+
+    if error is not None:
+        raise error
+    if rejected:
+        raise ImportsRejected(
+            f"{rejected} of {rejected + accepted} imports to {folder} were "
+            "rejected"
+        )
+
+    return accepted
+
+
+def _record_imports(project, folder, batch, records):
+    """
+    Save a DeliveryImport for each import of a submitted batch that was
+    accepted
+    """
+    imports = []
+    for imp, record in zip(batch, records):
+        if not record.valid:
+            logger.warning(
+                f"Import of {imp['location']} to project "
+                f"{project.project_id} was rejected: {record.error.message}"
+            )
+            continue
+
+        imports.append(
+            DeliveryImport(
+                import_id=record.resource.id,
+                project=project,
+                folder=folder,
+                location=imp["location"],
+                state=record.resource.state or "PENDING",
+            )
+        )
+
+    return DeliveryImport.objects.bulk_create(imports)
+
+
+def poll_imports(api):
+    """
+    Update the state of every unfinished DeliveryImport from Cavatica.
+    Imports are retrieved in bulk and only those whose state changed are
+    written. Returns the imports that were updated.
+    """
+    pending = {
+        imp.import_id: imp
+        for imp in DeliveryImport.objects.filter(state__in=UNFINISHED_STATES)
+    }
+    if not pending:
+        return []
+
+    batches = list(chunks(list(pending), BULK_LIMIT))
+    with ContextThreadPoolExecutor(
+        max_workers=settings.CAVATICA_IMPORT_WORKERS
+    ) as executor:
+        results = list(executor.map(api.imports.bulk_get, batches))
+
+    now = timezone.now()
+    updated = []
+    for batch, records in zip(batches, results):
+        for import_id, record in zip(batch, records):
+            imp = pending[import_id]
+            if not record.valid:
+                # The import can no longer be retrieved from Cavatica
+                imp.state = "FAILED"
+                imp.error = record.error.message or ""
+            elif record.resource.state != imp.state:
+                imp.state = record.resource.state
+                if imp.state == "FAILED" and record.resource.error:
+                    imp.error = record.resource.error.message or ""
+            else:
+                continue
+            imp.modified_at = now
+            updated.append(imp)
+
+    DeliveryImport.objects.bulk_update(
+        updated, ["state", "error", "modified_at"]
+    )
+
+    finished = sum(imp.state not in UNFINISHED_STATES for imp in updated)
+    logger.info(
+        f"Polled {len(pending)} imports, {finished} of which have finished"
+    )
+    return updated
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.26 on 2026-10-19 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_add_cavatica_permissions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryImport',
+            fields=[
+                ('import_id', models.CharField(help_text='The Cavatica import identifier', max_length=200, primary_key=True, serialize=False)),
+                ('folder', models.CharField(help_text='The name of the delivery folder the files are imported to', max_length=200)),
+                ('location', models.CharField(help_text='The location in the volume that is imported', max_length=1024)),
+                ('state', models.CharField(choices=[('PENDING', 'pending'), ('RUNNING', 'running'), ('COMPLETED', 'completed'), ('FAILED', 'failed')], default='PENDING', help_text='The state of the import in Cavatica', max_length=9)),
+                ('error', models.TextField(blank=True, default='', help_text='Why the import failed, if it did')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Time the import was submitted')),
+                ('modified_at', models.DateTimeField(auto_now=True, help_text='Time the state of the import last changed')),
+                ('project', models.ForeignKey(help_text='The project the files are imported to', on_delete=django.db.models.deletion.CASCADE, related_name='imports', to='projects.Project')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='deliveryimport',
+            index=models.Index(fields=['state'], name='projects_import_state_idx'),
+        ),
+    ]
@@ -105,3 +105,59 @@ class Project(models.Model):
 
     def __str__(self):
         return self.project_id
+
+
+IMPORT_STATES = (
+    ("PENDING", "pending"),
+    ("RUNNING", "running"),
+    ("COMPLETED", "completed"),
+    ("FAILED", "failed"),
+)
+
+
+class DeliveryImport(models.Model):
+    """
+    An import of a location in a study's volume into a delivery folder of a
+    Cavatica project. The state is updated by polling Cavatica until the
+    import has completed or failed.
+    """
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["state"], name="projects_import_state_idx")
+        ]
+
+    import_id = models.CharField(
+        primary_key=True,
+        max_length=200,
+        help_text="The Cavatica import identifier",
+    )
+    project = models.ForeignKey(
+        Project,
+        related_name="imports",
+        on_delete=models.CASCADE,
+        help_text="The project the files are imported to",
+    )
+    folder = models.CharField(
+        max_length=200,
+        help_text="The name of the delivery folder the files are imported to",
+    )
+    location = models.CharField(
+        max_length=1024,
+        help_text="The location in the volume that is imported",
+    )
+    state = models.CharField(
+        choices=IMPORT_STATES,
+        max_length=9,
+        default="PENDING",
+        help_text="The state of the import in Cavatica",
+    )
+    error = models.TextField(
+        blank=True, default="", help_text="Why the import failed, if it did"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, help_text="Time the import was submitted"
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True, help_text="Time the state of the import last changed"
+    )
@@ -5,6 +5,7 @@ from graphql import GraphQLError
 from graphql_relay import from_global_id
 from django_filters import FilterSet, OrderingFilter
 
+from creator.authorization import get_authorization
 from creator.projects.models import Project, PROJECT_TYPES
 
 from creator.projects.mutations import Mutation
@@ -30,11 +31,11 @@ class ProjectNode(DjangoObjectType):
         """
         Only return if the user is allowed to view projects
         """
-        user = info.context.user
+        auth = get_authorization(info.context)
 
         if not (
-            user.has_perm("projects.view_project")
-            or user.has_perm("projects.view_my_study_project")
+            auth.has_perm("projects.view_project")
+            or auth.has_perm("projects.view_my_study_project")
         ):
             raise GraphQLError("Not allowed")
 
@@ -45,10 +46,10 @@ class ProjectNode(DjangoObjectType):
 
         # If user only has view_my_study_project, make sure the project belongs
         # to one of their studies
-        if user.has_perm("projects.view_project") or (
-            user.has_perm("projects.view_my_study_project")
-            and project.study
-            and user.studies.filter(kf_id=project.study.kf_id).exists()
+        if auth.has_study_perm(
+            "projects.view_project",
+            "projects.view_my_study_project",
+            project.study_id,
         ):
             return project
 
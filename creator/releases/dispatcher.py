@@ -0,0 +1,153 @@
+"""
+Send release actions to the services of a release's tasks.
+
+Actions for all tasks in a release are sent concurrently over a shared
+keep-alive session so that a release with many services does not have to wait
+for each service to respond in turn. Services that support it may also be
+asked for the states of all of their tasks in one request.
+"""
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from creator.authentication import client_headers
+from creator.utils import ContextThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the process's shared requests session for talking to release
+    services, creating it if needed.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(
+                pool_connections=settings.RELEASE_DISPATCH_WORKERS,
+                pool_maxsize=settings.RELEASE_DISPATCH_WORKERS,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def _post(url, headers, body, timeout):
+    """
+    Post an action to a service and raise if it did not succeed
+    """
+    resp = get_session().post(url, headers=headers, json=body, timeout=timeout)
+    resp.raise_for_status()
+    return resp
+
+
+def dispatch_action(release, action, tasks):
+    """
+    Send _action_ to the service of each of the release's _tasks_ at once.
+
+    The release's studies and the authorization headers are resolved once for
+    all tasks. Returns a dict keyed by task kf_id of either the validated
+    response from the task's service or the exception that was raised while
+    requesting or validating it.
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return {}
+
+    headers = client_headers(settings.AUTH0_SERVICE_AUD)
+    studies = [study.kf_id for study in release.studies.all()]
+
+    workers = min(len(tasks), settings.RELEASE_DISPATCH_WORKERS)
+    with ContextThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for task in tasks:
+            body = task._action_body(action, studies=studies)
+            logger.info(
+                f"Sending action to {task.release_service.url}: {body}"
+            )
+            futures[task.pk] = pool.submit(
+                _post,
+                task.release_service.url + "/tasks",
+                headers,
+                body,
+                task.release_service.request_timeout,
+            )
+
+    results = {}
+    for task in tasks:
+        try:
+            resp = futures[task.pk].result()
+            results[task.pk] = task._parse_action_response(resp)
+        except Exception as err:
+            logger.error(
+                f"Problem requesting task '{task.pk}' for {action}: {err}"
+            )
+            results[task.pk] = err
+
+    return results
+
+
+def request_statuses(service, tasks):
+    """
+    Ask a _service_ that supports batched status requests for the states of
+    all the given _tasks_ at once.
+
+    The service receives a get_statuses action listing each task and
+    release id and is expected to respond with a list of the same responses
+    it gives to a get_status action:
+        {"tasks": [{"task_id": ..., "release_id": ..., "state": ...}, ...]}
+
+    Returns a dict keyed by task kf_id of the state reported for each task.
+    Tasks that the service did not report on are left out.
+    """
+    tasks = list(tasks)
+    headers = client_headers(settings.AUTH0_SERVICE_AUD)
+    body = {
+        "action": "get_statuses",
+        "tasks": [
+            {"task_id": task.kf_id, "release_id": task.release_id}
+            for task in tasks
+        ],
+    }
+
+    logger.info(
+        f"Requesting the status of {len(tasks)} tasks from {service.url}"
+    )
+    resp = _post(
+        service.url + "/tasks", headers, body, service.request_timeout
+    )
+
+    try:
+        content = resp.json()
+        reported = content["tasks"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(
+            f"The response could not be parsed as a list of task states: "
+            f"{resp.content[:100]}{resp.content[100:] and '...'}"
+        )
+
+    tasks = {task.kf_id: task for task in tasks}
+    states = {}
+    for state in reported:
+        task = tasks.get(state.get("task_id"))
+        # Ignore any states for tasks that we did not ask about
+        if task is None or (
+            state.get("release_id", task.release_id) != task.release_id
+        ):
+            logger.warning(
+                f"Received a state from {service.url} that did not match any "
+                f"requested task: {state}"
+            )
+            continue
+        states[task.kf_id] = state
+
+    return states
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.26 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0005_update_times'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='releaseservice',
+            name='timeout',
+            field=models.IntegerField(blank=True, help_text='Seconds to wait for the service to respond to an action. Defaults to the REQUESTS_TIMEOUT setting', null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.26 on 2026-10-19 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0006_releaseservice_timeout'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='releasetask',
+            options={'get_latest_by': 'created_at', 'permissions': [('list_all_releasetask', 'Show all release tasks'), ('report_releasetask', 'Report the state of a release task')]},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.26 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0007_add_report_releasetask_permission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='releaseservice',
+            name='batch_status',
+            field=models.BooleanField(default=False, help_text='Whether the service can report the status of many tasks in a single request'),
+        ),
+    ]
@@ -12,6 +12,7 @@ from semantic_version.django_fields import VersionField
 
 from creator.authentication import client_headers
 from creator.fields import kf_id_generator
+from creator.releases.dispatcher import get_session
 from creator.studies.models import Study
 from creator.jobs.models import JobLog
 
@@ -187,7 +188,10 @@ class ReleaseTask(models.Model):
     """
 
     class Meta:
-        permissions = [("list_all_releasetask", "Show all release tasks")]
+        permissions = [
+            ("list_all_releasetask", "Show all release tasks"),
+            ("report_releasetask", "Report the state of a release task"),
+        ]
         get_latest_by = "created_at"
 
     kf_id = models.CharField(max_length=11, primary_key=True, default=task_id)
@@ -228,34 +232,27 @@ class ReleaseTask(models.Model):
         auto_now_add=True, help_text="Time the task was created"
     )
 
-    def _send_action(self, action):
+    def _action_body(self, action, studies=None):
         """
-        Send a request to the task's service with a specified command and
-        return the json content of the response.
+        Build the body of an action request for the task's service.
+        The release's study kf_ids may be given as _studies_ to avoid
+        looking them up again for every task in the release.
         """
+        if studies is None:
+            studies = [study.kf_id for study in self.release.studies.all()]
 
-        headers = client_headers(settings.AUTH0_SERVICE_AUD)
-
-        body = {
+        return {
             "action": action,
             "task_id": self.kf_id,
             "release_id": self.release.kf_id,
-            "studies": [study.kf_id for study in self.release.studies.all()],
+            "studies": studies,
         }
 
-        logger.info(f"Sending action to {self.release_service.url}: {body}")
-        try:
-            resp = requests.post(
-                self.release_service.url + "/tasks",
-                headers=headers,
-                json=body,
-                timeout=settings.REQUESTS_TIMEOUT,
-            )
-            resp.raise_for_status()
-        except requests.exceptions.RequestException as err:
-            logger.error(f"Problem requesting task for {action}: {err}")
-            raise err
-
+    def _parse_action_response(self, resp):
+        """
+        Parse the json content of a response to an action and check that it
+        was intended for this task.
+        """
         try:
             state = resp.json()
             logger.info(
@@ -278,12 +275,40 @@ class ReleaseTask(models.Model):
 
         return state
 
+    def _send_action(self, action):
+        """
+        Send a request to the task's service with a specified command and
+        return the json content of the response.
+        """
+
+        headers = client_headers(settings.AUTH0_SERVICE_AUD)
+
+        body = self._action_body(action)
+
+        logger.info(f"Sending action to {self.release_service.url}: {body}")
+        try:
+            resp = get_session().post(
+                self.release_service.url + "/tasks",
+                headers=headers,
+                json=body,
+                timeout=self.release_service.request_timeout,
+            )
+            resp.raise_for_status()
+        except requests.exceptions.RequestException as err:
+            logger.error(f"Problem requesting task for {action}: {err}")
+            raise err
+
+        return self._parse_action_response(resp)
+
     @transition(field=state, source="waiting", target="pending")
-    def initialize(self):
+    def initialize(self, state=None):
         """
-        Sends the initialize command to the task's service.
+        Sends the initialize command to the task's service. The service's
+        response may be given as _state_ if it was already requested by the
+        release's dispatcher.
         """
-        state = self._send_action("initialize")
+        if state is None:
+            state = self._send_action("initialize")
 
         task_state = state["state"]
 
@@ -296,11 +321,14 @@ class ReleaseTask(models.Model):
             raise ValueError(error)
 
     @transition(field=state, source="pending", target="running")
-    def start(self):
+    def start(self, state=None):
         """
-        Sends the start command to the task's service.
+        Sends the start command to the task's service. The service's
+        response may be given as _state_ if it was already requested by the
+        release's dispatcher.
         """
-        state = self._send_action("start")
+        if state is None:
+            state = self._send_action("start")
 
         task_state = state["state"]
 
@@ -317,11 +345,14 @@ class ReleaseTask(models.Model):
         logger.info(f"Task {self.pk} entered staged state")
 
     @transition(field=state, source="staged", target="publishing")
-    def publish(self):
+    def publish(self, state=None):
         """
-        Sends the publish command to the task's service.
+        Sends the publish command to the task's service. The service's
+        response may be given as _state_ if it was already requested by the
+        release's dispatcher.
         """
-        state = self._send_action("publish")
+        if state is None:
+            state = self._send_action("publish")
 
         task_state = state["state"]
 
@@ -366,6 +397,14 @@ class ReleaseTask(models.Model):
     def check_state(self):
         """
         Check the task's state in the service and update if necessary.
+        """
+        state = self._send_action("get_status")
+        self.update_state(state)
+
+    def update_state(self, state):
+        """
+        Update the task to the _state_ reported by its service, either in
+        response to a status request or pushed by the service's callback.
         We only care about terminal states and the staged state as all other
         states should immediately be returned in response to an action
         initiated by us:
@@ -374,7 +413,6 @@ class ReleaseTask(models.Model):
          - publishing should be returned in response to publish
          - canceling should be returned in response to cancel
         """
-        state = self._send_action("get_status")
         task_state = state["state"]
 
         # There's nothing to be done if the service's state matches ours
@@ -439,6 +477,17 @@ class ReleaseService(models.Model):
         related_name="services",
         help_text="The user who created the service",
     )
+    timeout = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="Seconds to wait for the service to respond to an action."
+        " Defaults to the REQUESTS_TIMEOUT setting",
+    )
+    batch_status = models.BooleanField(
+        default=False,
+        help_text="Whether the service can report the status of many tasks"
+        " in a single request",
+    )
     last_ok_status = models.IntegerField(
         default=0,
         help_text="number of pings since last"
@@ -453,6 +502,13 @@ class ReleaseService(models.Model):
         auto_now_add=True, help_text="Time the task was created"
     )
 
+    @property
+    def request_timeout(self):
+        """
+        Number of seconds to wait for a response to an action
+        """
+        return self.timeout or settings.REQUESTS_TIMEOUT
+
 
 class ReleaseEvent(models.Model):
     """
@@ -157,6 +157,13 @@ class CreateReleaseServiceInput(graphene.InputObjectType):
         description="The url of the release service", required=True
     )
     enabled = graphene.Boolean(description="If the release service is enabled")
+    timeout = graphene.Int(
+        description="Seconds to wait for the release service to respond"
+    )
+    batch_status = graphene.Boolean(
+        description="If the release service can report the status of many "
+        "tasks in one request"
+    )
 
 
 class CreateReleaseServiceMutation(graphene.Mutation):
@@ -186,7 +193,14 @@ class CreateReleaseServiceMutation(graphene.Mutation):
                     f"There is a problem with the provided URL: {err}"
                 )
 
-        for attr in ["name", "description", "url", "enabled"]:
+        for attr in [
+            "name",
+            "description",
+            "url",
+            "enabled",
+            "timeout",
+            "batch_status",
+        ]:
             if attr in input:
                 setattr(release_service, attr, input[attr])
 
@@ -202,6 +216,13 @@ class UpdateReleaseServiceInput(graphene.InputObjectType):
     )
     url = graphene.String(description="The url of the release service")
     enabled = graphene.Boolean(description="If the release service is enabled")
+    timeout = graphene.Int(
+        description="Seconds to wait for the release service to respond"
+    )
+    batch_status = graphene.Boolean(
+        description="If the release service can report the status of many "
+        "tasks in one request"
+    )
 
 
 class UpdateReleaseServiceMutation(graphene.Mutation):
@@ -233,7 +254,14 @@ class UpdateReleaseServiceMutation(graphene.Mutation):
         except ReleaseService.DoesNotExist:
             raise GraphQLError(f"Release Service {node_id} does not exist")
 
-        for attr in ["name", "description", "url", "enabled"]:
+        for attr in [
+            "name",
+            "description",
+            "url",
+            "enabled",
+            "timeout",
+            "batch_status",
+        ]:
             if attr in input:
                 setattr(release_service, attr, input[attr])
 
@@ -1,18 +1,41 @@
 import logging
 import requests
 import django_rq
+from collections import Counter, defaultdict
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
 
 from creator.authentication import client_headers
 from creator.decorators import task
 from creator.studies.models import Study
 from creator.releases.models import Release, ReleaseTask, ReleaseService
+from creator.releases.dispatcher import dispatch_action, request_statuses
 
 User = get_user_model()
 
 logger = logging.getLogger(__name__)
 
+# Release states in which the release may need to be moved forward
+ACTIVE_RELEASE_STATES = [
+    "waiting",
+    "initializing",
+    "running",
+    "publishing",
+    "canceling",
+]
+
+# Task states which the task's service will not move the task out of without
+# an action from us, so there is no need to poll for their status
+UNPOLLED_TASK_STATES = [
+    "canceled",
+    "staged",
+    "rejected",
+    "failed",
+    "published",
+]
+
 ALL_RELEASES = """{
   allReleases {
     edges {
@@ -68,8 +91,8 @@ ALL_RELEASES = """{
 @task("release", related_models={Release: "release_id"})
 def initialize_release(release_id=None):
     """
-    Initializes a release by queueing up jobs to initialize each task in the
-    release.
+    Initializes a release by sending the initialize command to every task in
+    the release at once.
     """
     release = Release.objects.get(pk=release_id)
 
@@ -87,22 +110,68 @@ def initialize_release(release_id=None):
         )
         return
 
+    tasks = release.tasks.select_related("release_service").all()
     logger.info(
-        f"Queuing jobs to check that {release.tasks.count()} tasks are "
+        f"Sending initialize to {len(tasks)} tasks to check that they are "
         f"prepared to start processing release '{release.pk}'"
     )
+    results = dispatch_action(release, "initialize", tasks)
 
-    for task in release.tasks.all():
-        logger.info(
-            f"Queuing initialize_task for task '{task.pk}' "
-            f"of service '{task.release_service.name}'"
+    with transaction.atomic():
+        rejected = _apply_action_results(
+            tasks, results, "initialize", "reject"
         )
-        queue = django_rq.get_queue("releases")
+        if rejected:
+            logger.info(
+                "The release will be canceled as not all services were ready "
+                "to start a new release"
+            )
+            release.cancel()
+        else:
+            logger.info("All tasks in this release are pending now.")
+            release.start()
+        release.save()
+
+    queue = django_rq.get_queue("releases")
+    if rejected:
         queue.enqueue(
-            initialize_task, task_id=task.pk, ttl=settings.RQ_DEFAULT_TTL
+            cancel_release,
+            release_id=release.pk,
+            failed=True,
+            ttl=settings.RQ_DEFAULT_TTL,
+        )
+    else:
+        queue.enqueue(
+            start_release, release_id=release.pk, ttl=settings.RQ_DEFAULT_TTL
         )
 
 
+def _apply_action_results(tasks, results, transition, fallback):
+    """
+    Move each task through the _transition_ for the response that the
+    dispatcher received from its service. Tasks whose service errored or
+    responded with an unexpected state are moved through _fallback_ instead.
+    Returns the tasks that could not make the transition.
+    """
+    failures = []
+    for task in tasks:
+        try:
+            state = results[task.pk]
+            if isinstance(state, Exception):
+                raise state
+            getattr(task, transition)(state=state)
+        except Exception as err:
+            logger.error(
+                f"There was a problem trying to {transition} task "
+                f"'{task.pk}' of service '{task.release_service.name}': {err}"
+            )
+            getattr(task, fallback)()
+            failures.append(task)
+        task.save()
+
+    return failures
+
+
 @task("release_task", related_models={ReleaseTask: "task_id"})
 def initialize_task(task_id=None):
     """
@@ -166,18 +235,30 @@ def start_release(release_id=None):
         release.save()
         return
 
+    tasks = release.tasks.select_related("release_service").all()
     logger.info(
-        f"Queuing jobs to start {release.tasks.count()} tasks for the "
-        f"release '{release.pk}'"
+        f"Sending start to {len(tasks)} tasks for the release '{release.pk}'"
     )
-
-    for task in release.tasks.all():
-        logger.info(
-            f"Queuing start_task for task '{task.pk}' "
-            f"of service '{task.release_service.name}'"
-        )
+    results = dispatch_action(release, "start", tasks)
+
+    with transaction.atomic():
+        failures = _apply_action_results(tasks, results, "start", "failed")
+        if failures:
+            logger.info(
+                "The release will be canceled as not all services started a "
+                "new task"
+            )
+            release.cancel()
+            release.save()
+
+    if failures:
         queue = django_rq.get_queue("releases")
-        queue.enqueue(start_task, task_id=task.pk, ttl=settings.RQ_DEFAULT_TTL)
+        queue.enqueue(
+            cancel_release,
+            release_id=release.pk,
+            failed=True,
+            ttl=settings.RQ_DEFAULT_TTL,
+        )
 
 
 @task("release_task", related_models={ReleaseTask: "task_id"})
@@ -219,7 +300,7 @@ def publish_release(release_id=None):
     logger.info(f"Publishing release {release_id}")
 
     release = Release.objects.select_related().get(kf_id=release_id)
-    tasks = release.tasks.all()
+    tasks = release.tasks.select_related("release_service").all()
 
     # If there are no tasks in our release, just push it to the completed state
     # automatically.
@@ -232,15 +313,30 @@ def publish_release(release_id=None):
         release.save()
         return
 
-    # Iterate through each task sequentially and tell it to publish
-    for task in tasks:
-        logger.info(
-            f"Queuing publish_task for task '{task.pk}' "
-            f"of service '{task.release_service.name}'"
-        )
+    # Tell every task to publish at once
+    logger.info(
+        f"Sending publish to {len(tasks)} tasks for the release '{release.pk}'"
+    )
+    results = dispatch_action(release, "publish", tasks)
+
+    with transaction.atomic():
+        failures = _apply_action_results(tasks, results, "publish", "failed")
+        if failures:
+            logger.warning(
+                "The release will be canceled as not all services published "
+                "their tasks. Be cautious of undesired end states as some "
+                "other tasks may have published their data!"
+            )
+            release.cancel()
+            release.save()
+
+    if failures:
         queue = django_rq.get_queue("releases")
         queue.enqueue(
-            publish_task, task_id=task.pk, ttl=settings.RQ_DEFAULT_TTL
+            cancel_release,
+            release_id=release.pk,
+            failed=True,
+            ttl=settings.RQ_DEFAULT_TTL,
         )
 
 
@@ -333,23 +429,93 @@ def cancel_task(task_id=None):
 @task("scan_tasks")
 def scan_tasks():
     """
-    Queue tasks to update all active task's state
+    Queue tasks to update all active task's state.
+    Tasks of services that support batched status requests are checked
+    together with one job per service.
     """
     tasks = (
-        ReleaseTask.objects.exclude(state="canceled")
-        & ReleaseTask.objects.exclude(state="staged")
-        & ReleaseTask.objects.exclude(state="rejected")
-        & ReleaseTask.objects.exclude(state="failed")
-        & ReleaseTask.objects.exclude(state="published")
-    ).all()
+        ReleaseTask.objects.exclude(state__in=UNPOLLED_TASK_STATES)
+        .select_related("release_service")
+        .all()
+    )
 
+    queue = django_rq.get_queue("releases")
+    batches = defaultdict(list)
     for task in tasks:
+        if task.release_service.batch_status:
+            batches[task.release_service.pk].append(task.pk)
+            continue
+
         logger.info(
             f"Queuing check_task for task '{task.pk}' in state '{task.state}'"
         )
-        queue = django_rq.get_queue("releases")
         queue.enqueue(check_task, task_id=task.pk, ttl=settings.RQ_DEFAULT_TTL)
 
+    for service_id, task_ids in batches.items():
+        logger.info(
+            f"Queuing check_service_tasks for {len(task_ids)} tasks of "
+            f"service '{service_id}'"
+        )
+        queue.enqueue(
+            check_service_tasks,
+            service_id=service_id,
+            task_ids=task_ids,
+            ttl=settings.RQ_DEFAULT_TTL,
+        )
+
+
+@task("check_service_tasks")
+def check_service_tasks(service_id=None, task_ids=None):
+    """
+    Check the states of many of a service's tasks with a single request and
+    update any that changed.
+    If the service can't answer the batched request, each task is checked
+    individually instead.
+    """
+    service = ReleaseService.objects.get(pk=service_id)
+    tasks = ReleaseTask.objects.filter(
+        release_service=service, pk__in=task_ids
+    ).exclude(state__in=UNPOLLED_TASK_STATES)
+
+    try:
+        states = request_statuses(service, tasks)
+    except Exception as err:
+        logger.warning(
+            f"Could not get the status of tasks from service "
+            f"'{service.pk}' in one request: {err}. "
+            "Will check each task individually."
+        )
+        states = {}
+
+    # Apply all the reported states together
+    with transaction.atomic():
+        for task in tasks:
+            if task.pk not in states:
+                continue
+            try:
+                task.update_state(states[task.pk])
+            except Exception as err:
+                _fail_checked_task(task, err)
+
+    # Fall back to checking any tasks the service did not report on
+    for task in tasks:
+        if task.pk in states:
+            continue
+        try:
+            task.check_state()
+        except Exception as err:
+            _fail_checked_task(task, err)
+
+
+def _fail_checked_task(task, err):
+    """
+    Fail a task whose status could not be checked
+    """
+    logger.error(f"There was a problem checking the task's status: {err}. ")
+    logger.warning(f"Will mark the task '{task.pk}' as failed.")
+    task.failed()
+    task.save()
+
 
 @task("release_task", related_models={ReleaseTask: "task_id"})
 def check_task(task_id=None):
@@ -371,18 +537,20 @@ def check_task(task_id=None):
 @task("scan_releases")
 def scan_releases():
     """
-    Queue tasks to check any release in an active state.
+    Queue tasks to check any release in an active state that is ready to
+    move to a new state.
     """
-    releases = (
-        Release.objects.filter(state="waiting")
-        | Release.objects.filter(state="initializing")
-        | Release.objects.filter(state="running")
-        | Release.objects.filter(state="publishing")
-        | Release.objects.filter(state="canceling")
-    ).all()
+    releases = Release.objects.filter(state__in=ACTIVE_RELEASE_STATES).all()
 
     logger.info(f"Found {len(releases)} in states requiring action")
+
+    # Count the states of the tasks of every active release at once
+    counts = task_state_counts(releases)
+
     for release in releases:
+        transition = next_transition(release.state, counts[release.pk])
+        if transition is None:
+            continue
 
         logger.info(
             f"Queuing check_release for release '{release.pk}' in state "
@@ -394,6 +562,71 @@ def scan_releases():
         )
 
 
+def task_state_counts(releases):
+    """
+    Count the tasks in each state for each of the given _releases_ in a
+    single query.
+    Returns a dict of release kf_id to a Counter of task states.
+    """
+    counts = defaultdict(Counter)
+    rows = (
+        ReleaseTask.objects.filter(release__in=releases)
+        .values_list("release_id", "state")
+        .annotate(count=Count("kf_id"))
+        .order_by()
+    )
+    for release_id, state, count in rows:
+        counts[release_id][state] = count
+
+    return counts
+
+
+def next_transition(release_state, counts):
+    """
+    Determine what transition a release in _release_state_ should make given
+    the _counts_ of its tasks' states.
+
+    Returns one of 'canceled', 'failed', 'start', 'staged', 'complete' or
+    'cancel' or None if the release should stay in its current state.
+    """
+    total = sum(counts.values())
+
+    def all_in(*states):
+        return sum(counts[state] for state in states) == total
+
+    def any_in(*states):
+        return any(counts[state] > 0 for state in states)
+
+    # If all tasks are in canceled state, the release should assume the
+    # canceled state.
+    if release_state == "canceling" and all_in("canceled"):
+        return "canceled"
+    # If all tasks are in either canceled or failed state, the release
+    # will be marked as failed as at least one task must be marked as failed
+    # due to us handling the all canceled condition above
+    elif release_state == "canceling" and all_in(
+        "rejected", "canceled", "failed"
+    ):
+        return "failed"
+    # Check to see if we can start the releases
+    elif release_state == "initializing" and all_in("pending"):
+        return "start"
+    # Check to see if we can mark the release as staged
+    elif release_state == "running" and all_in("staged"):
+        return "staged"
+    # Check to see if we can mark the release as published
+    elif release_state == "publishing" and all_in("published"):
+        return "complete"
+    # Finally, we need to check if one of the tasks did end up in a cancel
+    # or fail transition so we can start the fail or cancel process
+    elif release_state not in ["canceling", "canceled", "failed"] and any_in(
+        "canceling", "failing", "failed", "canceled", "rejected"
+    ):
+        return "cancel"
+
+    return None
+
+
 @task("release", related_models={Release: "release_id"})
 def check_release(release_id=None):
     """
@@ -402,35 +635,21 @@ def check_release(release_id=None):
     release = Release.objects.get(pk=release_id)
     logger.info(f"Checking if release '{release.pk} needs to update its state")
     logger.info(f"Current state of release '{release.pk}': {release.state}")
-    states = {t.pk: t.state for t in release.tasks.all()}
-    logger.info(f"Current state of tasks: {states}")
+    counts = task_state_counts([release])[release.pk]
+    logger.info(f"Current state of tasks: {dict(counts)}")
 
-    # If all tasks are in canceled state, the release should assume the
-    # canceled state.
-    if release.state == "canceling" and all(
-        [t.state == "canceled" for t in release.tasks.all()]
-    ):
+    transition = next_transition(release.state, counts)
+
+    if transition == "canceled":
         release.canceled()
         release.save()
-    # If all tasks are in either canceled or failed state, the release
-    # will be marked as failed as at least one task must be marked as failed
-    # due to us handling the all canceled condition above
-    elif release.state == "canceling" and all(
-        [
-            t.state in ["rejected", "canceled", "failed"]
-            for t in release.tasks.all()
-        ]
-    ):
+    elif transition == "failed":
         logger.info(
             "All tasks were found to be in terminal states. Failing release"
         )
         release.failed()
         release.save()
-
-    # Check to see if we can start the releases
-    elif release.state == "initializing" and all(
-        [t.state == "pending" for t in release.tasks.all()]
-    ):
+    elif transition == "start":
         logger.info("All tasks are pending. Starting release")
         release.start()
         release.save()
@@ -438,32 +657,18 @@ def check_release(release_id=None):
         queue.enqueue(
             start_release, release_id=release.pk, ttl=settings.RQ_DEFAULT_TTL
         )
-
-    # Check to see if we can mark the release as staged
-    elif release.state == "running" and all(
-        [t.state == "staged" for t in release.tasks.all()]
-    ):
+    elif transition == "staged":
         logger.info("All tasks are staged. Setting release to 'staged'")
         release.staged()
         release.save()
-    # Check to see if we can mark the release as published
-    elif release.state == "publishing" and all(
-        [t.state == "published" for t in release.tasks.all()]
-    ):
+    elif transition == "complete":
         release.complete()
         release.save()
-
-    # Finally, we need to check if one of the tasks did end up in a cancel
-    # or fail transition so we can start the fail or cancel process
-    elif release.state not in ["canceling", "canceled", "failed"] and any(
-        task.state
-        in ["canceling", "failing", "failed", "canceled", "rejected"]
-        for task in release.tasks.all()
-    ):
+    elif transition == "cancel":
         # Check if one of the tasks failed so we can mark the release as a
         # failure
         failed = False
-        if any(task.state == "failed" for task in release.tasks.all()):
+        if counts["failed"] > 0:
             logger.info("A task failed. Failing the release")
             failed = True
 
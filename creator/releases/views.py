@@ -0,0 +1,83 @@
+import json
+import logging
+import django_rq
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotFound, JsonResponse
+from django.views.decorators.http import require_POST
+from django_fsm import TransitionNotAllowed
+
+from creator.releases.models import ReleaseTask
+from creator.releases.tasks import check_release
+
+logger = logging.getLogger(__name__)
+
+
+@require_POST
+def task_status(request, task_id):
+    """
+    Receive a task's new state pushed by its release service.
+
+    The body has the same form as the service's response to an action:
+        {"task_id": "TA_00000000", "release_id": "RE_00000000",
+         "state": "staged"}
+
+    Reported states are applied to the task immediately and the task's
+    release is queued to be checked so that it may follow the task without
+    waiting for the next scan.
+    """
+    user = request.user
+
+    # Check that the user is allowed to report task states
+    if not (
+        user.is_authenticated and user.has_perm("releases.report_releasetask")
+    ):
+        return HttpResponse("Not authorized to report task states", status=401)
+
+    try:
+        state = json.loads(request.body)
+        state["state"]
+    except (ValueError, KeyError, TypeError):
+        return HttpResponse(
+            "Body must be a JSON object containing a state", status=400
+        )
+
+    with transaction.atomic():
+        try:
+            task = ReleaseTask.objects.select_for_update().get(pk=task_id)
+        except ReleaseTask.DoesNotExist:
+            return HttpResponseNotFound("No task exists with given ID")
+
+        if state.get("task_id", task.pk) != task.pk or (
+            state.get("release_id", task.release_id) != task.release_id
+        ):
+            return HttpResponse(
+                "Reported state does not match the task", status=400
+            )
+
+        previous_state = task.state
+        try:
+            task.update_state(state)
+        except (ValueError, TransitionNotAllowed) as err:
+            logger.error(f"Could not apply reported state to {task.pk}: {err}")
+            return HttpResponse(str(err), status=400)
+
+    if task.state != previous_state:
+        logger.info(
+            f"Task '{task.pk}' reported state '{task.state}'. Queuing "
+            f"check_release for release '{task.release_id}'"
+        )
+        queue = django_rq.get_queue("releases")
+        queue.enqueue(
+            check_release,
+            release_id=task.release_id,
+            ttl=settings.RQ_DEFAULT_TTL,
+        )
+
+    return JsonResponse(
+        {
+            "task_id": task.pk,
+            "release_id": task.release_id,
+            "state": task.state,
+        }
+    )
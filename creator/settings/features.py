@@ -61,6 +61,11 @@ STUDY_BUCKETS_REPLICATION_ROLE = os.environ.get(
     "STUDY_BUCKETS_REPLICATION_ROLE"
 )
 
+# The number of configuration steps of a new study bucket to run at once
+STUDY_BUCKETS_SETUP_WORKERS = int(
+    os.environ.get("STUDY_BUCKETS_SETUP_WORKERS", 8)
+)
+
 
 # CAVATICA #####################################################################
 # The Study Creator can create new projects within Cavatica.
@@ -120,6 +125,35 @@ CAVATICA_READWRITE_ACCESS_KEY = os.environ.get("CAVATICA_READWRITE_ACCESS_KEY")
 CAVATICA_READWRITE_SECRET_KEY = os.environ.get("CAVATICA_READWRITE_SECRET_KEY")
 
 
+# The number of projects to list from Cavatica in each request
+CAVATICA_SYNC_PAGE_SIZE = int(os.environ.get("CAVATICA_SYNC_PAGE_SIZE", 100))
+
+# Whether the scheduled sync skips projects that have not been modified since
+# the last sync
+CAVATICA_SYNC_INCREMENTAL = (
+    os.environ.get("CAVATICA_SYNC_INCREMENTAL", "True") == "True"
+)
+
+# The number of objects to list from a study's volume in each request when
+# delivering its files
+CAVATICA_VOLUME_PAGE_SIZE = int(
+    os.environ.get("CAVATICA_VOLUME_PAGE_SIZE", 100)
+)
+
+# The number of imports submitted in each bulk request, at most 100
+CAVATICA_IMPORT_CHUNK_SIZE = int(
+    os.environ.get("CAVATICA_IMPORT_CHUNK_SIZE", 100)
+)
+
+# The number of bulk import requests made at once
+CAVATICA_IMPORT_WORKERS = int(os.environ.get("CAVATICA_IMPORT_WORKERS", 4))
+
+# How long to remember the id of a project's delivery folder, in seconds
+CAVATICA_DELIVERY_FOLDER_TIMEOUT = int(
+    os.environ.get("CAVATICA_DELIVERY_FOLDER_TIMEOUT", 86400)
+)
+
+
 # Create buckets for new studies
 FEAT_STUDY_BUCKETS_CREATE_BUCKETS = os.environ.get(
     "FEAT_STUDY_BUCKETS_CREATE_BUCKETS", False
@@ -158,6 +192,15 @@ SLACK_RELEASE_CHANNEL = os.environ.get(
 # Slack message chunks limit
 SLACK_BLOCK_LIMIT = 50
 
+# The number of channels that messages are posted to at once
+SLACK_DELIVERY_WORKERS = int(os.environ.get("SLACK_DELIVERY_WORKERS", 8))
+# Times a call is retried after Slack responds that it is rate limited
+SLACK_MAX_RETRIES = int(os.environ.get("SLACK_MAX_RETRIES", 3))
+# Seconds that the id of a channel is remembered for
+SLACK_CHANNEL_CACHE_TIMEOUT = int(
+    os.environ.get("SLACK_CHANNEL_CACHE_TIMEOUT", 24 * 60 * 60)
+)
+
 
 # GWO INGEST RUNS ##############################################################
 # The Study Creator can automate various ingest processes such as ingesting
@@ -196,6 +239,18 @@ COORDINATOR_URL = os.environ.get(
 )
 
 
+# GRAPHQL ######################################################################
+
+# The number of parsed and validated query documents to keep in each process
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(
+    os.environ.get("GRAPHQL_DOCUMENT_CACHE_SIZE", 250)
+)
+# Seconds that a persisted query is kept after it is last registered
+GRAPHQL_PERSISTED_QUERY_TIMEOUT = int(
+    os.environ.get("GRAPHQL_PERSISTED_QUERY_TIMEOUT", 7 * 24 * 60 * 60)
+)
+
+
 # LOGGING ######################################################################
 # The Study Creator can store logs in S3 for asynchronous tasks performed by its
 # workers
@@ -205,3 +260,25 @@ LOG_BUCKET = os.environ.get("LOG_BUCKET", "kf-study-creator-logging")
 # The relative path to the directory where job logs will be stored within the
 # log bucket
 LOG_DIR = os.environ.get("LOG_DIR", "logs/")
+# Output of running jobs is shipped to their logs whenever this many bytes
+# have been buffered or the oldest buffered output is this many seconds old
+LOG_SHIP_BYTES = int(os.environ.get("LOG_SHIP_BYTES", 64 * 1024))
+LOG_SHIP_INTERVAL = int(os.environ.get("LOG_SHIP_INTERVAL", 10))
+# The number of most recent runs of each job to keep execution metrics for
+JOB_RUN_RETENTION = int(os.environ.get("JOB_RUN_RETENTION", 1000))
+
+
+# EVENTS #######################################################################
+# Events older than the retention period are moved out of the database into
+# daily archive files by the archive_events job
+
+# The number of days events are kept in the database
+EVENT_RETENTION_DAYS = int(os.environ.get("EVENT_RETENTION_DAYS", 365))
+# The bucket where event archives will be kept
+EVENT_ARCHIVE_BUCKET = os.environ.get("EVENT_ARCHIVE_BUCKET", LOG_BUCKET)
+# The relative path to the directory where event archives will be stored
+EVENT_ARCHIVE_DIR = os.environ.get("EVENT_ARCHIVE_DIR", "events/")
+# The number of events that are read or deleted at once while archiving
+EVENT_ARCHIVE_BATCH_SIZE = int(
+    os.environ.get("EVENT_ARCHIVE_BATCH_SIZE", 5000)
+)
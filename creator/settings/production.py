@@ -147,9 +147,19 @@ WSGI_APPLICATION = "creator.wsgi.application"
 
 GRAPHENE = {
     "SCHEMA": "creator.schema.schema",
+    "MIDDLEWARE": ["creator.graphql_profiling.ProfilingMiddleware"],
     "RELAY_CONNECTION_MAX_LIMIT": 250,
 }
 
+# Record the time spent in each resolver of GraphQL operations
+GRAPHQL_PROFILE_RESOLVERS = (
+    os.environ.get("GRAPHQL_PROFILE_RESOLVERS", "False") == "True"
+)
+# Include the profile of each operation in the extensions of its response
+GRAPHQL_PROFILE_EXTENSIONS = (
+    os.environ.get("GRAPHQL_PROFILE_EXTENSIONS", "False") == "True"
+)
+
 
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
@@ -367,9 +377,33 @@ AUTH0_SECRET = os.environ.get("AUTH0_SECRET")
 
 CACHE_AUTH0_KEY = os.environ.get("CACHE_AUTH0_KEY", "AUTH0_PUBLIC_KEY")
 CACHE_AUTH0_TIMEOUT = os.environ.get("CACHE_AUTH0_TIMEOUT", 86400)
+# Seconds before a m2m token expires at which it will be refreshed
+AUTH0_TOKEN_REFRESH_MARGIN = int(
+    os.environ.get("AUTH0_TOKEN_REFRESH_MARGIN", 300)
+)
+# Seconds to remember the user of a verified token
+CACHE_AUTH0_TOKEN_TIMEOUT = int(
+    os.environ.get("CACHE_AUTH0_TOKEN_TIMEOUT", 300)
+)
+# Minimum seconds between updates to a user's last login time
+LAST_LOGIN_INTERVAL = int(os.environ.get("LAST_LOGIN_INTERVAL", 900))
+# Minimum seconds between refreshes of the Auth0 signing keys when a token is
+# signed by a key that is not yet known
+AUTH0_JWKS_REFRESH_INTERVAL = int(
+    os.environ.get("AUTH0_JWKS_REFRESH_INTERVAL", 60)
+)
 
 CLIENT_ADMIN_SCOPE = "role:admin"
 
 # Number of seconds after which to timeout any outgoing requests
 REQUESTS_TIMEOUT = os.environ.get("REQUESTS_TIMEOUT", 30)
 REQUESTS_HEADERS = {"User-Agent": "StudyCreator/production (python-requests)"}
+
+# Maximum number of release services to send an action to at once
+RELEASE_DISPATCH_WORKERS = int(os.environ.get("RELEASE_DISPATCH_WORKERS", 10))
+# Seconds between polls of the state of active release tasks. Services
+# should push state changes to the task status endpoint, so polling is only
+# a fallback for missed callbacks.
+RELEASE_TASK_POLL_INTERVAL = int(
+    os.environ.get("RELEASE_TASK_POLL_INTERVAL", 600)
+)
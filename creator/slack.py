@@ -1,16 +1,216 @@
+import time
 import logging
 import datetime
+import threading
 import pytz
 import re
+from functools import partial
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from collections import defaultdict
+from collections import defaultdict, Counter
+from django.db.models import Sum
 from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
 from creator.studies.models import Study
+from creator.events.models import Event, StudyActivity
+from creator.utils import ContextThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Calls per minute allowed by each of Slack's rate limit tiers
+# https://api.slack.com/docs/rate-limits
+TIER_LIMITS = {1: 1, 2: 20, 3: 50, 4: 100}
+METHOD_TIERS = {
+    "conversations_list": 2,
+    "conversations_create": 2,
+    "conversations_setTopic": 2,
+    "conversations_invite": 3,
+    "conversations_join": 3,
+    "pins_add": 2,
+}
+# Messages may be posted about once a second to each channel
+POST_MESSAGE_LIMIT = 60
+
+
+class RateLimiter:
+    """
+    A token bucket that allows _per_minute_ calls each minute, with bursts of
+    up to a tenth of that. Calls may be paused for everyone when Slack asks
+    us to back off.
+    """
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60
+        self.capacity = max(1, per_minute // 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.resume_at = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a call may be made
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate,
+                )
+                self.updated = now
+                if now >= self.resume_at and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(
+                    self.resume_at - now, (1 - self.tokens) / self.rate
+                )
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(method, channel=None):
+    """
+    Return the process's rate limiter for a Slack method. Messages are
+    limited for each channel, other methods for the whole workspace.
+    """
+    if method == "chat_postMessage":
+        key, per_minute = (method, channel), POST_MESSAGE_LIMIT
+    else:
+        key, per_minute = method, TIER_LIMITS[METHOD_TIERS.get(method, 2)]
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(per_minute)
+        return _limiters[key]
+
+
+class SlackDelivery:
+    """
+    Makes calls to the Slack Web API within Slack's rate limits.
+
+    Methods of the WebClient may be called on the delivery directly, eg:
+    delivery.chat_postMessage(channel=..., text=...). Calls wait for their
+    method's rate limiter and are retried after the Retry-After period when
+    Slack responds with a 429.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or WebClient(token=settings.SLACK_TOKEN)
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        return partial(self.call, method)
+
+    def call(self, method, **kwargs):
+        limiter = get_limiter(method, kwargs.get("channel"))
+        attempt = 0
+        while True:
+            limiter.acquire()
+            try:
+                return getattr(self.client, method)(**kwargs)
+            except SlackApiError as err:
+                if (
+                    err.response.status_code != 429
+                    or attempt >= settings.SLACK_MAX_RETRIES
+                ):
+                    raise
+                retry_after = int(err.response.headers.get("Retry-After", 1))
+                logger.info(
+                    f"Slack rate limited {method}, retrying in {retry_after}s"
+                )
+                limiter.pause(retry_after)
+                attempt += 1
+
+    def channel_ids(self, names):
+        """
+        Resolve channel names to ids. Ids are cached, so the workspace's
+        channels are only listed when a name has not been seen before.
+        Names that can't be found are left out.
+        """
+        names = set(names)
+        keys = {f"SLACK_CHANNEL:{name}": name for name in names}
+        found = {
+            keys[key]: channel_id
+            for key, channel_id in cache.get_many(keys.keys()).items()
+        }
+        missing = names - set(found)
+        if not missing:
+            return found
+
+        listed = {}
+        cursor = None
+        while missing - set(listed):
+            params = {"exclude_archived": True, "limit": 1000}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.conversations_list(**params)
+            channels = response.get("channels", [])
+            listed.update({c["name"]: c["id"] for c in channels})
+            next_cursor = response.get("response_metadata", {}).get(
+                "next_cursor"
+            )
+            if not channels or not next_cursor or next_cursor == cursor:
+                break
+            cursor = next_cursor
+
+        cache.set_many(
+            {f"SLACK_CHANNEL:{name}": id for name, id in listed.items()},
+            settings.SLACK_CHANNEL_CACHE_TIMEOUT,
+        )
+        found.update(
+            {name: listed[name] for name in missing if name in listed}
+        )
+        return found
+
+    def remember_channel(self, name, channel_id):
+        cache.set(
+            f"SLACK_CHANNEL:{name}",
+            channel_id,
+            settings.SLACK_CHANNEL_CACHE_TIMEOUT,
+        )
+
+    def forget_channel(self, name):
+        cache.delete(f"SLACK_CHANNEL:{name}")
+
+    def post_all(self, messages):
+        """
+        Join each channel and post its message, several channels at a time.
+        _messages_ is a list of (channel id, keyword arguments for
+        chat_postMessage). Returns a list of either Slack's response or the
+        exception that was raised for each message, in order.
+        """
+        if not messages:
+            return []
+
+        def post(channel_id, message):
+            self.conversations_join(channel=channel_id)
+            return self.chat_postMessage(channel=channel_id, **message)
+
+        workers = min(len(messages), settings.SLACK_DELIVERY_WORKERS)
+        with ContextThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(post, channel_id, message)
+                for channel_id, message in messages
+            ]
+
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as err:
+                results.append(err)
+        return results
+
 
 def post_pin(client, study, channel_id):
     """Post a descriptive message for the channel and pin it"""
@@ -89,13 +289,14 @@ def setup_slack(study):
     """
     Setup a Slack channel for the new study
     """
-    client = WebClient(token=settings.SLACK_TOKEN)
+    client = SlackDelivery()
 
     # Create channel
     name = study.kf_id.lower().replace("_", "-")
     response = client.conversations_create(name=name)
     channel_id = response["channel"]["id"]
     channel_name = response["channel"]["name"]
+    client.remember_channel(channel_name, channel_id)
     # Update study with the slack channel's name
     study.slack_channel = channel_name
     study.save()
@@ -117,8 +318,11 @@ def summary_post():
     """
     studies = Study.objects.all()
 
+    # Activity is counted by the hour, so the summary starts on the hour
     today = timezone.now()
-    yesterday = today - datetime.timedelta(days=1)
+    yesterday = (today - datetime.timedelta(days=1)).replace(
+        minute=0, second=0, microsecond=0
+    )
     since = yesterday.strftime("%Y/%m/%d")
 
     def study_header(url, study_id, study_name):
@@ -177,25 +381,21 @@ def summary_post():
             ],
         }
 
-    def make_study_message(studyObj):
+    def make_study_message(studyObj, counts, study_events):
         """
-        Make an event timeline for a study
+        Make an event timeline for a study from the counts of each type of
+        event in the study and its events, newest first
         """
         blocks = []
         study_id = studyObj.kf_id
         study_name = studyObj.name
 
-        # Get all events for a single study within previous 24 hours
-        study_events = studyObj.events.filter(
-            created_at__range=(yesterday, today)
-        )
-
         # Collect and form all the events to slack messages
-        new_doc = study_events.filter(event_type="SF_CRE").count()
-        del_doc = study_events.filter(event_type="SF_DEL").count()
-        upd_doc = study_events.filter(event_type="SF_UPD").count()
-        add_col = study_events.filter(event_type="CB_ADD").count()
-        rem_col = study_events.filter(event_type="CB_REM").count()
+        new_doc = counts["SF_CRE"]
+        del_doc = counts["SF_DEL"]
+        upd_doc = counts["SF_UPD"]
+        add_col = counts["CB_ADD"]
+        rem_col = counts["CB_REM"]
 
         file_timelines = defaultdict(list)
         file_names = {}
@@ -205,7 +405,7 @@ def summary_post():
         )
 
         # Loop through all events to get the ones about file or collaborators
-        for i, ev in enumerate(reversed(study_events)):
+        for i, ev in enumerate(study_events):
             if ev.event_type == "SF_DEL":
                 file_id = "DELETED"
             elif ev.event_type == "CB_ADD" or ev.event_type == "CB_REM":
@@ -328,20 +528,40 @@ def summary_post():
         f"Posting slack messages to {len(filtered_studies)} studies"
         f" - updates since {since}"
     )
-    client = WebClient(token=settings.SLACK_TOKEN)
-
-    # Construct a mapping of channel name to id mappings, most Slack methods
-    # require ids, not names
-    channels = {
-        c["name"]: c["id"]
-        for c in client.conversations_list(
-            exclude_archived=True,
-            limit=1000,
-        ).get("channels", [])
-    }
 
+    # Count each type of event in each study from the hourly activity
+    activity = defaultdict(Counter)
+    for row in (
+        StudyActivity.objects.filter(
+            study__in=filtered_studies, hour__gte=yesterday
+        )
+        .values("study_id", "event_type")
+        .annotate(total=Sum("count"))
+        .order_by()
+    ):
+        activity[row["study_id"]][row["event_type"]] = row["total"]
+
+    # Only the events of studies with recent activity are needed
+    events = defaultdict(list)
+    for ev in (
+        Event.objects.filter(
+            study_id__in=list(activity.keys()),
+            created_at__range=(yesterday, today),
+        )
+        .select_related("user", "file")
+        .order_by("-created_at", "-id")
+    ):
+        events[ev.study_id].append(ev)
+    client = SlackDelivery()
+
+    # Most Slack methods require channel ids, not names
+    channels = client.channel_ids(
+        study.slack_channel for study in filtered_studies
+    )
+
+    messages = []
+    posted = []
     for study in filtered_studies:
-        # Try to get channel id from list of channels
         channel_id = channels.get(study.slack_channel)
         # We couldn't find the channel
         if channel_id is None:
@@ -351,18 +571,34 @@ def summary_post():
             )
             continue
 
-        blocks = make_study_message(study)
+        blocks = make_study_message(
+            study, activity[study.kf_id], events[study.kf_id]
+        )
         if len(blocks) > 0:
-            response = client.conversations_join(channel=channel_id)
-
-            response = client.chat_postMessage(
-                channel=channel_id,
-                blocks=blocks,
-                text=f"There are new updates for study {study.name}.",
+            messages.append(
+                (
+                    channel_id,
+                    {
+                        "blocks": blocks,
+                        "text": (
+                            f"There are new updates for study {study.name}."
+                        ),
+                    },
+                )
             )
+            posted.append(study)
 
-            # Should be caught by the slack client but we will check anyway
-            if "ok" in response and not response["ok"]:
-                logger.warning(f"Slack responded unexpectedly: {response}")
+    for study, response in zip(posted, client.post_all(messages)):
+        if isinstance(response, Exception):
+            logger.warning(
+                f"Could not post to '{study.slack_channel}': {response}"
+            )
+            # The channel may have been renamed or archived since its id
+            # was cached
+            if isinstance(response, SlackApiError):
+                client.forget_channel(study.slack_channel)
+        # Should be caught by the slack client but we will check anyway
+        elif "ok" in response and not response["ok"]:
+            logger.warning(f"Slack responded unexpectedly: {response}")
 
     return len(filtered_studies)
@@ -2,7 +2,12 @@ import graphene
 from graphql import GraphQLError
 from graphene_django import DjangoObjectType
 from graphene_django.filter import DjangoFilterConnectionField
-from creator.events.schema import EventNode, EventFilter
+from creator.authorization import get_authorization
+from creator.events.schema import (
+    EventNode,
+    EventFilter,
+    KeysetConnectionField,
+)
 from creator.files.schema.file import FileNode, FileFilter
 from creator.files.schema.version import VersionNode, VersionFilter
 from creator.releases.nodes import ReleaseNode
@@ -18,7 +23,7 @@ from creator.studies.models import (
 class StudyNode(DjangoObjectType):
     """ A study in Kids First """
 
-    events = DjangoFilterConnectionField(
+    events = KeysetConnectionField(
         EventNode, filterset_class=EventFilter, description="List all events"
     )
 
@@ -54,10 +59,9 @@ class StudyNode(DjangoObjectType):
         except cls._meta.model.DoesNotExist:
             raise GraphQLError("Study was not found")
 
-        user = info.context.user
-        if user.has_perm("studies.view_study") or (
-            user.has_perm("studies.view_my_study")
-            and user.studies.filter(kf_id=study.kf_id).exists()
+        auth = get_authorization(info.context)
+        if auth.has_study_perm(
+            "studies.view_study", "studies.view_my_study", study.kf_id
         ):
             return study
         else:
@@ -12,6 +12,7 @@ from creator.projects.cavatica import (
     setup_cavatica,
     sync_cavatica_projects,
     import_volume_files,
+    poll_delivery_imports,
 )
 from creator.slack import setup_slack, summary_post
 from creator.analyses.analyzer import analyze_version
@@ -21,6 +22,7 @@ from creator.organizations.models import Organization
 from creator.studies.models import Study
 from creator.files.models import Version
 from creator.events.models import Event
+from creator.events.archive import archive_events
 
 User = get_user_model()
 
@@ -216,12 +218,20 @@ def import_delivery_files_task(project_id, user_sub):
         raise
 
 
+@task(job="delivery_imports")
+def poll_delivery_imports_task():
+    """
+    Update the state of unfinished imports to Cavatica delivery projects
+    """
+    poll_delivery_imports()
+
+
 @task(job="cavatica_sync")
 def sync_cavatica_projects_task():
     """
     Synchronize Cavatica projects with the Study Creator
     """
-    sync_cavatica_projects()
+    sync_cavatica_projects(full=not settings.CAVATICA_SYNC_INCREMENTAL)
 
 
 @task(job="dataservice_sync")
@@ -298,6 +308,16 @@ def slack_notify_task():
     summary_post()
 
 
+@task(job="archive_events")
+def archive_events_task():
+    """
+    Move events past their retention period into archives
+    """
+    archives = archive_events()
+    total = sum(archive.event_count for archive in archives)
+    logger.info(f"Archived {total} events in {len(archives)} archives")
+
+
 @task(job="analyzer")
 def analyzer_task():
     """
@@ -9,6 +9,7 @@ import creator.extract_configs.views
 import creator.jobs.views
 import creator.ingest_runs.views
 import creator.data_templates.views
+import creator.releases.views
 
 
 def health_check(request):
@@ -71,6 +72,10 @@ urlpatterns = [
         creator.extract_configs.views.download_config,
     ),
     path(r"logs/<log_id>", creator.jobs.views.download_log),
+    path(
+        r"releases/tasks/<task_id>/status",
+        csrf_exempt(creator.releases.views.task_status),
+    ),
     path(
         r'download/data_review/<review_id>/validation/<file_type>',
         creator.ingest_runs.views.download_validation_file
@@ -1,5 +1,7 @@
 import time
 import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 import django_rq
 from rq.job import NoSuchJobError, JobStatus, Job
 from rq.command import send_kill_horse_command
@@ -74,3 +76,15 @@ def stop_job(job_id, queue=None, delete=False):
             f"{queue.name} and all job registries"
         )
         redis_job.delete()
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    A ThreadPoolExecutor that runs each call in a copy of the submitting
+    thread's context. Worker threads do not otherwise see its context
+    variables, such as the task invocation that captures log output.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
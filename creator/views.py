@@ -1,17 +1,71 @@
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseBadRequest
+from graphene_django.views import HttpError
 from graphene_file_upload.django import FileUploadGraphQLView
 
+from creator.graphql_backend import (
+    document_backend,
+    resolve_persisted_query,
+    PersistedQueryNotFound,
+)
+from creator.graphql_profiling import OperationProfile, get_profile
+from creator.events.outbox import collect_events
+
 
 class SentryGraphQLView(FileUploadGraphQLView):
     """
     Sets the Sentry transaction name to be that of the GraphQL operation.
     This helps break down all the /graphql requests into more actionable
     buckets within Sentry.
+
+    Query documents are parsed and validated once and then cached, and
+    queries may be sent as persisted query hashes.
+
+    The time and database queries of each operation are profiled and logged.
+    Events emitted by an operation are written together once it completes.
     """
 
+    def get_backend(self, request):
+        return document_backend
+
+    @staticmethod
+    def get_graphql_params(request, data):
+        """
+        Resolve the query from the persistedQuery extension, if there is one
+        """
+        query, variables, operation_name, id = (
+            FileUploadGraphQLView.get_graphql_params(request, data)
+        )
+
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(
+                    HttpResponseBadRequest("Extensions are invalid JSON.")
+                )
+        persisted = (extensions or {}).get("persistedQuery")
+        if not persisted:
+            return query, variables, operation_name, id
+
+        try:
+            query = resolve_persisted_query(query, persisted)
+        except PersistedQueryNotFound as err:
+            # Clients will retry with the full query when they receive this
+            raise HttpError(HttpResponse(status=200), str(err))
+        except ValueError as err:
+            raise HttpError(HttpResponseBadRequest(str(err)))
+
+        return query, variables, operation_name, id
+
     def execute_graphql_request(self, *args, **kwargs):
         """
         Attempt to extract the operation name and use it to set the Sentry
-        transaction name.
+        transaction name, then execute the operation while profiling it.
         """
 
         # args[4] is the operationName, see super's signature:
@@ -28,4 +82,33 @@ class SentryGraphQLView(FileUploadGraphQLView):
             if transaction is not None:
                 transaction.name = args[4]
 
-        return super().execute_graphql_request(*args, **kwargs)
+        # Only operations are profiled, not requests for GraphiQL
+        if len(args) < 5 or not args[2]:
+            return super().execute_graphql_request(*args, **kwargs)
+
+        request, _, _, _, operation_name = args[:5]
+
+        profile = OperationProfile(operation_name)
+        request._graphql_profile = profile
+
+        with connection.execute_wrapper(profile.record_query):
+            with collect_events():
+                result = super().execute_graphql_request(*args, **kwargs)
+
+        profile.finish()
+        profile.log()
+        return result
+
+    def json_encode(self, request, d, pretty=False):
+        """
+        Add the operation's profile to the response's extensions if enabled
+        """
+        profile = get_profile(request)
+        if (
+            settings.GRAPHQL_PROFILE_EXTENSIONS
+            and profile is not None
+            and profile.duration is not None
+            and isinstance(d, dict)
+        ):
+            d = dict(d, extensions={"profile": profile.summary()})
+        return super().json_encode(request, d, pretty=pretty)
@@ -3,7 +3,7 @@ from graphql import GraphQLError
 from creator.studies.factories import StudyFactory
 from creator.files.factories import FileFactory
 from creator.files.models import Version
-from creator.analyses.analyzer import extract_data
+from creator.analyses.analyzer import extract_data, extract_dataframe
 
 
 def test_extract_data_no_study(db, settings):
@@ -14,3 +14,27 @@ def test_extract_data_no_study(db, settings):
 
     with pytest.raises(GraphQLError) as err:
         extract_data(version)
+
+
+def test_extract_dataframe(db, tmpdir, mocker):
+    """
+    Test that delimited files are read into a DataFrame with only the
+    requested columns
+    """
+    path = tmpdir.join("manifest.tsv")
+    path.write("A\tB\tC\n1\tx\t\n2\tx\t3\n3\ty\t4\n")
+
+    version = Version()
+    version.key.name = "manifest.tsv"
+    mocker.patch.object(
+        version.key, "open", return_value=open(str(path), "rb")
+    )
+
+    df = extract_dataframe(
+        version, columns=["A", "B"], dtype={"B": "category"}, chunksize=2
+    )
+
+    assert list(df.columns) == ["A", "B"]
+    assert df["A"].tolist() == ["1", "2", "3"]
+    assert df["B"].dtype.name == "category"
+    assert set(df["B"].cat.categories) == {"x", "y"}
@@ -1,3 +1,4 @@
+import time
 import requests
 import pytest
 from django.conf import settings
@@ -13,7 +14,7 @@ def test_headers_from_cache(db, mocker):
     get_token = mocker.patch('creator.authentication.get_token')
 
     cache_key = "ACCESS_TOKEN:my_aud"
-    cache.set(cache_key, "ABC")
+    cache.set(cache_key, {"token": "ABC", "expires_at": time.time() + 3600})
 
     headers = client_headers("my_aud")
     assert "Authorization" in headers
@@ -35,10 +36,60 @@ def test_header_cache(db, mocker):
     assert headers["Authorization"] == "Bearer ABC"
 
     cache_key = f"ACCESS_TOKEN:{settings.AUTH0_SERVICE_AUD}"
-    assert cache.get(cache_key) == "ABC"
+    assert cache.get(cache_key)["token"] == "ABC"
+    assert "Authorization" not in settings.REQUESTS_HEADERS
     cache.delete(cache_key)
 
 
+def test_header_refresh_ahead(db, mocker):
+    """
+    Test that a token that is about to expire is still used while a new one
+    is fetched in the background
+    """
+    mock_token = mocker.patch("creator.authentication.get_token")
+    mock_token.return_value = "DEF"
+    mock_thread = mocker.patch("creator.authentication.threading.Thread")
+
+    cache_key = "ACCESS_TOKEN:my_aud"
+    cache.set(cache_key, {"token": "ABC", "expires_at": time.time() + 10})
+
+    headers = client_headers("my_aud")
+    assert headers["Authorization"] == "Bearer ABC"
+    assert mock_token.call_count == 0
+    assert mock_thread.call_count == 1
+
+    # Run the background refresh
+    kwargs = mock_thread.call_args[1]
+    kwargs["target"](*kwargs["args"])
+
+    assert mock_token.call_count == 1
+    assert client_headers("my_aud")["Authorization"] == "Bearer DEF"
+    cache.delete(cache_key)
+
+
+def test_header_refresh_single_flight(db, mocker):
+    """
+    Test that a worker waits for the token being fetched by another worker
+    instead of fetching its own
+    """
+    mock_token = mocker.patch("creator.authentication.get_token")
+    cache_key = "ACCESS_TOKEN:my_aud"
+    cache.set("ACCESS_TOKEN_LOCK:my_aud", True)
+
+    def sleep(seconds):
+        # The other worker finishes fetching the token
+        cache.set(cache_key, {"token": "ABC", "expires_at": time.time() + 600})
+
+    mocker.patch("creator.authentication.time.sleep", side_effect=sleep)
+
+    headers = client_headers("my_aud")
+
+    assert headers["Authorization"] == "Bearer ABC"
+    assert mock_token.call_count == 0
+    cache.delete(cache_key)
+    cache.delete("ACCESS_TOKEN_LOCK:my_aud")
+
+
 def test_new_token(db, mocker):
     """
     Test that Auth0 is called for a new token
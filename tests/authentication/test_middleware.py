@@ -6,6 +6,8 @@ from django.core.cache import cache
 from django.core import management
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from creator import middleware as creator_middleware
+from creator.middleware import Auth0KeyCache, auth0_keys
 from creator.studies.factories import StudyFactory
 
 User = get_user_model()
@@ -19,6 +21,16 @@ def auth0_key_mock():
     pass
 
 
+@pytest.fixture(autouse=True)
+def clear_auth0_keys():
+    """
+    Start each test without any keys loaded in the process
+    """
+    auth0_keys.clear()
+    yield
+    auth0_keys.clear()
+
+
 def test_auth0_middleware(db, client, mocker, token):
     """
     Test that auth0 middleware will call auth0 to get a public_key
@@ -156,3 +168,127 @@ def test_test_user(db, settings, mocker, clients):
         "/graphql", data={"query": query}, content_type="application/json"
     )
     assert resp.json()["data"]["myProfile"]["username"] == "testuser"
+
+
+def test_key_cache_by_kid(db, mocker):
+    """
+    Test that keys are parsed once and looked up by their kid
+    """
+    cache.set(settings.CACHE_AUTH0_KEY, None)
+    with open("tests/keys/jwks.json", "rb") as f:
+        jwks = json.load(f)["keys"]
+    kid = jwks[0]["kid"]
+    get_keys = mocker.patch(
+        "creator.middleware.Auth0AuthenticationMiddleware._get_new_keys"
+    )
+    get_keys.return_value = jwks
+    from_jwk = mocker.spy(jwt.algorithms.RSAAlgorithm, "from_jwk")
+
+    keys = Auth0KeyCache()
+    key = keys.get(kid)
+
+    assert key is not None
+    assert keys.get(kid) is key
+    assert keys.get() is key
+    assert get_keys.call_count == 1
+    assert from_jwk.call_count == 1
+
+    # Another process should load the keys from the shared cache
+    assert Auth0KeyCache().get(kid) is not None
+    assert get_keys.call_count == 1
+
+
+def test_key_cache_unknown_kid(db, mocker, settings):
+    """
+    Test that an unknown kid causes the keys to be reloaded, but no more
+    often than the refresh interval
+    """
+    cache.set(settings.CACHE_AUTH0_KEY, None)
+    with open("tests/keys/jwks.json", "rb") as f:
+        jwks = json.load(f)["keys"]
+    get_keys = mocker.patch(
+        "creator.middleware.Auth0AuthenticationMiddleware._get_new_keys"
+    )
+    get_keys.return_value = jwks
+    mock_time = mocker.patch("creator.middleware.time.monotonic")
+    mock_time.return_value = 1000
+    settings.AUTH0_JWKS_REFRESH_INTERVAL = 60
+
+    keys = Auth0KeyCache()
+    assert keys.get(jwks[0]["kid"]) is not None
+    assert get_keys.call_count == 1
+
+    assert keys.get("rotated") is None
+    assert get_keys.call_count == 1
+
+    # Once the interval has passed, Auth0 is asked for the new key
+    mock_time.return_value = 1061
+    rotated = dict(jwks[0], kid="rotated")
+    get_keys.return_value = jwks + [rotated]
+    assert keys.get("rotated") is not None
+    assert get_keys.call_count == 2
+
+
+def test_verified_token_cache(db, client, mocker, token):
+    """
+    Test that a token is only validated the first time it is seen and that
+    the user's last login is not written on every request
+    """
+    cache.set(settings.CACHE_AUTH0_KEY, None)
+    get_keys = mocker.patch(
+        "creator.middleware.Auth0AuthenticationMiddleware._get_new_keys"
+    )
+    with open("tests/keys/jwks.json", "rb") as f:
+        get_keys.return_value = json.load(f)["keys"]
+    decode = mocker.spy(jwt, "decode")
+    last_login = mocker.spy(creator_middleware, "update_last_login")
+
+    token = token(groups=[], roles=["ADMIN"])
+    q = "{ myProfile { username } }"
+    for _ in range(3):
+        resp = client.post(
+            "/graphql",
+            data={"query": q},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        assert resp.json()["data"]["myProfile"]["username"] == "bobby"
+
+    assert decode.call_count == 1
+    # The new user is logged in once, after which the login is recent enough
+    # to not need updating
+    assert last_login.call_count == 1
+    assert User.objects.get().groups.first().name == "Administrators"
+
+
+def test_verified_token_cache_deleted_user(db, client, mocker, token):
+    """
+    Test that a cached token is validated again if its user no longer exists
+    """
+    cache.set(settings.CACHE_AUTH0_KEY, None)
+    get_keys = mocker.patch(
+        "creator.middleware.Auth0AuthenticationMiddleware._get_new_keys"
+    )
+    with open("tests/keys/jwks.json", "rb") as f:
+        get_keys.return_value = json.load(f)["keys"]
+
+    token = token()
+    q = "{ myProfile { username } }"
+    client.post(
+        "/graphql",
+        data={"query": q},
+        content_type="application/json",
+        HTTP_AUTHORIZATION=f"Bearer {token}",
+    )
+    User.objects.all().delete()
+
+    decode = mocker.spy(jwt, "decode")
+    resp = client.post(
+        "/graphql",
+        data={"query": q},
+        content_type="application/json",
+        HTTP_AUTHORIZATION=f"Bearer {token}",
+    )
+
+    assert decode.call_count == 1
+    assert User.objects.count() == 1
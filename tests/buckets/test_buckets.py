@@ -4,7 +4,9 @@ import pytest
 from moto import mock_s3
 from botocore.exceptions import ClientError
 from creator.studies.factories import StudyFactory
+from creator.buckets.models import Bucket
 from creator.buckets.buckets import (
+    BucketSetupError,
     new_bucket,
     get_bucket_name,
     _add_replication,
@@ -261,3 +263,75 @@ def test_new_bucket(db, mocker):
     assert mock_cors.call_count == 1
     assert mock_replication.call_count == 1
     assert mock_inventory.call_count == 1
+
+    bucket = Bucket.objects.get(name=get_bucket_name(study.kf_id))
+    assert bucket.study == study
+    assert {step for step in bucket.setup_steps} == {
+        "create",
+        "policy",
+        "encryption",
+        "tagging",
+        "versioning",
+        "replication",
+        "logging",
+        "cors",
+        "inventory",
+    }
+    assert all(
+        step["state"] == "COMPLETED" for step in bucket.setup_steps.values()
+    )
+
+    # The client is created once and shared by every step
+    clients = {c[0][-1] for c in mock_encryption.call_args_list}
+    clients |= {c[0][-1] for c in mock_cors.call_args_list}
+    assert len(clients) == 1
+
+
+@mock_s3
+def test_new_bucket_retry(db, mocker):
+    """
+    Test that setting up a bucket again only repeats the failed steps
+    """
+    study = StudyFactory()
+    mocker.patch("creator.buckets.buckets._add_encryption")
+    mocker.patch("creator.buckets.buckets._add_tagging")
+    mock_versioning = mocker.patch("creator.buckets.buckets._add_versioning")
+    mock_logging = mocker.patch("creator.buckets.buckets._add_logging")
+    mocker.patch("creator.buckets.buckets._add_cors")
+    mock_replication = mocker.patch("creator.buckets.buckets._add_replication")
+    mocker.patch("creator.buckets.buckets._add_inventory")
+    mock_logging.side_effect = Exception("Log bucket unavailable")
+    mock_versioning.side_effect = Exception("Throttled")
+
+    with pytest.raises(BucketSetupError) as err:
+        new_bucket(study)
+
+    assert "versioning" in str(err.value)
+    assert "logging" in str(err.value)
+    # Replication is not attempted until versioning succeeds
+    assert mock_replication.call_count == 0
+
+    bucket = Bucket.objects.get(name=get_bucket_name(study.kf_id))
+    assert bucket.setup_steps["logging"] == {
+        "state": "FAILED",
+        "error": "Log bucket unavailable",
+    }
+    assert "replication" not in bucket.setup_steps
+
+    mock_logging.side_effect = None
+    mock_versioning.side_effect = None
+    mocks = {
+        name: mocker.patch(f"creator.buckets.buckets._add_{name}")
+        for name in ["policy", "encryption", "tagging", "cors", "inventory"]
+    }
+
+    new_bucket(study)
+
+    assert mock_logging.call_count == 2
+    assert mock_versioning.call_count == 2
+    assert mock_replication.call_count == 1
+    assert all(mock.call_count == 0 for mock in mocks.values())
+    bucket.refresh_from_db()
+    assert all(
+        step["state"] == "COMPLETED" for step in bucket.setup_steps.values()
+    )
@@ -1,6 +1,8 @@
 import boto3
 import pytest
 from moto import mock_s3
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from creator.studies.factories import StudyFactory
 from creator.buckets.models import Bucket
 from creator.buckets.scanner import sync_buckets
@@ -102,3 +104,44 @@ def test_sync_buckets_study_does_not_exist(db):
         Bucket.objects.filter(name="kf-dev-sd-00000000").first().study is None
     )
     assert Bucket.objects.count() == 2
+
+
+@mock_s3
+def test_sync_buckets_restored(db):
+    """
+    Test that a bucket marked deleted is restored when it is seen again
+    """
+    client = boto3.client("s3")
+    client.create_bucket(Bucket="kf-dev-sd-00000000")
+
+    sync_buckets()
+    Bucket.objects.update(deleted=True)
+
+    sync_buckets()
+    assert not Bucket.objects.get(name="kf-dev-sd-00000000").deleted
+
+
+@mock_s3
+def test_sync_buckets_constant_queries(db):
+    """
+    Test that the number of queries does not grow with the number of buckets
+    """
+    client = boto3.client("s3")
+
+    def sync(start, end):
+        for i in range(start, end):
+            client.create_bucket(Bucket=f"kf-dev-sd-{i:08d}")
+            StudyFactory(kf_id=f"SD_{i:08d}", buckets=None)
+        with CaptureQueriesContext(connection) as queries:
+            sync_buckets()
+        return len(queries.captured_queries)
+
+    # Create and link a few buckets, then relink them and add many more
+    few = sync(0, 2)
+    Bucket.objects.update(study=None)
+    many = sync(2, 20)
+
+    assert Bucket.objects.count() == 20
+    assert Bucket.objects.filter(study__isnull=False).count() == 20
+    # Relinking the first buckets takes the one extra update
+    assert many <= few + 1
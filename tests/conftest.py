@@ -38,10 +38,10 @@ def auth0_key_mock():
     Mocks out the response from the /.well-known/jwks.json endpoint on auth0
     """
     middleware = "creator.middleware.Auth0AuthenticationMiddleware"
-    with mock.patch(f"{middleware}._get_new_key") as get_key:
+    with mock.patch(f"{middleware}._get_new_keys") as get_keys:
         with open("tests/keys/jwks.json", "r") as f:
-            get_key.return_value = json.load(f)["keys"][0]
-            yield get_key
+            get_keys.return_value = json.load(f)["keys"]
+            yield get_keys
 
 
 @pytest.fixture(scope="module", autouse=True)
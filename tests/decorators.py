@@ -19,7 +19,8 @@ def test_new_job(db):
     assert JobLog.objects.count() == 1
     assert Job.objects.first().scheduled is False
     assert Job.objects.first().name == "myjob"
-    assert os.path.exists(JobLog.objects.first().log_file.path)
+    chunk = JobLog.objects.first().chunks.get()
+    assert os.path.exists(chunk.log_file.path)
 
 
 def test_related_models_by_pk(db):
@@ -0,0 +1,162 @@
+import pytz
+from datetime import datetime, timedelta
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from creator.events.archive import archive_events, archived_events
+from creator.events.models import Event, EventArchive
+from creator.studies.factories import StudyFactory
+
+ARCHIVED_EVENTS = """
+query ($after: DateTime!, $before: DateTime!, $studyKfId: String) {
+    archivedEvents(
+        createdAfter: $after, createdBefore: $before, studyKfId: $studyKfId
+    ) {
+        uuid
+        createdAt
+        eventType
+        study
+    }
+}
+"""
+
+
+def make_event(study, created_at, event_type="SF_CRE"):
+    return Event.objects.create(
+        organization=study.organization,
+        study=study,
+        event_type=event_type,
+        description=f"{event_type} at {created_at.isoformat()}",
+        created_at=created_at,
+    )
+
+
+def test_archive_events(db):
+    """
+    Test that events before the cutoff are moved into one archive per day
+    """
+    study = StudyFactory()
+    day = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+    old = [
+        make_event(study, day + timedelta(hours=1)),
+        make_event(study, day + timedelta(hours=2)),
+        make_event(study, day + timedelta(days=1, hours=1)),
+    ]
+    recent = make_event(study, timezone.now())
+
+    archives = archive_events(before=day + timedelta(days=2))
+
+    assert len(archives) == 2
+    assert [a.event_count for a in archives] == [2, 1]
+    assert archives[0].start == day
+    assert archives[0].end == day + timedelta(days=1)
+    assert list(Event.objects.all()) == [recent]
+
+    events = list(archives[0].events())
+    assert [e["uuid"] for e in events] == [str(e.uuid) for e in old[:2]]
+    assert events[0]["study_id"] == study.kf_id
+
+
+def test_archive_nothing(db):
+    """
+    Test that no archives are made when there are no old events
+    """
+    study = StudyFactory()
+    make_event(study, timezone.now())
+
+    assert archive_events() == []
+    assert EventArchive.objects.count() == 0
+    assert Event.objects.count() == 1
+
+
+def test_archived_events(db):
+    """
+    Test that archived events may be searched by time and column values
+    """
+    study = StudyFactory()
+    other = StudyFactory()
+    day = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+    make_event(study, day + timedelta(hours=1))
+    make_event(other, day + timedelta(hours=2))
+    make_event(study, day + timedelta(hours=3), event_type="SF_UPD")
+    make_event(study, day + timedelta(days=3))
+    archive_events(before=day + timedelta(days=5))
+
+    events = list(
+        archived_events(
+            day + timedelta(hours=2),
+            day + timedelta(days=1),
+            study_id=study.kf_id,
+        )
+    )
+
+    assert [e["event_type"] for e in events] == ["SF_UPD"]
+
+
+def test_archive_command(db):
+    """
+    Test that the command backfills archives for events past retention
+    """
+    study = StudyFactory()
+    make_event(study, timezone.now() - timedelta(days=40))
+    make_event(study, timezone.now() - timedelta(days=20))
+    make_event(study, timezone.now())
+
+    call_command("archive_events", days=30)
+
+    assert EventArchive.objects.count() == 1
+    assert Event.objects.count() == 2
+
+    call_command("archive_events", before=timezone.now().strftime("%Y-%m-%d"))
+
+    assert EventArchive.objects.count() == 2
+    assert Event.objects.count() == 1
+
+
+def test_query_archived_events(db, clients):
+    """
+    Test that admins may query archived events
+    """
+    client = clients.get("Administrators")
+    study = StudyFactory()
+    day = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+    event = make_event(study, day + timedelta(hours=1))
+    make_event(StudyFactory(), day + timedelta(hours=2))
+    archive_events(before=day + timedelta(days=1))
+
+    variables = {
+        "after": day.isoformat(),
+        "before": (day + timedelta(days=1)).isoformat(),
+        "studyKfId": study.kf_id,
+    }
+    resp = client.post(
+        "/graphql",
+        content_type="application/json",
+        data={"query": ARCHIVED_EVENTS, "variables": variables},
+    )
+
+    events = resp.json()["data"]["archivedEvents"]
+    assert len(events) == 1
+    assert events[0]["uuid"] == str(event.uuid)
+    assert events[0]["study"] == study.kf_id
+
+
+def test_query_archived_events_not_allowed(db, clients):
+    """
+    Test that only admins may query archived events
+    """
+    client = clients.get("Investigators")
+    day = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+
+    variables = {
+        "after": day.isoformat(),
+        "before": (day + timedelta(days=1)).isoformat(),
+    }
+    resp = client.post(
+        "/graphql",
+        content_type="application/json",
+        data={"query": ARCHIVED_EVENTS, "variables": variables},
+    )
+
+    assert resp.json()["errors"][0]["message"] == "Not allowed"
@@ -0,0 +1,137 @@
+import pytz
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from creator.events.models import Event
+from creator.studies.factories import StudyFactory
+
+ALL_EVENTS = """
+query ($first: Int, $after: String, $last: Int, $before: String,
+       $orderBy: String) {
+    allEvents(first: $first, after: $after, last: $last, before: $before,
+              orderBy: $orderBy) {
+        pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+        edges { cursor node { description } }
+    }
+}
+"""
+
+
+def make_events(n=5):
+    study = StudyFactory()
+    start = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+    # Two events share a created_at to test ordering by id
+    return [
+        Event.objects.create(
+            organization=study.organization,
+            study=study,
+            description=str(i),
+            created_at=start + timedelta(minutes=min(i, 3)),
+        )
+        for i in range(n)
+    ]
+
+
+def query(client, **variables):
+    resp = client.post(
+        "/graphql",
+        content_type="application/json",
+        data={"query": ALL_EVENTS, "variables": variables},
+    )
+    assert "errors" not in resp.json(), resp.json()
+    events = resp.json()["data"]["allEvents"]
+    return (
+        [e["node"]["description"] for e in events["edges"]],
+        events["pageInfo"],
+    )
+
+
+def test_keyset_forward(db, clients):
+    """
+    Test that events are paged through in (created_at, id) order
+    """
+    client = clients.get("Administrators")
+    make_events()
+
+    events, page = query(client, first=2)
+    assert events == ["0", "1"]
+    assert page["hasNextPage"]
+
+    events, page = query(client, first=2, after=page["endCursor"])
+    assert events == ["2", "3"]
+    assert page["hasNextPage"]
+    assert page["hasPreviousPage"]
+
+    events, page = query(client, first=2, after=page["endCursor"])
+    assert events == ["4"]
+    assert not page["hasNextPage"]
+
+
+def test_keyset_descending(db, clients):
+    """
+    Test that events may be paged through newest first
+    """
+    client = clients.get("Administrators")
+    make_events()
+
+    events, page = query(client, first=3, orderBy="-created_at")
+    assert events == ["4", "3", "2"]
+
+    events, page = query(
+        client, first=3, after=page["endCursor"], orderBy="-created_at"
+    )
+    assert events == ["1", "0"]
+    assert not page["hasNextPage"]
+
+
+def test_keyset_backward(db, clients):
+    """
+    Test that the last events before a cursor may be requested
+    """
+    client = clients.get("Administrators")
+    make_events()
+
+    events, page = query(client, last=2)
+    assert events == ["3", "4"]
+    assert page["hasPreviousPage"]
+
+    events, page = query(client, last=2, before=page["startCursor"])
+    assert events == ["1", "2"]
+    assert page["hasNextPage"]
+
+
+def test_keyset_no_count(db, clients):
+    """
+    Test that events are not counted unless the total count is requested
+    """
+    client = clients.get("Administrators")
+    make_events()
+
+    resp = client.post(
+        "/graphql",
+        content_type="application/json",
+        data={"query": "{ allEvents(first: 2) { totalCount } }"},
+    )
+    assert resp.json()["data"]["allEvents"]["totalCount"] == 5
+
+    with CaptureQueriesContext(connection) as queries:
+        query(client, first=2)
+
+    assert not any("COUNT(" in q["sql"] for q in queries.captured_queries)
+
+
+def test_keyset_invalid_cursor(db, clients):
+    """
+    Test that a cursor that can't be decoded returns an error
+    """
+    client = clients.get("Administrators")
+
+    resp = client.post(
+        "/graphql",
+        content_type="application/json",
+        data={"query": ALL_EVENTS, "variables": {"after": "YXJyYXk6MQ=="}},
+    )
+
+    assert "Invalid cursor" in resp.json()["errors"][0]["message"]
@@ -1,5 +1,6 @@
 from creator.files.models import File
 from creator.events.models import Event
+from creator.data_reviews.models import DataReview
 from creator.studies.factories import StudyFactory
 from django.contrib.auth import get_user_model
 
@@ -125,3 +126,33 @@ def test_file_deleted_event(db, clients, upload_file):
         Event.objects.filter(event_type="SF_DEL").first().study.kf_id
         == study.kf_id
     )
+
+
+def test_file_in_data_review_deleted_events(db, clients, upload_file):
+    """
+    Test that deleting a file in a data review saves both the deletion and
+    the data review update, even though the update refers to the deleted file
+    """
+    client = clients.get("Administrators")
+    study = StudyFactory()
+    resp = upload_file(study.kf_id, "manifest.txt", client)
+    file_id = resp.json()["data"]["createFile"]["file"]["kfId"]
+    version = File.objects.get(kf_id=file_id).versions.first()
+
+    user = User.objects.filter(groups__name="Administrators").first()
+    data_review = DataReview(creator=user, study=study)
+    data_review.save()
+    data_review.versions.add(version)
+
+    resp = client.post(
+        "/graphql",
+        content_type="application/json",
+        data={"query": DELETE_FILE, "variables": {"kfId": file_id}},
+    )
+
+    assert resp.json()["data"]["deleteFile"]["success"]
+    assert Event.objects.filter(event_type="SF_DEL").count() == 1
+    dr_upd = Event.objects.get(event_type="DR_UPD")
+    assert dr_upd.data_review == data_review
+    assert dr_upd.study == study
+    assert dr_upd.file is None
@@ -0,0 +1,91 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from creator.events.models import Event
+from creator.events.outbox import emit, collect_events
+from creator.data_templates.factories import (
+    DataTemplateFactory,
+    TemplateVersionFactory,
+)
+from creator.organizations.factories import OrganizationFactory
+
+
+def _event_inserts(queries):
+    return [
+        q
+        for q in queries.captured_queries
+        if q["sql"].startswith('INSERT INTO "events_event"')
+    ]
+
+
+def test_emit_without_collection(db):
+    """
+    Test that events emitted outside of a collection are saved immediately
+    """
+    organization = OrganizationFactory()
+
+    event = emit(organization=organization, event_type="OTH")
+
+    assert event.pk is not None
+    assert Event.objects.count() == 1
+
+
+def test_collect_events(db):
+    """
+    Test that collected events are written in one insert when the
+    collection ends
+    """
+    organization = OrganizationFactory()
+
+    with CaptureQueriesContext(connection) as queries:
+        with collect_events():
+            for i in range(3):
+                emit(organization=organization, event_type="OTH")
+            assert Event.objects.count() == 0
+
+    assert Event.objects.count() == 3
+    assert len(_event_inserts(queries)) == 1
+
+
+def test_collect_signal_events(db):
+    """
+    Test that events emitted by signal handlers are collected
+    """
+    with CaptureQueriesContext(connection) as queries:
+        with collect_events():
+            template = DataTemplateFactory()
+            TemplateVersionFactory.create_batch(3, data_template=template)
+
+    assert Event.objects.filter(event_type="DT_CRE").count() == 1
+    assert Event.objects.filter(event_type="TV_CRE").count() == 3
+    assert len(_event_inserts(queries)) == 1
+
+
+def test_nested_collections(db):
+    """
+    Test that a collection inside another is written with the outer one
+    """
+    organization = OrganizationFactory()
+
+    with collect_events():
+        with collect_events():
+            emit(organization=organization, event_type="OTH")
+        assert Event.objects.count() == 0
+
+    assert Event.objects.count() == 1
+
+
+def test_collection_error(db):
+    """
+    Test that events emitted before an error are still written
+    """
+    organization = OrganizationFactory()
+
+    try:
+        with collect_events():
+            emit(organization=organization, event_type="OTH")
+            raise ValueError()
+    except ValueError:
+        pass
+
+    assert Event.objects.count() == 1
@@ -0,0 +1,62 @@
+import pytz
+from datetime import datetime
+
+from creator.events.models import Event, StudyActivity
+from creator.events.outbox import emit, collect_events
+from creator.studies.factories import StudyFactory
+
+
+def test_activity_from_save(db):
+    """
+    Test that saved events are counted in their study's hourly activity
+    """
+    study = StudyFactory()
+    created_at = datetime(2020, 1, 1, 12, 30, tzinfo=pytz.UTC)
+    for _ in range(2):
+        Event(
+            organization=study.organization,
+            study=study,
+            event_type="SF_CRE",
+            created_at=created_at,
+        ).save()
+
+    activity = StudyActivity.objects.get(study=study, event_type="SF_CRE")
+    assert activity.hour == datetime(2020, 1, 1, 12, tzinfo=pytz.UTC)
+    assert activity.count == 2
+
+
+def test_activity_from_outbox(db):
+    """
+    Test that events written by the outbox are counted
+    """
+    study = StudyFactory()
+    StudyActivity.objects.all().delete()
+    created_at = datetime(2020, 1, 1, 12, 30, tzinfo=pytz.UTC)
+
+    with collect_events():
+        for event_type in ["SF_CRE", "SF_CRE", "SF_DEL"]:
+            emit(
+                organization=study.organization,
+                study=study,
+                event_type=event_type,
+                created_at=created_at,
+            )
+
+    counts = dict(
+        StudyActivity.objects.filter(study=study).values_list(
+            "event_type", "count"
+        )
+    )
+    assert counts == {"SF_CRE": 2, "SF_DEL": 1}
+
+
+def test_no_study(db):
+    """
+    Test that events without a study are not counted
+    """
+    study = StudyFactory()
+    StudyActivity.objects.all().delete()
+
+    Event(organization=study.organization, event_type="OTH").save()
+
+    assert StudyActivity.objects.count() == 0
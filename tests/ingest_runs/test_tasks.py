@@ -1,4 +1,5 @@
 import pytest
+import pandas
 from creator.files.models import File, FileType
 from creator.ingest_runs.models import IngestRun
 from creator.ingest_runs.tasks import (
@@ -169,8 +170,17 @@ def test_ingest_genomic_workflow_output_manifests(
         "creator.ingest_runs.tasks.ingest_run.GenomicDataLoader.ingest_gwo"
     )
     mock_extract = mocker.patch(
-        "creator.ingest_runs.tasks.ingest_run.extract_data",
-        return_value=[{"Test": "Test"}],
+        "creator.ingest_runs.tasks.ingest_run.extract_dataframe",
+        return_value=pandas.DataFrame(
+            [
+                {
+                    "KF Biospecimen ID": "BS_00000000",
+                    "Data Type": "Aligned Reads",
+                    "Filepath": "s3://bucket/file.cram",
+                    "Source Read": "s3://bucket/file.bam",
+                }
+            ]
+        ),
     )
     for _ in range(2):
         prep_file(authed=True)
@@ -179,6 +189,12 @@ def test_ingest_genomic_workflow_output_manifests(
     ir = setup_ingest_run(file_versions, user)
     ingest_genomic_workflow_output_manifests(ir)
     mock_ingest.assert_called_once()
+    assert mock_extract.call_count == 2
+
+    # Manifests are concatenated into one frame with categorical data types
+    manifest_df = mock_ingest.call_args[0][0]
+    assert manifest_df.shape[0] == 2
+    assert manifest_df["Data Type"].dtype.name == "category"
 
 
 def setup_ingest_run(file_versions, user):
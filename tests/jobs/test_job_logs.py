@@ -0,0 +1,216 @@
+import logging
+import pytest
+from django.core.files.base import ContentFile
+from graphql_relay import to_global_id
+
+from creator.decorators import task
+from creator.jobs.logs import LogShipper
+from creator.jobs.models import Job, JobLog
+from creator.releases.models import Release
+from creator.releases.factories import ReleaseFactory
+
+
+@pytest.fixture
+def job_log(db):
+    job = Job(name="myjob")
+    job.save()
+    log = JobLog(job=job)
+    log.save()
+    return log
+
+
+def test_append(job_log):
+    """
+    Test that appending to a log writes new chunks in order without touching
+    the existing ones
+    """
+    first = job_log.append("first\n")
+    second = job_log.append("second\n")
+
+    assert first.index == 0
+    assert second.index == 1
+    assert job_log.chunks.count() == 2
+    assert first.log_file.name != second.log_file.name
+    with first.log_file.open() as f:
+        assert f.read() == b"first\n"
+
+
+def test_stream(job_log):
+    """
+    Test that a log is streamed with any legacy log file first, followed by
+    its chunks in order
+    """
+    job_log.log_file.save("legacy.log", ContentFile("legacy\n"))
+    job_log.append("first\n")
+    job_log.append("second\n")
+
+    content = b"".join(job_log.stream())
+
+    assert content == b"legacy\nfirst\nsecond\n"
+
+
+def test_task_appends_chunks(db):
+    """
+    Test that each invocation of a task related to the same object writes its
+    own chunks to the object's log
+    """
+
+    @task("myjob", related_models={Release: "release"})
+    def my_job(release):
+        pass
+
+    release = ReleaseFactory()
+
+    my_job(release=release)
+    my_job(release=release)
+
+    release.refresh_from_db()
+    assert JobLog.objects.count() == 1
+    lines = release.job_log.read_lines()[0]
+    assert len([line for line in lines if "goodbye" in line]) == 2
+    assert any("Re-attaching to Job Log" in line for line in lines)
+
+
+def test_download_log(db, clients, job_log):
+    """
+    Test that logs are downloaded as the concatenation of their chunks
+    """
+    client = clients.get("Administrators")
+    job_log.append("first\n")
+    job_log.append("second\n")
+
+    resp = client.get(f"/logs/{job_log.pk}")
+
+    assert resp.status_code == 200
+    assert b"".join(resp.streaming_content) == b"first\nsecond\n"
+    assert "myjob.log" in resp["Content-Disposition"]
+
+
+def test_read_lines(job_log):
+    """
+    Test that lines are read following an offset and only chunks containing
+    new lines are opened
+    """
+    job_log.log_file.save("legacy.log", ContentFile("legacy\n"))
+    job_log.append("first\nsecond\n")
+    job_log.append("third\n")
+
+    lines, offset = job_log.read_lines()
+    assert lines == ["legacy", "first", "second", "third"]
+    assert offset == 4
+
+    lines, offset = job_log.read_lines(after=2)
+    assert lines == ["second", "third"]
+    assert offset == 4
+
+    job_log.append("fourth\n")
+    lines, offset = job_log.read_lines(after=offset)
+    assert lines == ["fourth"]
+    assert offset == 5
+
+
+def test_read_lines_other_line_breaks(job_log):
+    """
+    Test that offsets stay aligned when output contains line breaks other
+    than a newline or does not end with one
+    """
+    first = job_log.append("progress 50%\rprogress 100%\n")
+    second = job_log.append("no newline")
+    job_log.append("last\n")
+
+    assert first.line_count == 2
+    assert second.line_count == 1
+
+    lines, offset = job_log.read_lines()
+    assert lines == ["progress 50%", "progress 100%", "no newline", "last"]
+    assert offset == 4
+
+    lines, offset = job_log.read_lines(after=3)
+    assert lines == ["last"]
+    assert offset == 4
+
+
+def test_shipper_ships_by_size(job_log):
+    """
+    Test that buffered output is shipped once it grows past the size limit
+    """
+    logger = logging.getLogger("creator.test_shipper")
+    shipper = LogShipper(job_logs=[job_log], max_bytes=20, interval=3600)
+    logger.addHandler(shipper)
+    try:
+        logger.error("short")
+        assert job_log.chunks.count() == 0
+        logger.error("a much longer message")
+        assert job_log.chunks.count() == 1
+
+        logger.error("remaining")
+        shipper.flush()
+    finally:
+        logger.removeHandler(shipper)
+
+    assert job_log.read_lines()[0] == [
+        "short",
+        "a much longer message",
+        "remaining",
+    ]
+
+
+def test_shipper_ships_by_interval(job_log, mocker):
+    """
+    Test that buffered output is shipped once the interval has passed
+    """
+    mock_time = mocker.patch("creator.jobs.logs.time.monotonic")
+    mock_time.return_value = 0
+    logger = logging.getLogger("creator.test_shipper")
+    shipper = LogShipper(job_logs=[job_log], max_bytes=1024, interval=10)
+    logger.addHandler(shipper)
+    try:
+        logger.error("first")
+        assert job_log.chunks.count() == 0
+        mock_time.return_value = 11
+        logger.error("second")
+        assert job_log.chunks.count() == 1
+    finally:
+        logger.removeHandler(shipper)
+
+
+def test_task_ships_while_running(db, settings):
+    """
+    Test that a task's output is available from its log before it completes
+    """
+    settings.LOG_SHIP_BYTES = 1
+    seen = []
+
+    @task("myjob", related_models={Release: "release"})
+    def my_job(release):
+        release = Release.objects.get(pk=release)
+        seen.extend(release.job_log.read_lines()[0])
+
+    release = ReleaseFactory()
+    my_job(release=release.pk)
+
+    assert any("Study Creator API Worker" in line for line in seen)
+
+
+def test_log_lines_query(db, clients, job_log):
+    """
+    Test that new lines of a log may be followed through the api
+    """
+    client = clients.get("Administrators")
+    job_log.append("first\nsecond\n")
+
+    query = """
+    query ($id: ID!, $after: Int) {
+        jobLog(id: $id) { logLines(after: $after) { lines offset } }
+    }
+    """
+    node_id = to_global_id("JobLogNode", job_log.pk)
+    resp = client.post(
+        "/graphql",
+        data={"query": query, "variables": {"id": node_id, "after": 1}},
+        content_type="application/json",
+    )
+
+    assert resp.status_code == 200
+    log_lines = resp.json()["data"]["jobLog"]["logLines"]
+    assert log_lines == {"lines": ["second"], "offset": 2}
@@ -0,0 +1,134 @@
+import pytz
+import logging
+from datetime import datetime, timedelta
+
+from creator.decorators import task
+from creator.jobs.models import Job, JobLog, JobRun
+from creator.studies.factories import StudyFactory
+
+
+def test_task_records_run(db, mocker):
+    """
+    Test that each invocation of a task records its execution metrics
+    """
+    rq_job = mocker.patch("creator.decorators.get_current_job")
+    rq_job.return_value.enqueued_at = datetime.utcnow() - timedelta(
+        seconds=30
+    )
+
+    @task("myjob")
+    def my_job():
+        StudyFactory.create_batch(2)
+
+    my_job()
+
+    run = JobRun.objects.get()
+    assert run.job_id == "myjob"
+    assert run.failed is False
+    assert run.duration >= 0
+    assert run.queue_wait >= 30
+    assert run.query_count >= 2
+    assert run.peak_rss > 0
+
+
+def test_task_query_count_excludes_logs(db, settings):
+    """
+    Test that queries made to ship log output while the task runs are not
+    counted as the task's own
+    """
+    settings.LOG_SHIP_BYTES = 1
+
+    @task("myjob")
+    def my_job():
+        for i in range(5):
+            logging.getLogger("creator.test").info(f"line {i}")
+
+    my_job()
+
+    run = JobRun.objects.get()
+    assert run.query_count == 0
+    assert JobLog.objects.get().chunks.count() > 5
+
+
+def test_task_records_failed_run(db):
+    """
+    Test that failed runs are recorded without a queue wait outside a worker
+    """
+
+    @task("myjob")
+    def my_job():
+        raise ValueError("boom")
+
+    try:
+        my_job()
+    except ValueError:
+        pass
+
+    run = JobRun.objects.get()
+    assert run.failed is True
+    assert run.queue_wait is None
+
+
+def test_prune(db, settings):
+    """
+    Test that only the most recent runs of a job are kept
+    """
+    settings.JOB_RUN_RETENTION = 3
+    job = Job(name="myjob")
+    job.save()
+    start = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+    for i in range(5):
+        JobRun(
+            job=job, started_at=start + timedelta(minutes=i), duration=1
+        ).save()
+
+    JobRun.prune(job)
+
+    assert JobRun.objects.count() == 3
+    assert JobRun.objects.order_by("started_at").first().started_at == (
+        start + timedelta(minutes=2)
+    )
+
+
+def test_metrics_query(db, clients):
+    """
+    Test that percentiles of the most recent runs are returned for a job
+    """
+    client = clients.get("Administrators")
+    job = Job(name="myjob")
+    job.save()
+    start = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+    for i in range(1, 21):
+        JobRun(
+            job=job,
+            started_at=start + timedelta(minutes=i),
+            duration=i,
+            query_count=i,
+            failed=i == 20,
+        ).save()
+
+    query = """
+    {
+        allJobs {
+            edges { node { name metrics {
+                runs failures durationP50 durationP95 queryCountP95
+                queueWaitP50 peakRssP50
+            } } }
+        }
+    }
+    """
+    resp = client.post(
+        "/graphql", data={"query": query}, content_type="application/json"
+    )
+
+    assert resp.status_code == 200
+    metrics = resp.json()["data"]["allJobs"]["edges"][0]["node"]["metrics"]
+    assert metrics == {
+        "runs": 20,
+        "failures": 1,
+        "durationP50": 10.0,
+        "durationP95": 19.0,
+        "queryCountP95": 19,
+        "queueWaitP50": None,
+        "peakRssP50": None,
+    }
@@ -0,0 +1,103 @@
+import logging
+import pytest
+from creator.decorators import task
+from creator.utils import ContextThreadPoolExecutor
+from creator.jobs.models import Job, JobLog
+from creator.releases.models import Release
+from creator.releases.factories import ReleaseFactory
+
+
+def test_log_handlers_per_invocation(db):
+    """
+    Test that tasks only capture logs while they are running and that output
+    from one invocation does not end up in the log of the next
+    """
+    creator_logger = logging.getLogger("creator")
+    handlers = list(creator_logger.handlers)
+
+    @task("myjob", related_models={Release: "release"})
+    def my_job(release):
+        logging.getLogger("creator.test").info(f"running {release.pk}")
+
+    assert creator_logger.handlers == handlers
+
+    first = ReleaseFactory()
+    second = ReleaseFactory()
+    my_job(release=first)
+    my_job(release=second)
+
+    assert creator_logger.handlers == handlers
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.job_log != second.job_log
+    second_lines = "\n".join(second.job_log.read_lines()[0])
+    assert f"running {second.pk}" in second_lines
+    assert f"running {first.pk}" not in second_lines
+
+
+def test_log_handlers_removed_on_error(db):
+    """
+    Test that a task's log handler is removed even if the task fails
+    """
+    creator_logger = logging.getLogger("creator")
+    handlers = list(creator_logger.handlers)
+
+    @task("myjob")
+    def my_job():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        my_job()
+
+    assert creator_logger.handlers == handlers
+    assert JobLog.objects.get().error is True
+
+
+def test_nested_invocations(db):
+    """
+    Test that a task called from within itself keeps its own state and logs
+    """
+
+    @task("myjob", related_models={Release: "release"})
+    def my_job(release, inner=None):
+        log = logging.getLogger("creator.test")
+        log.info(f"starting {release.pk}")
+        if inner is not None:
+            my_job(release=inner)
+        log.info(f"finishing {release.pk}")
+
+    outer = ReleaseFactory()
+    inner = ReleaseFactory()
+    my_job(release=outer, inner=inner)
+
+    outer.refresh_from_db()
+    inner.refresh_from_db()
+    assert outer.job_log != inner.job_log
+    outer_lines = "\n".join(outer.job_log.read_lines()[0])
+    inner_lines = "\n".join(inner.job_log.read_lines()[0])
+    assert f"starting {outer.pk}" in outer_lines
+    assert f"finishing {outer.pk}" in outer_lines
+    assert f"starting {inner.pk}" not in outer_lines
+    assert f"starting {inner.pk}" in inner_lines
+    assert f"finishing {outer.pk}" not in inner_lines
+    assert Job.objects.get(name="myjob").runs.count() == 2
+
+
+def test_log_from_pool_threads(db):
+    """
+    Test that output logged by a task's worker threads reaches its log
+    """
+
+    @task("myjob", related_models={Release: "release"})
+    def my_job(release):
+        log = logging.getLogger("creator.test")
+        with ContextThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(lambda i: log.info(f"worker {i}"), range(2)))
+
+    release = ReleaseFactory()
+    my_job(release=release)
+
+    release.refresh_from_db()
+    lines = "\n".join(release.job_log.read_lines()[0])
+    assert "worker 0" in lines
+    assert "worker 1" in lines
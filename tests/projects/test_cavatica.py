@@ -6,6 +6,7 @@ from unittest.mock import MagicMock
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Callable
+from django.core.cache import cache
 from creator.projects.cavatica import (
     setup_cavatica,
     create_project,
@@ -20,6 +21,11 @@ from creator.projects.models import Project
 from creator.projects.factories import ProjectFactory
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 @pytest.fixture
 def mock_create_project(mocker):
     """ Mocks out create project functions """
@@ -200,6 +206,7 @@ def test_import_volume_files_folder_exists(db, settings, mock_cavatica_api):
     class Folder:
         def __init__(self, name):
             self.name = name
+            self.id = f"folder-{name}"
 
     mock_cavatica_api.Api().files.create_folder.side_effect = (
         sbg.errors.Conflict()
@@ -210,6 +217,10 @@ def test_import_volume_files_folder_exists(db, settings, mock_cavatica_api):
         Folder("123"),
         Folder(folder_name),
     ]
+    listing = mock_cavatica_api.Api().volumes.get().list.return_value
+    listing.prefixes = []
+    listing.__iter__.return_value = [MagicMock(location="source/a.txt")]
+    listing.next_page.side_effect = sbg.errors.PaginationError()
 
     study = StudyFactory()
     project = ProjectFactory(study=study)
@@ -218,9 +229,16 @@ def test_import_volume_files_folder_exists(db, settings, mock_cavatica_api):
 
     assert mock_cavatica_api.Api().files.query.call_count == 1
     mock_cavatica_api.Api().files.query.assert_called_with(
-        project=project.project_id
+        project=project.project_id, names=[folder_name]
     )
 
+    # The folder is remembered for the next import to the project
+    import_volume_files(project)
+
+    assert mock_cavatica_api.Api().files.query.call_count == 1
+    submitted = mock_cavatica_api.Api().imports.bulk_submit.call_args[0][0]
+    assert all(imp["parent"] == f"folder-{folder_name}" for imp in submitted)
+
 
 def test_import_volume_files(db, settings, mock_cavatica_api):
     settings.CAVATICA_DELIVERY_ACCOUNT = "test-acct"
@@ -249,11 +267,14 @@ def test_import_volume_files(db, settings, mock_cavatica_api):
         def __iter__(self):
             return iter([VolumeObject("123"), VolumeObject("abc")])
 
+        def next_page(self):
+            raise sbg.errors.PaginationError()
+
     class Volume:
         def __init__(self):
             self.id = f"test-acct/{study.kf_id}"
 
-        def list(self, prefix):
+        def list(self, prefix, limit):
             return PrefixList()
 
     mock_cavatica_api.Api().volumes.get.return_value = Volume()
@@ -266,6 +287,10 @@ def test_import_volume_files(db, settings, mock_cavatica_api):
 
     # two valid subdirectories and two objects in the source directory = 4
     assert mock_cavatica_api.Api().imports.bulk_submit.call_count == 1
-    assert (
-        len(mock_cavatica_api.Api().imports.bulk_submit.call_args_list[0]) == 2
-    )
+    submitted = mock_cavatica_api.Api().imports.bulk_submit.call_args[0][0]
+    assert [imp["location"] for imp in submitted] == [
+        "source/bams/",
+        "source/test/",
+        "123",
+        "abc",
+    ]
@@ -2,6 +2,9 @@ import pytest
 import pytz
 from unittest.mock import MagicMock
 from datetime import datetime
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from creator.projects.cavatica import (
     sync_cavatica_projects,
     sync_cavatica_account,
@@ -44,14 +47,17 @@ def mock_sync_cavatica_account(mocker):
     return sync_cavatica_account
 
 
-def test_correct_sync(db, mock_sync_cavatica_account):
+def test_correct_sync(db, mocker, mock_sync_cavatica_account):
+    fetch = mocker.patch("creator.projects.cavatica.fetch_cavatica_projects")
+    fetch.side_effect = lambda project_type: [project_type]
 
     sync_cavatica_projects()
 
+    assert fetch.call_count == 2
     assert mock_sync_cavatica_account.call_count == 2
 
-    mock_sync_cavatica_account.assert_any_call("HAR")
-    mock_sync_cavatica_account.assert_any_call("DEL")
+    mock_sync_cavatica_account.assert_any_call("HAR", ["HAR"], full=True)
+    mock_sync_cavatica_account.assert_any_call("DEL", ["DEL"], full=True)
 
 
 def test_sync_projects(db, mock_cavatica_api):
@@ -155,3 +161,87 @@ def test_sync_mutation(db, mocker, clients, user_group, allowed):
 
     assert len(resp.json()["data"]["syncProjects"]["created"]["edges"]) == 1
     assert len(resp.json()["data"]["syncProjects"]["updated"]["edges"]) == 1
+
+
+def test_sync_deleted_projects(db, mock_cavatica_api):
+    """
+    Test that projects no longer in Cavatica are marked as deleted
+    """
+    sync_cavatica_account("HAR")
+
+    mock_cavatica_api.Api().projects.query().all.return_value = [
+        CavaticaProject(id="test_id_01_harmonization"),
+    ]
+    created, updated, deleted = sync_cavatica_account("HAR")
+
+    assert created == []
+    assert updated == []
+    assert [p.project_id for p in deleted] == ["test_id_02_harmonization"]
+    assert Project.objects.get(project_id="test_id_02_harmonization").deleted
+    assert Event.objects.filter(event_type="PR_DEL").count() == 1
+
+
+def test_sync_constant_queries(db, mock_cavatica_api):
+    """
+    Test that the number of queries does not grow with the number of projects
+    """
+
+    def sync(n):
+        mock_cavatica_api.Api().projects.query().all.return_value = [
+            CavaticaProject(
+                id=f"test_id_{i:02d}_harmonization",
+                modified_on=datetime(2019, 1, n, tzinfo=pytz.utc),
+            )
+            for i in range(n)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            sync_cavatica_account("HAR")
+        return len(queries.captured_queries)
+
+    # Create a few projects, then update them and create many more
+    few = sync(2)
+    many = sync(20)
+
+    assert Project.objects.count() == 20
+    assert Event.objects.filter(event_type="PR_CRE").count() == 20
+    assert Event.objects.filter(event_type="PR_UPD").count() == 2
+    assert many <= few + 2
+
+
+def test_sync_incremental(db, mock_cavatica_api):
+    """
+    Test that an incremental sync only compares projects that were modified
+    since the last sync or have not been seen before
+    """
+    cache.clear()
+    sync_cavatica_account("HAR", full=False)
+
+    # Changed without being modified, so should be skipped
+    Project.objects.filter(project_id="test_id_02_harmonization").update(
+        name="Old name"
+    )
+    mock_cavatica_api.Api().projects.query().all.return_value = [
+        CavaticaProject(
+            id="test_id_01_harmonization",
+            description="New description",
+            modified_on=datetime(2019, 1, 1, tzinfo=pytz.utc),
+        ),
+        CavaticaProject(id="test_id_02_harmonization"),
+        CavaticaProject(id="test_id_03_harmonization"),
+    ]
+
+    created, updated, deleted = sync_cavatica_account("HAR", full=False)
+
+    assert [p.project_id for p in created] == ["test_id_03_harmonization"]
+    assert [p.project_id for p in updated] == ["test_id_01_harmonization"]
+    assert deleted == []
+    project = Project.objects.get(project_id="test_id_01_harmonization")
+    assert project.description == "New description"
+    project = Project.objects.get(project_id="test_id_02_harmonization")
+    assert project.name == "Old name"
+
+    # A full sync compares every project
+    sync_cavatica_account("HAR", full=True)
+
+    project = Project.objects.get(project_id="test_id_02_harmonization")
+    assert project.name == "Test name-bwa-mem"
@@ -0,0 +1,206 @@
+import pytest
+import sevenbridges as sbg
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from django.core.cache import cache
+
+from creator.projects.delivery import (
+    ImportsRejected,
+    get_delivery_folder,
+    poll_imports,
+    submit_imports,
+    volume_locations,
+)
+from creator.projects.factories import ProjectFactory
+from creator.projects.models import DeliveryImport
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def accepted(import_id, state="PENDING"):
+    return SimpleNamespace(
+        valid=True,
+        error=None,
+        resource=SimpleNamespace(id=import_id, state=state, error=None),
+    )
+
+
+def rejected(message):
+    return SimpleNamespace(
+        valid=False, error=SimpleNamespace(message=message), resource=None
+    )
+
+
+class Page:
+    def __init__(self, prefixes, locations, next=None):
+        self.prefixes = [SimpleNamespace(prefix=p) for p in prefixes]
+        self.locations = locations
+        self.next = next
+
+    def __iter__(self):
+        return iter(SimpleNamespace(location=l) for l in self.locations)
+
+    def next_page(self):
+        if self.next is None:
+            raise sbg.errors.PaginationError()
+        return self.next
+
+
+def test_volume_locations_pages(settings):
+    """
+    Test that every page of the volume listing is imported
+    """
+    settings.CAVATICA_VOLUME_PAGE_SIZE = 2
+    volume = MagicMock()
+    volume.list.return_value = Page(
+        ["source/uploads", "source/bams"],
+        ["source/a.txt"],
+        next=Page(["source/crams"], ["source/b.txt"]),
+    )
+
+    locations = list(volume_locations(volume))
+
+    assert locations == [
+        "source/bams/",
+        "source/a.txt",
+        "source/crams/",
+        "source/b.txt",
+    ]
+    volume.list.assert_called_once_with(prefix="source", limit=2)
+
+
+def test_get_delivery_folder_cached():
+    api = MagicMock()
+    api.files.create_folder.return_value = SimpleNamespace(id="folder")
+
+    assert get_delivery_folder(api, "test/project", "delivery") == "folder"
+    assert get_delivery_folder(api, "test/project", "delivery") == "folder"
+    assert api.files.create_folder.call_count == 1
+
+    get_delivery_folder(api, "test/other", "delivery")
+    assert api.files.create_folder.call_count == 2
+
+
+def test_submit_imports_in_chunks(db, settings):
+    """
+    Test that imports are submitted in chunks and each is recorded
+    """
+    settings.CAVATICA_IMPORT_CHUNK_SIZE = 2
+    project = ProjectFactory()
+    api = MagicMock()
+    api.imports.bulk_submit.side_effect = lambda batch: [
+        accepted(f"import-{imp['location']}") for imp in batch
+    ]
+    locations = [f"source/{i}.txt" for i in range(5)]
+
+    accepted = submit_imports(
+        api, project, "vol", "folder", "delivery", iter(locations)
+    )
+
+    assert api.imports.bulk_submit.call_count == 3
+    batches = [c[0][0] for c in api.imports.bulk_submit.call_args_list]
+    assert sorted(len(batch) for batch in batches) == [1, 2, 2]
+    assert all(imp["parent"] == "folder" for b in batches for imp in b)
+
+    assert accepted == 5
+    assert DeliveryImport.objects.filter(project=project).count() == 5
+    imp = DeliveryImport.objects.get(import_id="import-source/0.txt")
+    assert imp.location == "source/0.txt"
+    assert imp.folder == "delivery"
+    assert imp.state == "PENDING"
+
+
+def test_submit_imports_rejected(db):
+    """
+    Test that accepted imports are recorded when others are rejected
+    """
+    project = ProjectFactory()
+    api = MagicMock()
+    api.imports.bulk_submit.return_value = [
+        accepted("import-1"),
+        rejected("Location does not exist"),
+    ]
+
+    with pytest.raises(ImportsRejected) as err:
+        submit_imports(
+            api, project, "vol", "folder", "delivery", ["a.txt", "b.txt"]
+        )
+
+    assert "1 of 2 imports" in str(err.value)
+    recorded = DeliveryImport.objects.values_list("import_id", flat=True)
+    assert list(recorded) == ["import-1"]
+
+
+def test_poll_imports(db):
+    """
+    Test that unfinished imports are retrieved in bulk and updated
+    """
+    project = ProjectFactory()
+    for i, state in enumerate(["PENDING", "RUNNING", "PENDING", "COMPLETED"]):
+        DeliveryImport(
+            import_id=f"import-{i}",
+            project=project,
+            folder="delivery",
+            location=f"source/{i}.txt",
+            state=state,
+        ).save()
+
+    states = {
+        "import-0": accepted("import-0", "COMPLETED"),
+        "import-1": accepted("import-1", "RUNNING"),
+        "import-2": rejected("Not found"),
+    }
+    api = MagicMock()
+    api.imports.bulk_get.side_effect = lambda ids: [states[i] for i in ids]
+
+    updated = poll_imports(api)
+
+    assert api.imports.bulk_get.call_count == 1
+    assert sorted(api.imports.bulk_get.call_args[0][0]) == [
+        "import-0",
+        "import-1",
+        "import-2",
+    ]
+    assert sorted(imp.import_id for imp in updated) == ["import-0", "import-2"]
+    assert DeliveryImport.objects.get(import_id="import-0").state == (
+        "COMPLETED"
+    )
+    failed = DeliveryImport.objects.get(import_id="import-2")
+    assert failed.state == "FAILED"
+    assert failed.error == "Not found"
+
+    # Nothing is requested when all imports have finished
+    api.reset_mock()
+    DeliveryImport.objects.update(state="COMPLETED")
+    assert poll_imports(api) == []
+    assert api.imports.bulk_get.call_count == 0
+
+
+def test_submit_imports_reads_lazily(db, settings):
+    """
+    Test that chunks are submitted while the listing is still being read
+    """
+    settings.CAVATICA_IMPORT_CHUNK_SIZE = 2
+    settings.CAVATICA_IMPORT_WORKERS = 1
+    project = ProjectFactory()
+    api = MagicMock()
+    api.imports.bulk_submit.side_effect = lambda batch: [
+        accepted(f"import-{imp['location']}") for imp in batch
+    ]
+    read = []
+
+    def locations():
+        for i in range(6):
+            # No more than the chunk being read and the one being submitted
+            # are read ahead of the submissions
+            assert len(read) - 2 * api.imports.bulk_submit.call_count <= 2
+            read.append(i)
+            yield f"source/{i}.txt"
+
+    assert submit_imports(
+        api, project, "vol", "folder", "delivery", locations()
+    ) == 6
+    assert api.imports.bulk_submit.call_count == 3
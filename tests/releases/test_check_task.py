@@ -1,7 +1,15 @@
 import pytest
 
-from creator.releases.tasks import scan_tasks, check_task
-from creator.releases.factories import ReleaseFactory, ReleaseTaskFactory
+from creator.releases.tasks import (
+    scan_tasks,
+    check_task,
+    check_service_tasks,
+)
+from creator.releases.factories import (
+    ReleaseFactory,
+    ReleaseTaskFactory,
+    ReleaseServiceFactory,
+)
 
 
 def test_scan_tasks(db, mocker):
@@ -115,3 +123,100 @@ def test_check_task_failed(db, mocker):
     task.refresh_from_db()
 
     assert task.state == "failed"
+
+
+def test_scan_tasks_batched(db, mocker):
+    """
+    Check that tasks of services that support batched status requests are
+    checked with one job per service
+    """
+    mock_rq = mocker.patch("rq.Queue.enqueue")
+
+    release = ReleaseFactory()
+    batched = ReleaseServiceFactory(batch_status=True)
+    single = ReleaseServiceFactory(batch_status=False)
+    batched_tasks = ReleaseTaskFactory.create_batch(
+        3, state="running", release=release, release_service=batched
+    )
+    ReleaseTaskFactory(
+        state="staged", release=release, release_service=batched
+    )
+    single_task = ReleaseTaskFactory(
+        state="running", release=release, release_service=single
+    )
+
+    scan_tasks()
+
+    assert mock_rq.call_count == 2
+    mock_rq.assert_any_call(check_task, task_id=single_task.pk, ttl=60)
+    call = [
+        c for c in mock_rq.call_args_list if c[0][0] == check_service_tasks
+    ][0]
+    assert call[1]["service_id"] == batched.pk
+    assert set(call[1]["task_ids"]) == {t.pk for t in batched_tasks}
+
+
+def test_check_service_tasks(db, mocker):
+    """
+    Check that states reported in one request are applied to each task and
+    that tasks missing from the response are checked individually
+    """
+    release = ReleaseFactory()
+    service = ReleaseServiceFactory(batch_status=True)
+    staged, failed, missing = ReleaseTaskFactory.create_batch(
+        3, state="running", release=release, release_service=service
+    )
+
+    mock_statuses = mocker.patch("creator.releases.tasks.request_statuses")
+    mock_statuses.return_value = {
+        staged.pk: {"task_id": staged.pk, "state": "staged"},
+        failed.pk: {"task_id": failed.pk, "state": "failed"},
+    }
+    mock_state = mocker.patch(
+        "creator.releases.models.ReleaseTask._send_action"
+    )
+    mock_state.return_value = {
+        "task_id": missing.pk,
+        "release_id": release.pk,
+        "state": "staged",
+    }
+
+    check_service_tasks(
+        service_id=service.pk, task_ids=[staged.pk, failed.pk, missing.pk]
+    )
+
+    for task in [staged, failed, missing]:
+        task.refresh_from_db()
+    assert staged.state == "staged"
+    assert failed.state == "failed"
+    assert missing.state == "staged"
+    assert mock_statuses.call_count == 1
+    mock_state.assert_called_once_with("get_status")
+
+
+def test_check_service_tasks_fallback(db, mocker):
+    """
+    Check that each task is checked individually if the batched request
+    fails and that tasks that can't be checked are failed
+    """
+    release = ReleaseFactory()
+    service = ReleaseServiceFactory(batch_status=True)
+    tasks = ReleaseTaskFactory.create_batch(
+        2, state="running", release=release, release_service=service
+    )
+
+    mock_statuses = mocker.patch("creator.releases.tasks.request_statuses")
+    mock_statuses.side_effect = ValueError("Unknown action")
+    mock_state = mocker.patch(
+        "creator.releases.models.ReleaseTask._send_action"
+    )
+    mock_state.side_effect = Exception("Problem sending action")
+
+    check_service_tasks(
+        service_id=service.pk, task_ids=[t.pk for t in tasks]
+    )
+
+    assert mock_state.call_count == 2
+    for task in tasks:
+        task.refresh_from_db()
+        assert task.state == "failed"
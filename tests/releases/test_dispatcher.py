@@ -0,0 +1,163 @@
+import pytest
+import requests
+
+from creator.studies.factories import StudyFactory
+from creator.releases.dispatcher import dispatch_action, request_statuses
+from creator.releases.factories import (
+    ReleaseFactory,
+    ReleaseTaskFactory,
+    ReleaseServiceFactory,
+)
+
+
+class Resp:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+
+def test_dispatch_action(db, mocker):
+    """
+    Test that an action is sent to every task's service with the release's
+    studies and the service's timeout
+    """
+    mocker.patch(
+        "creator.releases.dispatcher.client_headers", return_value={}
+    )
+    studies = StudyFactory.create_batch(2)
+    release = ReleaseFactory(state="initializing", studies=studies)
+    fast = ReleaseServiceFactory(url="http://fast", timeout=5)
+    slow = ReleaseServiceFactory(url="http://slow", timeout=None)
+    fast_task = ReleaseTaskFactory(release=release, release_service=fast)
+    slow_task = ReleaseTaskFactory(release=release, release_service=slow)
+
+    def post(url, headers, json, timeout):
+        return Resp(
+            {
+                "state": "pending",
+                "task_id": json["task_id"],
+                "release_id": json["release_id"],
+            }
+        )
+
+    mock_session = mocker.patch("creator.releases.dispatcher.get_session")
+    mock_session.return_value.post.side_effect = post
+
+    tasks = release.tasks.select_related("release_service").all()
+    results = dispatch_action(release, "initialize", tasks)
+
+    assert results[fast_task.pk]["state"] == "pending"
+    assert results[slow_task.pk]["state"] == "pending"
+
+    calls = {
+        c[0][0]: c[1] for c in mock_session.return_value.post.call_args_list
+    }
+    assert calls["http://fast/tasks"]["timeout"] == 5
+    assert calls["http://slow/tasks"]["timeout"] == 30
+    assert set(calls["http://fast/tasks"]["json"]["studies"]) == {
+        s.kf_id for s in studies
+    }
+
+
+def test_dispatch_action_errors(db, mocker):
+    """
+    Test that errors from a service are returned in place of its response
+    """
+    mocker.patch(
+        "creator.releases.dispatcher.client_headers", return_value={}
+    )
+    release = ReleaseFactory(state="initializing")
+    task = ReleaseTaskFactory(release=release)
+
+    mock_session = mocker.patch("creator.releases.dispatcher.get_session")
+    mock_session.return_value.post.side_effect = (
+        requests.exceptions.ConnectionError()
+    )
+
+    results = dispatch_action(release, "initialize", release.tasks.all())
+
+    assert isinstance(results[task.pk], requests.exceptions.ConnectionError)
+
+
+def test_dispatch_action_no_tasks(db, mocker):
+    """
+    Test that no requests are made when there are no tasks
+    """
+    mock_session = mocker.patch("creator.releases.dispatcher.get_session")
+    release = ReleaseFactory(state="initializing")
+
+    assert dispatch_action(release, "initialize", []) == {}
+    assert mock_session.call_count == 0
+
+
+def test_request_statuses(db, mocker):
+    """
+    Test that the states of many tasks are requested at once and that states
+    for tasks that weren't requested are ignored
+    """
+    mocker.patch(
+        "creator.releases.dispatcher.client_headers", return_value={}
+    )
+    release = ReleaseFactory(state="running")
+    service = ReleaseServiceFactory(url="http://batch", batch_status=True)
+    tasks = ReleaseTaskFactory.create_batch(
+        2, release=release, release_service=service, state="running"
+    )
+
+    mock_session = mocker.patch("creator.releases.dispatcher.get_session")
+    mock_session.return_value.post.return_value = Resp(
+        {
+            "tasks": [
+                {
+                    "task_id": tasks[0].pk,
+                    "release_id": release.pk,
+                    "state": "staged",
+                },
+                {"task_id": "TA_00000000", "state": "staged"},
+                {
+                    "task_id": tasks[1].pk,
+                    "release_id": "RE_00000000",
+                    "state": "staged",
+                },
+            ]
+        }
+    )
+
+    states = request_statuses(service, tasks)
+
+    assert states == {
+        tasks[0].pk: {
+            "task_id": tasks[0].pk,
+            "release_id": release.pk,
+            "state": "staged",
+        }
+    }
+    post = mock_session.return_value.post
+    assert post.call_count == 1
+    body = post.call_args[1]["json"]
+    assert body["action"] == "get_statuses"
+    assert {t["task_id"] for t in body["tasks"]} == {t.pk for t in tasks}
+
+
+def test_request_statuses_invalid(db, mocker):
+    """
+    Test that a response without a list of states raises an error
+    """
+    mocker.patch(
+        "creator.releases.dispatcher.client_headers", return_value={}
+    )
+    service = ReleaseServiceFactory(batch_status=True)
+    task = ReleaseTaskFactory(release_service=service)
+
+    mock_session = mocker.patch("creator.releases.dispatcher.get_session")
+    resp = Resp({"task_id": task.pk, "state": "running"})
+    resp.content = b"{}"
+    mock_session.return_value.post.return_value = resp
+
+    with pytest.raises(ValueError):
+        request_statuses(service, [task])
@@ -1,7 +1,11 @@
 import pytest
 from graphql_relay import to_global_id
 
-from creator.releases.tasks import publish_release, publish_task
+from creator.releases.tasks import (
+    publish_release,
+    publish_task,
+    cancel_release,
+)
 from creator.releases.models import Release
 from creator.releases.factories import (
     ReleaseFactory,
@@ -81,9 +85,15 @@ def test_publish_allowed_states(db, clients, mocker, state, allowed):
     client = clients.get("Administrators")
 
     release = ReleaseFactory(state=state)
-    release.tasks.set(ReleaseTaskFactory.create_batch(3, state="staged"))
+    tasks = ReleaseTaskFactory.create_batch(3, state="staged")
+    release.tasks.set(tasks)
     release.save()
 
+    mock_dispatch = mocker.patch("creator.releases.tasks.dispatch_action")
+    mock_dispatch.return_value = {
+        task.pk: {"state": "publishing", "task_id": task.pk} for task in tasks
+    }
+
     resp = client.post(
         "/graphql",
         data={
@@ -169,10 +179,59 @@ def test_publish_release_with_tasks(db, mocker):
     release.tasks.set(tasks)
     release.save()
 
+    mock_dispatch = mocker.patch("creator.releases.tasks.dispatch_action")
+    mock_dispatch.return_value = {
+        task.pk: {
+            "state": "publishing",
+            "task_id": task.pk,
+            "release_id": release.pk,
+        }
+        for task in tasks
+    }
+
     publish_release(release_id=release.pk)
 
-    assert mock.call_count == 3
+    release.refresh_from_db()
+    assert mock_dispatch.call_count == 1
+    assert mock_dispatch.call_args[0][1] == "publish"
+    assert mock.call_count == 0
     assert release.state == "publishing"
+    assert all(t.state == "publishing" for t in release.tasks.all())
+
+
+def test_publish_release_task_fails(db, mocker):
+    """
+    Test that a release is canceled if any of its tasks fail to publish
+    """
+
+    mock = mocker.patch("rq.Queue.enqueue")
+
+    release = ReleaseFactory(state="publishing")
+    tasks = ReleaseTaskFactory.create_batch(2, state="staged")
+    release.tasks.set(tasks)
+    release.save()
+
+    mock_dispatch = mocker.patch("creator.releases.tasks.dispatch_action")
+    mock_dispatch.return_value = {
+        tasks[0].pk: {
+            "state": "publishing",
+            "task_id": tasks[0].pk,
+            "release_id": release.pk,
+        },
+        tasks[1].pk: ValueError("Service unavailable"),
+    }
+
+    publish_release(release_id=release.pk)
+
+    release.refresh_from_db()
+    tasks[0].refresh_from_db()
+    tasks[1].refresh_from_db()
+    assert release.state == "canceling"
+    assert tasks[0].state == "publishing"
+    assert tasks[1].state == "failed"
+    mock.assert_called_with(
+        cancel_release, release_id=release.pk, failed=True, ttl=60
+    )
 
 
 def test_publish_task_successful(db, mocker):
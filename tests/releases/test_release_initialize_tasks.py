@@ -13,6 +13,7 @@ from creator.releases.tasks import (
     initialize_release,
     initialize_task,
     start_release,
+    cancel_release,
 )
 
 
@@ -36,21 +37,78 @@ def test_initialize_release_no_tasks(db, mocker):
 
 def test_initialize_release_with_tasks(db, mocker):
     """
-    Test that the initialize_release task enqueues tasks to initialize each
-    service in the release.
+    Test that the initialize_release task sends initialize to each service in
+    the release and starts the release once all tasks are pending.
     """
     mock_rq = mocker.patch("rq.Queue.enqueue")
 
     release = ReleaseFactory(state="initializing")
     service = ReleaseServiceFactory()
-    task = ReleaseTaskFactory(release=release, release_service=service)
+    tasks = ReleaseTaskFactory.create_batch(
+        2, release=release, release_service=service
+    )
+
+    mock = mocker.patch("creator.releases.tasks.dispatch_action")
+    mock.return_value = {
+        task.pk: {
+            "state": "pending",
+            "task_id": task.pk,
+            "release_id": release.pk,
+        }
+        for task in tasks
+    }
 
     initialize_release(release.pk)
 
     release.refresh_from_db()
 
-    assert release.state == "initializing"
+    assert release.state == "running"
+    assert all(t.state == "pending" for t in release.tasks.all())
+    assert mock.call_count == 1
+    assert mock.call_args[0][1] == "initialize"
     assert mock_rq.call_count == 1
+    mock_rq.assert_called_with(start_release, release_id=release.pk, ttl=60)
+
+
+def test_initialize_release_rejected(db, mocker):
+    """
+    Test that the release is canceled if any service does not respond with
+    'pending' to the initialize action.
+    """
+    mock_rq = mocker.patch("rq.Queue.enqueue")
+
+    release = ReleaseFactory(state="initializing")
+    service = ReleaseServiceFactory()
+    tasks = ReleaseTaskFactory.create_batch(
+        2, release=release, release_service=service
+    )
+
+    mock = mocker.patch("creator.releases.tasks.dispatch_action")
+    mock.return_value = {
+        tasks[0].pk: {
+            "state": "pending",
+            "task_id": tasks[0].pk,
+            "release_id": release.pk,
+        },
+        tasks[1].pk: {
+            "state": "invalid state",
+            "task_id": tasks[1].pk,
+            "release_id": release.pk,
+        },
+    }
+
+    initialize_release(release.pk)
+
+    release.refresh_from_db()
+    tasks[0].refresh_from_db()
+    tasks[1].refresh_from_db()
+
+    assert release.state == "canceling"
+    assert tasks[0].state == "pending"
+    assert tasks[1].state == "rejected"
+    mock_rq.assert_called_with(
+        cancel_release, release_id=release.pk, failed=True, ttl=60
+    )
 
 
 def test_initialize_task_successful(db, mocker):
@@ -9,7 +9,7 @@ from creator.releases.factories import (
 )
 
 from creator.releases.models import Release, ReleaseTask
-from creator.releases.tasks import start_release, start_task
+from creator.releases.tasks import start_release, start_task, cancel_release
 
 
 def test_start_release_no_tasks(db):
@@ -28,7 +28,7 @@ def test_start_release_no_tasks(db):
 
 def test_start_release_with_tasks(db, mocker):
     """
-    Test that start_release queues start_task jobs for each task
+    Test that start_release sends start to every task in the release
     """
     mock_rq = mocker.patch("rq.Queue.enqueue")
 
@@ -38,13 +38,52 @@ def test_start_release_with_tasks(db, mocker):
         release=release, release_service=service, state="pending"
     )
 
+    mock = mocker.patch("creator.releases.tasks.dispatch_action")
+    mock.return_value = {
+        task.pk: {
+            "state": "running",
+            "task_id": task.pk,
+            "release_id": release.pk,
+        }
+    }
+
     start_release(release.pk)
 
     release.refresh_from_db()
+    task.refresh_from_db()
 
     assert release.state == "running"
-    assert mock_rq.call_count == 1
-    mock_rq.assert_called_with(start_task, task_id=task.pk, ttl=60)
+    assert task.state == "running"
+    assert mock.call_count == 1
+    assert mock.call_args[0][1] == "start"
+    assert mock_rq.call_count == 0
+
+
+def test_start_release_task_fails(db, mocker):
+    """
+    Test that start_release cancels the release if a task fails to start
+    """
+    mock_rq = mocker.patch("rq.Queue.enqueue")
+
+    release = ReleaseFactory(state="running")
+    service = ReleaseServiceFactory()
+    task = ReleaseTaskFactory(
+        release=release, release_service=service, state="pending"
+    )
+
+    mock = mocker.patch("creator.releases.tasks.dispatch_action")
+    mock.return_value = {task.pk: ValueError("Connection refused")}
+
+    start_release(release.pk)
+
+    release.refresh_from_db()
+    task.refresh_from_db()
+
+    assert release.state == "canceling"
+    assert task.state == "failed"
+    mock_rq.assert_called_with(
+        cancel_release, release_id=release.pk, failed=True, ttl=60
+    )
 
 
 def test_start_task_successful(db, mocker):
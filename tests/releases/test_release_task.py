@@ -21,7 +21,8 @@ def test_send_action(db, mocker, action):
         def raise_for_status(self):
             pass
 
-    mock = mocker.patch("creator.releases.models.requests.post")
+    mock_session = mocker.patch("creator.releases.models.get_session")
+    mock = mock_session.return_value.post
     mock.return_value = Resp()
 
     release_task._send_action(action)
@@ -49,7 +50,8 @@ def test_http_error(db, mocker):
     release_task = ReleaseTaskFactory()
 
     mock_header = mocker.patch("creator.releases.models.client_headers")
-    mock = mocker.patch("creator.releases.models.requests.post")
+    mock_session = mocker.patch("creator.releases.models.get_session")
+    mock = mock_session.return_value.post
 
     mock.side_effect = requests.exceptions.RequestException()
 
@@ -79,7 +81,8 @@ def test_send_action_invalid_json(db, mocker):
         def content(self):
             return "<html>Not json</html>"
 
-    mock = mocker.patch("creator.releases.models.requests.post")
+    mock_session = mocker.patch("creator.releases.models.get_session")
+    mock = mock_session.return_value.post
     mock.return_value = Resp()
 
     with pytest.raises(ValueError) as exc:
@@ -108,7 +111,8 @@ def test_incorrect_task_id(db, mocker):
         def raise_for_status(self):
             pass
 
-    mock = mocker.patch("creator.releases.models.requests.post")
+    mock_session = mocker.patch("creator.releases.models.get_session")
+    mock = mock_session.return_value.post
     mock.return_value = Resp()
 
     with pytest.raises(ValueError):
@@ -138,7 +142,8 @@ def test_incorrect_release_id(db, mocker):
         def raise_for_status(self):
             pass
 
-    mock = mocker.patch("creator.releases.models.requests.post")
+    mock_session = mocker.patch("creator.releases.models.get_session")
+    mock = mock_session.return_value.post
     mock.return_value = Resp()
 
     with pytest.raises(ValueError):
@@ -1,12 +1,15 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from creator.releases.tasks import scan_releases
-from creator.releases.factories import ReleaseFactory
+from creator.releases.tasks import scan_releases, check_release
+from creator.releases.factories import ReleaseFactory, ReleaseTaskFactory
 
 
 def test_scan_releases(db, mocker):
     """
-    Check that only releases in action are queued for status checks.
+    Check that only releases in action that are ready to change state are
+    queued for status checks.
     """
     mock_rq = mocker.patch("rq.Queue.enqueue")
 
@@ -28,4 +31,44 @@ def test_scan_releases(db, mocker):
 
     scan_releases()
 
-    assert mock_rq.call_count == 5
+    # The waiting release has no tasks in a state that requires it to change
+    assert mock_rq.call_count == 4
+
+
+def test_scan_releases_only_ready(db, mocker):
+    """
+    Check that releases are only queued when their tasks' states require the
+    release to change state.
+    """
+    mock_rq = mocker.patch("rq.Queue.enqueue")
+
+    waiting = ReleaseFactory(state="running")
+    staged = ReleaseFactory(state="running")
+    ReleaseTaskFactory(release=waiting, state="running")
+    ReleaseTaskFactory(release=waiting, state="staged")
+    ReleaseTaskFactory(release=staged, state="staged")
+    ReleaseTaskFactory(release=staged, state="staged")
+
+    scan_releases()
+
+    mock_rq.assert_called_once_with(
+        check_release, release_id=staged.pk, ttl=60
+    )
+
+
+def test_scan_releases_query_count(db, mocker):
+    """
+    Check that the number of queries made while scanning does not grow with
+    the number of active releases.
+    """
+    mocker.patch("rq.Queue.enqueue")
+
+    def scan_queries(n):
+        for _ in range(n):
+            release = ReleaseFactory(state="running")
+            ReleaseTaskFactory(release=release, state="staged")
+        with CaptureQueriesContext(connection) as ctx:
+            scan_releases()
+        return len(ctx.captured_queries)
+
+    assert scan_queries(2) == scan_queries(10)
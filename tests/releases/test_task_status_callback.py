@@ -0,0 +1,120 @@
+import pytest
+
+from creator.releases.factories import (
+    ReleaseFactory,
+    ReleaseTaskFactory,
+    ReleaseServiceFactory,
+)
+from creator.releases.tasks import check_release
+
+
+@pytest.mark.parametrize(
+    "user_group,allowed",
+    [
+        ("Administrators", True),
+        ("Services", True),
+        ("Developers", False),
+        ("Investigators", False),
+        ("Bioinformatics", False),
+        (None, False),
+    ],
+)
+def test_task_status_callback(db, clients, mocker, user_group, allowed):
+    """
+    Test that services may push a task's new state and that the release is
+    queued to be checked
+    """
+    client = clients.get(user_group)
+    mock_rq = mocker.patch("rq.Queue.enqueue")
+
+    release = ReleaseFactory(state="running")
+    task = ReleaseTaskFactory(
+        release=release,
+        release_service=ReleaseServiceFactory(),
+        state="running",
+    )
+
+    resp = client.post(
+        f"/releases/tasks/{task.pk}/status",
+        data={"task_id": task.pk, "release_id": release.pk, "state": "staged"},
+        content_type="application/json",
+    )
+
+    task.refresh_from_db()
+    if allowed:
+        assert resp.status_code == 200
+        assert resp.json()["state"] == "staged"
+        assert task.state == "staged"
+        mock_rq.assert_called_with(
+            check_release, release_id=release.pk, ttl=60
+        )
+    else:
+        assert resp.status_code == 401
+        assert task.state == "running"
+        assert mock_rq.call_count == 0
+
+
+def test_task_status_callback_unchanged(db, clients, mocker):
+    """
+    Test that the release is not checked when the task's state is unchanged
+    """
+    client = clients.get("Services")
+    mock_rq = mocker.patch("rq.Queue.enqueue")
+
+    task = ReleaseTaskFactory(state="running")
+
+    resp = client.post(
+        f"/releases/tasks/{task.pk}/status",
+        data={"task_id": task.pk, "state": "running"},
+        content_type="application/json",
+    )
+
+    assert resp.status_code == 200
+    assert mock_rq.call_count == 0
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"task_id": "TA_00000000", "state": "staged"},
+        {"release_id": "RE_00000000", "state": "staged"},
+        {"state": "published"},
+        {"state": "pending"},
+        {"progress": 50},
+    ],
+)
+def test_task_status_callback_invalid(db, clients, mocker, body):
+    """
+    Test that states which don't match the task or can't be applied to it
+    are refused
+    """
+    client = clients.get("Services")
+    mock_rq = mocker.patch("rq.Queue.enqueue")
+
+    task = ReleaseTaskFactory(state="running")
+
+    resp = client.post(
+        f"/releases/tasks/{task.pk}/status",
+        data=body,
+        content_type="application/json",
+    )
+
+    task.refresh_from_db()
+    assert resp.status_code == 400
+    assert task.state == "running"
+    assert mock_rq.call_count == 0
+
+
+def test_task_status_callback_not_found(db, clients):
+    """
+    Test that reporting the state of an unknown task returns a 404
+    """
+    client = clients.get("Services")
+
+    resp = client.post(
+        "/releases/tasks/TA_00000000/status",
+        data={"state": "staged"},
+        content_type="application/json",
+    )
+
+    assert resp.status_code == 404
@@ -0,0 +1,15 @@
+from creator.jobs.models import Job
+from creator.tasks import poll_delivery_imports_task
+
+
+def test_poll_delivery_imports_task(db, mocker):
+    job = Job(name="delivery_imports")
+    job.save()
+    mock = mocker.patch("creator.tasks.poll_delivery_imports")
+
+    poll_delivery_imports_task()
+
+    job.refresh_from_db()
+    assert job.last_run is not None
+    assert job.failing is False
+    assert mock.call_count == 1
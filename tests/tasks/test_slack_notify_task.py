@@ -1,13 +1,26 @@
 import pytest
 import datetime
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from creator.studies.factories import StudyFactory
 from creator.files.factories import FileFactory
 from creator.organizations.factories import OrganizationFactory
 from creator.events.models import Event
 from creator.studies.models import Study
+from creator import slack
 from creator.slack import summary_post
 
 
+@pytest.fixture(autouse=True)
+def clear_slack_state():
+    """
+    Forget cached channel ids and rate limits between tests
+    """
+    cache.clear()
+    slack._limiters.clear()
+
+
 def test_slack_notify_success(db, mocker, settings):
     """
     Test that the slack notify task operates correctly
@@ -178,3 +191,41 @@ def test_slack_notify_trunc_message(db, mocker, settings):
     assert mock_post.call_count == 1
     args, kwargs = mock_post.call_args_list[0]
     assert "Too many events" in kwargs["blocks"][-1]["text"]["text"]
+
+
+def test_slack_notify_constant_queries(db, mocker, settings):
+    """
+    Test that the number of queries does not grow with studies or events
+    """
+    settings.SLACK_TOKEN = "ABC"
+
+    mocker.patch("creator.slack.WebClient.conversations_join")
+    mock_post = mocker.patch("creator.slack.WebClient.chat_postMessage")
+    mock_post.return_value = {"ok": True}
+    mock_list = mocker.patch("creator.slack.WebClient.conversations_list")
+
+    def add_studies(n):
+        for i in range(n):
+            study = StudyFactory()
+            study.slack_channel = f"channel-{study.kf_id.lower()}"
+            study.save()
+            for _ in range(3):
+                FileFactory(study=study)
+        mock_list.return_value = {
+            "ok": True,
+            "channels": [
+                {"id": s.kf_id, "name": s.slack_channel}
+                for s in Study.objects.all()
+            ],
+        }
+
+    add_studies(1)
+    with CaptureQueriesContext(connection) as few:
+        summary_post()
+
+    add_studies(4)
+    with CaptureQueriesContext(connection) as many:
+        summary_post()
+
+    assert mock_post.call_count == 6
+    assert len(many.captured_queries) == len(few.captured_queries)
@@ -0,0 +1,48 @@
+from django.contrib.auth.models import AnonymousUser, Group
+from django.test import RequestFactory
+
+from creator.authorization import get_authorization
+from creator.studies.factories import StudyFactory
+from creator.users.factories import UserFactory
+
+
+def test_authorization_loaded_once(db, django_assert_num_queries):
+    """
+    Test that a user's permissions and studies are only queried once no
+    matter how many checks are made
+    """
+    user = UserFactory()
+    user.groups.add(Group.objects.get(name="Investigators"))
+    studies = StudyFactory.create_batch(3)
+    user.studies.add(studies[0])
+
+    request = RequestFactory().get("/")
+    request.user = user
+
+    with django_assert_num_queries(3):
+        for _ in range(5):
+            auth = get_authorization(request)
+            assert auth.has_study_perm(
+                "studies.view_study", "studies.view_my_study", studies[0].pk
+            )
+            assert not auth.has_study_perm(
+                "studies.view_study", "studies.view_my_study", studies[1].pk
+            )
+            assert not auth.has_perm("studies.view_study")
+
+    assert get_authorization(request) is auth
+
+
+def test_authorization_anonymous(db, django_assert_num_queries):
+    """
+    Test that anonymous users have no permissions or studies
+    """
+    study = StudyFactory()
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+
+    with django_assert_num_queries(0):
+        auth = get_authorization(request)
+        assert not auth.has_study_perm(
+            "studies.view_study", "studies.view_my_study", study.pk
+        )
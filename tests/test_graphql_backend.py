@@ -0,0 +1,98 @@
+import hashlib
+import graphql
+from django.core.cache import cache
+
+from creator.graphql_backend import CachedDocumentBackend
+from creator.schema import schema
+
+QUERY = "{ allStudies { edges { node { name } } } }"
+
+
+def test_documents_cached(mocker):
+    """
+    Test that documents are only parsed and validated the first time they
+    are seen and that the least recently used documents are evicted
+    """
+    parse = mocker.patch(
+        "creator.graphql_backend.parse", wraps=graphql.parse
+    )
+    validate = mocker.patch(
+        "creator.graphql_backend.validate", wraps=graphql.validate
+    )
+    backend = CachedDocumentBackend(max_size=2)
+
+    first = backend.document_from_string(schema, QUERY)
+    assert backend.document_from_string(schema, QUERY) is first
+    assert parse.call_count == 1
+    assert validate.call_count == 1
+
+    backend.document_from_string(schema, "{ myProfile { id } }")
+    backend.document_from_string(
+        schema, "{ allJobs { edges { node { name } } } }"
+    )
+    assert len(backend.documents) == 2
+    assert backend.document_from_string(schema, QUERY) is not first
+    assert parse.call_count == 4
+    assert validate.call_count == 4
+
+
+def test_invalid_documents_not_cached():
+    """
+    Test that documents that fail validation are not cached
+    """
+    backend = CachedDocumentBackend()
+    document = backend.document_from_string(schema, "{ notAField }")
+
+    result = document.execute()
+    assert result.invalid
+    assert len(backend.documents) == 0
+
+
+def test_persisted_query(db, client):
+    """
+    Test that a query may be registered and then sent by its hash alone
+    """
+    sha = hashlib.sha256(QUERY.encode("utf-8")).hexdigest()
+    cache.delete(f"PERSISTED_QUERY:{sha}")
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": sha}}
+
+    resp = client.post(
+        "/graphql",
+        data={"extensions": extensions},
+        content_type="application/json",
+    )
+    assert resp.status_code == 200
+    assert resp.json()["errors"][0]["message"] == "PersistedQueryNotFound"
+
+    resp = client.post(
+        "/graphql",
+        data={"query": QUERY, "extensions": extensions},
+        content_type="application/json",
+    )
+    assert resp.status_code == 200
+    assert "allStudies" in resp.json()["data"]
+
+    resp = client.post(
+        "/graphql",
+        data={"extensions": extensions},
+        content_type="application/json",
+    )
+    assert resp.status_code == 200
+    assert "allStudies" in resp.json()["data"]
+    cache.delete(f"PERSISTED_QUERY:{sha}")
+
+
+def test_persisted_query_mismatch(db, client):
+    """
+    Test that a query is not registered under a hash that doesn't match it
+    """
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": "abc"}}
+
+    resp = client.post(
+        "/graphql",
+        data={"query": QUERY, "extensions": extensions},
+        content_type="application/json",
+    )
+
+    assert resp.status_code == 400
+    assert cache.get("PERSISTED_QUERY:abc") is None
@@ -0,0 +1,75 @@
+from creator.graphql_profiling import OperationProfile
+from creator.studies.factories import StudyFactory
+from creator.files.factories import FileFactory
+
+
+def test_operation_profile():
+    """
+    Test that repeated statements are reported as duplicates
+    """
+    profile = OperationProfile("MyQuery")
+
+    def execute(sql, params, many, context):
+        pass
+
+    for sql in ["SELECT 1", "SELECT 2", "SELECT 2", "SELECT 2"]:
+        profile.record_query(execute, sql, [], False, {})
+    profile.record_resolver("Query.allStudies", 0.5)
+    profile.finish()
+
+    assert profile.query_count == 4
+    assert profile.duplicate_queries == [("SELECT 2", 3)]
+    summary = profile.summary()
+    assert summary["operation"] == "MyQuery"
+    assert summary["duplicate_queries"] == [{"sql": "SELECT 2", "count": 3}]
+    assert summary["resolvers"][0]["field"] == "Query.allStudies"
+
+
+def test_profile_extensions(db, clients, settings, mocker):
+    """
+    Test that the profile of an operation is logged and returned in the
+    response extensions when enabled
+    """
+    settings.GRAPHQL_PROFILE_EXTENSIONS = True
+    settings.GRAPHQL_PROFILE_RESOLVERS = True
+    log = mocker.patch("creator.graphql_profiling.OperationProfile.log")
+    client = clients.get("Administrators")
+    for study in StudyFactory.create_batch(2):
+        FileFactory(study=study)
+
+    query = """
+    query AllStudies {
+        allStudies { edges { node {
+            name files { edges { node { name } } }
+        } } }
+    }
+    """
+    resp = client.post(
+        "/graphql",
+        data={"query": query, "operationName": "AllStudies"},
+        content_type="application/json",
+    )
+
+    assert resp.status_code == 200
+    profile = resp.json()["extensions"]["profile"]
+    assert profile["operation"] == "AllStudies"
+    assert profile["query_count"] > 0
+    assert "Query.allStudies" in [r["field"] for r in profile["resolvers"]]
+    assert log.call_count == 1
+
+
+def test_profile_extensions_disabled(db, clients, settings):
+    """
+    Test that profiles are not returned unless enabled
+    """
+    settings.GRAPHQL_PROFILE_EXTENSIONS = False
+    client = clients.get("Administrators")
+
+    resp = client.post(
+        "/graphql",
+        data={"query": "{ allStudies { edges { node { name } } } }"},
+        content_type="application/json",
+    )
+
+    assert resp.status_code == 200
+    assert "extensions" not in resp.json()
@@ -1,6 +1,11 @@
+import time
 import pytest
+from types import SimpleNamespace
+from django.core.cache import cache
+from slack_sdk.errors import SlackApiError
+from creator import slack
 from creator.studies.factories import StudyFactory
-from creator.slack import setup_slack
+from creator.slack import setup_slack, RateLimiter, SlackDelivery
 
 
 def test_setup_slack(db, mocker):
@@ -33,3 +38,111 @@ def test_setup_slack(db, mocker):
 
     # Users are invited
     assert mock_client().conversations_invite.call_count == 1
+
+
+@pytest.fixture
+def slack_state():
+    cache.clear()
+    slack._limiters.clear()
+    yield
+    cache.clear()
+    slack._limiters.clear()
+
+
+def rate_limited(retry_after="0"):
+    response = SimpleNamespace(
+        status_code=429, headers={"Retry-After": retry_after}
+    )
+    return SlackApiError("ratelimited", response)
+
+
+def test_rate_limiter():
+    """
+    Test that calls beyond the burst wait for the bucket to refill
+    """
+    limiter = RateLimiter(600)
+
+    start = time.monotonic()
+    for _ in range(limiter.capacity + 1):
+        limiter.acquire()
+
+    assert time.monotonic() - start >= 0.09
+
+
+def test_retry_after(slack_state, mocker, settings):
+    """
+    Test that rate limited calls are retried after Retry-After
+    """
+    settings.SLACK_MAX_RETRIES = 2
+    client = mocker.MagicMock()
+    client.pins_add.side_effect = [rate_limited(), {"ok": True}]
+    pause = mocker.patch.object(RateLimiter, "pause")
+
+    response = SlackDelivery(client).pins_add(channel="C1", timestamp="1")
+
+    assert response == {"ok": True}
+    assert client.pins_add.call_count == 2
+    pause.assert_called_with(0)
+
+
+def test_retry_limit(slack_state, mocker, settings):
+    """
+    Test that calls that stay rate limited eventually raise
+    """
+    settings.SLACK_MAX_RETRIES = 2
+    client = mocker.MagicMock()
+    client.pins_add.side_effect = rate_limited()
+
+    with pytest.raises(SlackApiError):
+        SlackDelivery(client).pins_add(channel="C1", timestamp="1")
+
+    assert client.pins_add.call_count == 3
+
+
+def test_channel_ids_cached(slack_state, mocker):
+    """
+    Test that channels are only listed for names that are not cached
+    """
+    client = mocker.MagicMock()
+    client.conversations_list.return_value = {
+        "channels": [
+            {"id": "C1", "name": "one"},
+            {"id": "C2", "name": "two"},
+        ]
+    }
+    delivery = SlackDelivery(client)
+
+    assert delivery.channel_ids(["one", "two"]) == {"one": "C1", "two": "C2"}
+    assert delivery.channel_ids(["one"]) == {"one": "C1"}
+    assert client.conversations_list.call_count == 1
+
+    assert delivery.channel_ids(["one", "three"]) == {"one": "C1"}
+    assert client.conversations_list.call_count == 2
+
+
+def test_post_all(slack_state, mocker, settings):
+    """
+    Test that messages are posted to each channel and failures returned
+    """
+    settings.SLACK_DELIVERY_WORKERS = 4
+    client = mocker.MagicMock()
+    error = ValueError("failed")
+
+    def post(channel, **kwargs):
+        if channel == "C3":
+            raise error
+        return {"ok": True, "channel": channel}
+
+    client.chat_postMessage.side_effect = post
+    messages = [(f"C{i}", {"text": "hi"}) for i in range(5)]
+
+    results = SlackDelivery(client).post_all(messages)
+
+    assert client.conversations_join.call_count == 5
+    assert results[3] is error
+    assert [r["channel"] for i, r in enumerate(results) if i != 3] == [
+        "C0",
+        "C1",
+        "C2",
+        "C4",
+    ]